@@ -1,12 +1,12 @@
 from kivy.app import App
 from kivy.uix.label import Label
 import os
-import pygame
 from tkinter import Tk, filedialog
-from PIL import Image
-import numpy as np
 import heapq
 
+from utils.image_processor import load_maze_image
+from utils.maze_view import MazeView
+
 
 class MyApp(App):
     def build(self):
@@ -27,15 +27,6 @@ class Player:
         elif direction == 'right' and maze_grid[x, y + 1] == 0:
             self.position = (x, y + 1)
 
-def load_maze_image(file_path):
-    img = Image.open(file_path).convert('L')  # Convert to grayscale
-    img = img.point(lambda x: 0 if x < 128 else 255, '1')  # Binarize image
-    maze = np.array(img, dtype=int)  # Convert to numpy array
-    return maze
-
-def convert_image_to_grid(maze_image):
-    maze_grid = (maze_image == 0).astype(int)  # 0 for paths, 1 for walls
-    return maze_grid
 
 def is_goal_reached(player_pos, goal_pos):
     return player_pos == goal_pos
@@ -88,52 +79,17 @@ def a_star(maze, start, goal):
     return False
 
 def display_maze(maze_grid, player_pos, goal_pos, path):
-    pygame.init()
-    cell_size = 4  # Adjust cell size to fit the entire maze on screen
-    width, height = maze_grid.shape[1] * cell_size, maze_grid.shape[0] * cell_size
-    screen = pygame.display.set_mode((width, height))
-
     player = Player(player_pos)
+    directions = {(-1, 0): 'up', (1, 0): 'down', (0, -1): 'left', (0, 1): 'right'}
 
-    running = True
-    while running:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-
-        keys = pygame.key.get_pressed()
-        if keys[pygame.K_UP]:
-            player.move('up', maze_grid)
-        if keys[pygame.K_DOWN]:
-            player.move('down', maze_grid)
-        if keys[pygame.K_LEFT]:
-            player.move('left', maze_grid)
-        if keys[pygame.K_RIGHT]:
-            player.move('right', maze_grid)
-
-        screen.fill((255, 255, 255))
-        for x in range(maze_grid.shape[0]):
-            for y in range(maze_grid.shape[1]):
-                color = (0, 0, 0) if maze_grid[x, y] == 1 else (255, 255, 255)
-                pygame.draw.rect(screen, color, pygame.Rect(y * cell_size, x * cell_size, cell_size, cell_size))
-
-        pygame.draw.rect(screen, (0, 255, 0),
-                         pygame.Rect(goal_pos[1] * cell_size, goal_pos[0] * cell_size, cell_size, cell_size))
-        pygame.draw.rect(screen, (255, 0, 0),
-                         pygame.Rect(player.position[1] * cell_size, player.position[0] * cell_size, cell_size,
-                                     cell_size))
-
-        if path:
-            for (x, y) in path:
-                pygame.draw.rect(screen, (0, 0, 255), pygame.Rect(y * cell_size, x * cell_size, cell_size, cell_size))
-
-        if is_goal_reached(player.position, goal_pos):
-            print("Goal Reached!")
-            running = False
-
-        pygame.display.flip()
-
-    pygame.quit()
+    def move(position, step):
+        player.move(directions[step], maze_grid)
+        return player.position
+
+    # Cell size 4 fits most mazes; larger ones scroll with the player.
+    view = MazeView(maze_grid, player_pos, goal_pos, path, cell_size=4, caption="BestFinder")
+    if view.run(move, stop_at_goal=True):
+        print("Goal Reached!")
 
 def main():
     # Create a Tkinter root window and hide it
@@ -146,11 +102,8 @@ def main():
         print("No file selected. Exiting...")
         return
 
-    # Load the maze image
-    maze = load_maze_image(file_path)
-
-    # Convert the maze image to a grid
-    maze_grid = convert_image_to_grid(maze)
+    # Load the maze image as a grid: 0 for paths, 1 for walls
+    maze_grid = load_maze_image(file_path)
 
     # Define start and goal positions
     start_pos = (1, 1)
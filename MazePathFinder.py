@@ -1,103 +1,52 @@
 
+import os
+import threading
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-from PIL import Image
 import numpy as np
-import pygame
 from typing import Tuple, List
 
-# Import the algorithm modules placed next to this script
-import a_star
-import bfs
-import dfs
-import dijkstra
+# Import the algorithm modules from the algorithms/ package next to this script
+from algorithms import a_star, ara_star, bfs, corridors, dfs, dijkstra, jps
+from algorithms.grid import Grid
+from algorithms.stats import SearchStats
+from utils.cache import DEFAULT_CACHE_DIR, SolutionCache, grid_digest, solution_key
+from utils import image_processor
+from utils.maze_view import MazeView
 
 Coord = Tuple[int, int]
 
 # ---------------------- Image / Grid utils ----------------------
 def load_maze_image(file_path: str) -> np.ndarray:
     """
-    Load image, convert to 1-bit (paths/walls), return numpy array with 0 (path) and 1 (wall).
+    Load image, binarize (<128 -> wall), return uint8 numpy array with 0 (path) and 1 (wall).
+    The binarized grid is cached, so reopening the same image skips PNG decoding.
     """
-    img = Image.open(file_path).convert('L')
-    # binarize: <128 -> black (0), else white (255)
-    img = img.point(lambda x: 0 if x < 128 else 255, '1')
-    maze = np.array(img, dtype=int)
-    # Convert to grid convention: 0 for free, 1 for wall -> already integer 0/1
-    return maze
-
-def numpy_to_grid_list(maze_np: np.ndarray) -> List[List[float]]:
+    return image_processor.load_maze_image(file_path, cache=image_processor.DEFAULT_GRID_CACHE_DIR)
+
+def numpy_to_grid(maze_np: np.ndarray) -> Grid:
     """
-    Convert numpy 0/1 array into a list-of-lists for the algorithm modules.
+    Wrap a numpy 0/1 array as a compact Grid for the algorithm modules.
     0 -> free (cost 1), 1 -> wall.
     """
-    # Cast to int then to Python lists
-    return maze_np.astype(int).tolist()
+    return Grid(maze_np)
 
 # ---------------------- Pygame visualizer ----------------------
 def display_maze(maze_grid_np: np.ndarray, start: Coord, goal: Coord, path: List[Coord],
                  cell_size: int = 6, show_path=True):
     """
     Blocking visualization window using pygame. Arrow keys move a red 'player' square.
+    The maze and path are rendered once; mazes bigger than the screen scroll with the
+    player or the mouse wheel, and +/- zoom.
     """
-    pygame.init()
-    H, W = maze_grid_np.shape
-    width, height = W * cell_size, H * cell_size
-    screen = pygame.display.set_mode((width, height))
-    pygame.display.set_caption("MazePathFinder")
-
-    # Player
-    player = list(start)
-
-    clock = pygame.time.Clock()
-    running = True
-    while running:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-
-        keys = pygame.key.get_pressed()
-        if keys[pygame.K_UP] and player[0] > 0 and maze_grid_np[player[0]-1, player[1]] == 0:
-            player[0] -= 1
-        if keys[pygame.K_DOWN] and player[0] < H-1 and maze_grid_np[player[0]+1, player[1]] == 0:
-            player[0] += 1
-        if keys[pygame.K_LEFT] and player[1] > 0 and maze_grid_np[player[0], player[1]-1] == 0:
-            player[1] -= 1
-        if keys[pygame.K_RIGHT] and player[1] < W-1 and maze_grid_np[player[0], player[1]+1] == 0:
-            player[1] += 1
-
-        # Draw
-        screen.fill((255, 255, 255))
-        # Walls/paths
-        for r in range(H):
-            y = r * cell_size
-            row = maze_grid_np[r]
-            for c in range(W):
-                x = c * cell_size
-                if row[c] == 1:
-                    pygame.draw.rect(screen, (0,0,0), (x, y, cell_size, cell_size))
-
-        # Optional path
-        if show_path and path:
-            for (r, c) in path:
-                pygame.draw.rect(screen, (0, 0, 255), (c*cell_size, r*cell_size, cell_size, cell_size))
-
-        # Start, Goal, Player
-        pygame.draw.rect(screen, (255, 165, 0), (start[1]*cell_size, start[0]*cell_size, cell_size, cell_size))  # start = orange
-        pygame.draw.rect(screen, (0, 200, 0), (goal[1]*cell_size, goal[0]*cell_size, cell_size, cell_size))        # goal = green
-        pygame.draw.rect(screen, (200, 0, 0), (player[1]*cell_size, player[0]*cell_size, cell_size, cell_size))    # player = red
-
-        pygame.display.flip()
-        clock.tick(60)
-
-    pygame.quit()
+    MazeView(maze_grid_np, start, goal, path, cell_size=cell_size, show_path=show_path).run()
 
 # ---------------------- Tkinter App ----------------------
 class MazePathFinderApp(tk.Tk):
     def __init__(self):
         super().__init__()
         self.title("MazePathFinder (Tk + Pygame)")
-        self.geometry("520x320")
+        self.geometry("520x400")
         self.resizable(False, False)
 
         # State
@@ -107,8 +56,13 @@ class MazePathFinderApp(tk.Tk):
         self.diagonals = tk.BooleanVar(value=False)
         self.cell_size = tk.IntVar(value=6)
         self.start_str = tk.StringVar(value="1,1")
-        self.goal_str = tk.StringVar(value="auto")  # auto -> (H-2, W-2)
+        self.goal_str = tk.StringVar(value="auto")  # auto -> (H-2, W-2), or the reachable cell nearest to it
         self.show_path = tk.BooleanVar(value=True)
+        self.time_limit = tk.DoubleVar(value=0)  # seconds, 0 = no limit
+        self.progress_text = tk.StringVar(value="")
+        self.cache = SolutionCache(disk_dir=DEFAULT_CACHE_DIR)
+        self._job = None  # running search: dict with thread, stats, result
+        self._maze = None  # ((file, mtime), maze array, Grid) of the last maze run
 
         self._build_ui()
 
@@ -129,7 +83,7 @@ class MazePathFinderApp(tk.Tk):
         row2 = ttk.Frame(frm)
         row2.pack(fill="x", **pad)
         ttk.Label(row2, text="Algorithm:").pack(side="left")
-        ttk.Combobox(row2, textvariable=self.algo, values=["A*","Dijkstra","BFS","DFS"], width=10, state="readonly").pack(side="left", padx=6)
+        ttk.Combobox(row2, textvariable=self.algo, values=["A*","ARA*","Dijkstra","BFS","DFS","JPS","JPS+","Corridors"], width=10, state="readonly").pack(side="left", padx=6)
 
         ttk.Checkbutton(row2, text="Diagonals (8-neigh)", variable=self.diagonals).pack(side="left", padx=10)
 
@@ -137,7 +91,7 @@ class MazePathFinderApp(tk.Tk):
         row3 = ttk.Frame(frm)
         row3.pack(fill="x", **pad)
         ttk.Label(row3, text="A* Heuristic:").pack(side="left")
-        ttk.Combobox(row3, textvariable=self.heuristic, values=["manhattan","euclidean"], width=12, state="readonly").pack(side="left", padx=6)
+        ttk.Combobox(row3, textvariable=self.heuristic, values=["manhattan","euclidean","chebyshev"], width=12, state="readonly").pack(side="left", padx=6)
         ttk.Checkbutton(row3, text="Show path overlay", variable=self.show_path).pack(side="left", padx=10)
 
         # Start/Goal row
@@ -153,13 +107,25 @@ class MazePathFinderApp(tk.Tk):
         row5.pack(fill="x", **pad)
         ttk.Label(row5, text="Cell size:").pack(side="left")
         ttk.Spinbox(row5, from_=2, to=40, textvariable=self.cell_size, width=6).pack(side="left", padx=6)
+        ttk.Label(row5, text="Time limit (s, 0 = none):").pack(side="left", padx=(10, 0))
+        ttk.Spinbox(row5, from_=0, to=3600, increment=5, textvariable=self.time_limit, width=6).pack(side="left", padx=6)
 
         # Buttons
         row_btn = ttk.Frame(frm)
         row_btn.pack(fill="x", **pad)
-        ttk.Button(row_btn, text="Run Pathfinding", command=self._run).pack(side="left")
+        self.run_button = ttk.Button(row_btn, text="Run Pathfinding", command=self._run)
+        self.run_button.pack(side="left")
+        self.cancel_button = ttk.Button(row_btn, text="Cancel", command=self._cancel, state="disabled")
+        self.cancel_button.pack(side="left", padx=6)
         ttk.Button(row_btn, text="Quit", command=self.destroy).pack(side="right")
 
+        # Progress (nodes expanded so far, against the number of free cells)
+        row_prog = ttk.Frame(frm)
+        row_prog.pack(fill="x", **pad)
+        self.progress = ttk.Progressbar(row_prog, mode="determinate", length=260)
+        self.progress.pack(side="left")
+        ttk.Label(row_prog, textvariable=self.progress_text).pack(side="left", padx=6)
+
         # Hint
         hint = ttk.Label(frm, foreground="#666",
             text="Tip: white pixels = free (0), black = wall (1). Start defaults to (1,1), Goal to (H-2,W-2).")
@@ -180,56 +146,145 @@ class MazePathFinderApp(tk.Tk):
         except Exception:
             return None
 
+    def _load_maze(self, file_path: str) -> Tuple[np.ndarray, Grid]:
+        """
+        The maze array and Grid of `file_path`, kept while the file is unchanged so its
+        adjacency, component labels and search workspaces carry over from run to run.
+        """
+        stamp = (file_path, os.path.getmtime(file_path))
+        if self._maze is None or self._maze[0] != stamp:
+            maze_np = load_maze_image(file_path)
+            self._maze = (stamp, maze_np, numpy_to_grid(maze_np))
+        return self._maze[1], self._maze[2]
+
     def _run(self):
         if not self.file_path.get():
             messagebox.showwarning("No image", "Please choose a maze image first.")
             return
         try:
-            maze_np = load_maze_image(self.file_path.get())
+            maze_np, grid = self._load_maze(self.file_path.get())
         except Exception as e:
             messagebox.showerror("Failed to load image", f"{e}")
             return
 
         H, W = maze_np.shape
         start = self._parse_rc(self.start_str.get()) or (1,1)
-        goal = (H-2, W-2) if self.goal_str.get().strip().lower() == "auto" else self._parse_rc(self.goal_str.get())
+        # auto: the far corner when start can reach it, else the nearest cell start's component
+        # reaches. That takes labeling the whole maze, so the worker thread resolves it.
+        auto_goal = self.goal_str.get().strip().lower() == "auto"
+        goal = (H-2, W-2) if auto_goal else self._parse_rc(self.goal_str.get())
         if goal is None:
             messagebox.showerror("Invalid goal", "Goal must be 'auto' or 'r,c' integers.")
             return
 
         # Sanity checks
         def inside(rc: Coord): return 0 <= rc[0] < H and 0 <= rc[1] < W
-        if not (inside(start) and inside(goal)):
+        if not (inside(start) and (auto_goal or inside(goal))):
             messagebox.showerror("Out of bounds", "Start or Goal outside maze.")
             return
-        if maze_np[start[0], start[1]] == 1 or maze_np[goal[0], goal[1]] == 1:
+        if maze_np[start[0], start[1]] == 1 or (not auto_goal and maze_np[goal[0], goal[1]] == 1):
             messagebox.showerror("Blocked", "Start/Goal is a wall. Choose different coordinates.")
             return
 
-        grid_list = numpy_to_grid_list(maze_np)
-
-        # Dispatch
+        # Everything that scans the whole maze (auto goal, digest, search) runs on a worker
+        # thread so the window stays responsive and the search can be cancelled. Repeat
+        # queries on the same maze come from the solution cache.
         algo = self.algo.get()
         diags = self.diagonals.get()
-        path, visited, cost = [], [], None
-        try:
-            if algo == "A*":
-                path, visited, cost = a_star.find_path(grid_list, start, goal, diagonals=diags, heuristic=self.heuristic.get())
-            elif algo == "Dijkstra":
-                path, visited, cost = dijkstra.find_path(grid_list, start, goal, diagonals=diags)
-            elif algo == "BFS":
-                path, visited, cost = bfs.find_path(grid_list, start, goal, diagonals=diags)
-            else:
-                path, visited, cost = dfs.find_path(grid_list, start, goal, diagonals=diags)
-        except Exception as e:
-            messagebox.showerror("Pathfinding error", f"{e}")
+        heuristic = self.heuristic.get() if algo in ("A*", "ARA*", "JPS", "JPS+") else None
+        h_name = self.heuristic.get()
+        budget = float(self.time_limit.get() or 0)
+        job = {"result": None, "cached": None, "error": None, "expanded": 0}
+        stats = SearchStats(cancel=threading.Event(), time_budget=budget if budget > 0 else None,
+                            progress=lambda n: job.__setitem__("expanded", n))
+        job.update(stats=stats, maze=maze_np, start=start, goal=goal)
+
+        def work():
+            try:
+                goal = job["goal"]
+                if auto_goal:
+                    goal = job["goal"] = grid.components(diags).reachable_goal(start, goal)
+                key = job["key"] = solution_key(grid_digest(grid), start, goal, algo, diags, heuristic)
+                job["cached"] = self.cache.get(key)
+                if job["cached"] is None:
+                    job["result"] = self._search(grid, start, goal, algo, diags, h_name, stats)
+            except Exception as e:
+                job["error"] = e
+
+        job["thread"] = threading.Thread(target=work, daemon=True)
+        self._job = job
+        self.progress.configure(maximum=max(1, int((maze_np == 0).sum())), value=0)
+        self.progress_text.set("Searching...")
+        self.run_button.configure(state="disabled")
+        self.cancel_button.configure(state="normal")
+        job["thread"].start()
+        self.after(50, self._poll)
+
+    def _search(self, grid: Grid, start: Coord, goal: Coord, algo: str, diags: bool, h_name: str,
+                stats: SearchStats):
+        """Runs on the worker thread, so everything it needs is passed in; it must not touch Tk."""
+        if algo == "A*":
+            return a_star.find_path(grid, start, goal, diagonals=diags, heuristic=h_name, stats=stats)
+        elif algo == "ARA*":
+            # Anytime: with a time limit, the best path found in time (stats.bound says how good)
+            return ara_star.find_path(grid, start, goal, diagonals=diags, heuristic=h_name, stats=stats)
+        elif algo == "Dijkstra":
+            return dijkstra.find_path(grid, start, goal, diagonals=diags, stats=stats)
+        elif algo == "JPS":
+            return jps.find_path(grid, start, goal, diagonals=diags, heuristic=h_name, stats=stats)
+        elif algo == "JPS+":
+            return jps.find_path_plus(grid, start, goal, diagonals=diags, heuristic=h_name, stats=stats)
+        elif algo == "Corridors":
+            return corridors.find_path(grid, start, goal, diagonals=diags, stats=stats)
+        elif algo == "BFS":
+            return bfs.find_path(grid, start, goal, diagonals=diags, stats=stats)
+        else:
+            return dfs.find_path(grid, start, goal, diagonals=diags, stats=stats)
+
+    def _cancel(self):
+        if self._job is not None:
+            self._job["stats"].cancel.set()
+            self.progress_text.set("Cancelling...")
+
+    def _poll(self):
+        job = self._job
+        if job["thread"].is_alive():
+            self.progress.configure(value=job["expanded"])
+            self.progress_text.set(f"Expanded: {job['expanded']:,} nodes")
+            self.after(50, self._poll)
+            return
+
+        self._job = None
+        self.run_button.configure(state="normal")
+        self.cancel_button.configure(state="disabled")
+        self.progress_text.set("")
+        self.progress.configure(value=0)
+        if job["error"] is not None:
+            messagebox.showerror("Pathfinding error", f"{job['error']}")
+            return
+        if job["cached"] is not None:
+            path, cost, n_visited = job["cached"]
+            self._show_result(job["maze"], job["start"], job["goal"], path, cost, n_visited, cached=True)
+            return
+        path, stats, cost = job["result"]
+        if stats.stopped is not None and not path:
+            reason = "Cancelled" if stats.stopped == "cancelled" else "Time limit reached"
+            messagebox.showinfo(reason, f"Search stopped after {stats.expanded:,} expanded nodes.")
             return
+        if stats.stopped is None:
+            self.cache.put(job["key"], path, cost, stats.expanded)
+        self._show_result(job["maze"], job["start"], job["goal"], path, cost, stats.expanded, cached=False,
+                          bound=stats.bound)
 
+    def _show_result(self, maze_np: np.ndarray, start: Coord, goal: Coord, path: List[Coord],
+                     cost, n_visited: int, cached: bool, bound: float | None = None):
         if not path:
             messagebox.showinfo("No Path", "No path found with the selected settings.")
         else:
             steps = len(path) - 1 if cost is None else cost
-            messagebox.showinfo("Path found", f"Visited: {len(visited)} nodes\nPath length/cost: {steps}")
+            source = " (cached)" if cached else ""
+            quality = f"\nWithin {bound:.3f}x of optimal" if bound is not None and bound > 1 else ""
+            messagebox.showinfo("Path found", f"Visited: {n_visited} nodes{source}\nPath length/cost: {steps}{quality}")
 
         # Show pygame window with overlay
         self.withdraw()
@@ -1,42 +1,13 @@
-
 from typing import List, Tuple, Optional, Callable, Iterable
 from collections import deque
 import heapq
 
-Coord = Tuple[int, int]
+from .graph import flat_path
+from .grid import as_grid
+from .queues import integer_search, select_queue
+from .stats import CHECK_INTERVAL, SearchStats
 
-def in_bounds(grid: List[List[float]], r: int, c: int) -> bool:
-    return 0 <= r < len(grid) and 0 <= c < len(grid[0])
-
-def is_blocked(val) -> bool:
-    return val in (1, '#', False)
-
-def cell_cost(val) -> float:
-    # If the cell stores a numeric cost > 1, use it; otherwise cost=1 for traversable cells.
-    try:
-        v = float(val)
-        if v <= 0 or v == 1.0:  # treat 1 as wall by default; adjust if your grid differs
-            return 1.0 if v == 0.0 else float("inf")
-        return v
-    except Exception:
-        return 1.0
-
-def walkable(grid: List[List[float]], r: int, c: int) -> bool:
-    if not in_bounds(grid, r, c):
-        return False
-    return not is_blocked(grid[r][c])
-
-def neighbors4(grid: List[List[float]], r: int, c: int) -> Iterable[Coord]:
-    for dr, dc in ((1,0),(-1,0),(0,1),(0,-1)):
-        nr, nc = r+dr, c+dc
-        if walkable(grid, nr, nc):
-            yield (nr, nc)
-
-def neighbors8(grid: List[List[float]], r: int, c: int) -> Iterable[Coord]:
-    for dr, dc in ((1,0),(-1,0),(0,1),(0,-1),(1,1),(1,-1),(-1,1),(-1,-1)):
-        nr, nc = r+dr, c+dc
-        if walkable(grid, nr, nc):
-            yield (nr, nc)
+Coord = Tuple[int, int]
 
 def reconstruct_path(came_from: dict, current: Coord) -> List[Coord]:
     path = [current]
@@ -52,53 +23,227 @@ def manhattan(a: Coord, b: Coord) -> int:
 def euclidean(a: Coord, b: Coord) -> float:
     return ((a[0]-b[0])**2 + (a[1]-b[1])**2) ** 0.5
 
+def chebyshev(a: Coord, b: Coord) -> int:
+    return max(abs(a[0]-b[0]), abs(a[1]-b[1]))
+
+HEURISTICS = {"manhattan": manhattan, "euclidean": euclidean, "chebyshev": chebyshev}
+
+
+def flat_heuristic(heuristic: str, goal: Coord, width: int) -> Callable[[int], float]:
+    """HEURISTICS[heuristic](cell, goal) for cells given as flat indices r*width + c."""
+    gr, gc = goal
+    if heuristic == "manhattan":
+        def h(i: int) -> float:
+            r, c = divmod(i, width)
+            return abs(r - gr) + abs(c - gc)
+    elif heuristic == "chebyshev":
+        def h(i: int) -> float:
+            r, c = divmod(i, width)
+            return max(abs(r - gr), abs(c - gc))
+    else:
+        def h(i: int) -> float:
+            r, c = divmod(i, width)
+            return ((r - gr)**2 + (c - gc)**2) ** 0.5
+    return h
+
 
 def find_path(grid, start: Coord, goal: Coord, *, diagonals: bool=False,
-              heuristic: str="manhattan") -> tuple[list[Coord], list[Coord], float|None]:
+              heuristic: str="manhattan", bidirectional: bool=False, hierarchy=None,
+              landmarks=None, queue: str="auto", stats: Optional[SearchStats]=None) -> tuple[list[Coord], SearchStats, float|None]:
     """
     A* pathfinding on a grid.
-    Returns: (path, visited_order, total_cost). path=[] and cost=None if no path.
-    Grid conventions:
+    Returns: (path, stats, total_cost). path=[] and cost=None if no path.
+    `grid` is a Grid, or a list-of-lists/array using these conventions:
       - Walls: 1, "#", or False
       - Free cell: 0 (or any non-wall). If a free cell contains a numeric >1, it is treated as its traversal cost.
+    bidirectional=True searches from both ends (see find_path_bidirectional).
+    hierarchy: an hpa.ClusterMap of this grid; the query then runs hierarchically
+    (abstract graph first, refined only along the route) and is near-optimal.
+    heuristic="alt" bounds the remaining cost with the triangle inequality over
+    `landmarks`, an alt.LandmarkTable of this grid: far tighter than the
+    geometric heuristics in winding mazes, so far fewer nodes are expanded.
+    queue: priority queue backend (see algorithms.queues); "auto" uses a bucket
+    queue or radix heap when all step costs are integers and the heuristic is
+    integral and consistent (manhattan on 4-connected grids, chebyshev).
+    stats: a SearchStats to fill (e.g. SearchStats(record="all") to keep the visited order).
     """
-    if not walkable(grid, *start) or not walkable(grid, *goal):
-        return [], [], None
-
-    h_fn = manhattan if heuristic == "manhattan" else euclidean
-    nbrs = neighbors8 if diagonals else neighbors4
-
-    open_heap = []
-    # entries: (f, g, counter, node)
+    stats = SearchStats() if stats is None else stats
+    with stats.phase("setup"):
+        grid = as_grid(grid)
+    if not grid.walkable(*start) or not grid.walkable(*goal) or not grid.connected(start, goal, diagonals):
+        return [], stats, None
+    if hierarchy is not None:
+        if not hierarchy.matches(grid, diagonals):
+            raise ValueError("cluster map was built for a different maze or connectivity")
+        return hierarchy.find_path(start, goal, heuristic=heuristic, stats=stats)
+    if heuristic == "alt":
+        if landmarks is None or not landmarks.matches(grid, diagonals):
+            raise ValueError("heuristic 'alt' needs a landmark table built for this maze and connectivity")
+        if bidirectional:
+            raise ValueError("heuristic 'alt' is only supported by unidirectional A*")
+    if bidirectional:
+        return find_path_bidirectional(grid, start, goal, diagonals=diagonals, heuristic=heuristic, stats=stats)
+
+    W = grid.width
+    h = landmarks.heuristic(goal) if heuristic == "alt" else flat_heuristic(heuristic, goal, W)
+    adjacency = grid.adjacency(diagonals)
+    kind = select_queue(adjacency, queue, heuristic, diagonals)
+    on_expand = stats.recorder()
+    check = stats.checkpoint()
+
+    s, t = start[0]*W + start[1], goal[0]*W + goal[1]
+    with grid.search_workspace() as workspace:
+        if kind != "heap":
+            with stats.phase("search"):
+                cost, (expanded, pushes, pops, peak_open) = integer_search(
+                    adjacency, s, t, kind, workspace, h=h, width=W, on_expand=on_expand, check=check)
+            stats.count(expanded=expanded, pushes=pushes, pops=pops, stale_pops=pops - expanded, peak_open=peak_open)
+            if cost is None:
+                return [], stats, None
+            with stats.phase("path"):
+                path = workspace.path(t, W)
+            return path, stats, float(cost)
+
+        offsets, neighbors, costs = adjacency.views()
+        inf = float("inf")
+        open_heap = []
+        # entries: (f, g, counter, node)
+        counter = 0
+        generation, stamp, g, came_from = workspace.begin()
+        stamp[s], g[s], came_from[s] = generation, 0.0, -1
+        heapq.heappush(open_heap, (h(s), 0.0, counter, s))
+        pops = expanded = peak_open = 0
+        found = False
+
+        with stats.phase("search"):
+            while open_heap:
+                _, g_curr, _, current = heapq.heappop(open_heap)
+                pops += 1
+                if g_curr > g[current]:
+                    continue  # stale entry, a cheaper one was pushed later
+                expanded += 1
+                if on_expand:
+                    on_expand(divmod(current, W))
+                if check and not expanded % CHECK_INTERVAL and check(expanded):
+                    break
+
+                if current == t:
+                    found = True
+                    break
+
+                for j in range(offsets[current], offsets[current+1]):
+                    step = costs[j]
+                    if step == inf:
+                        continue
+                    nxt = neighbors[j]
+                    tentative_g = g_curr + step
+                    if stamp[nxt] != generation or tentative_g < g[nxt]:
+                        stamp[nxt] = generation
+                        came_from[nxt] = current
+                        g[nxt] = tentative_g
+                        counter += 1
+                        heapq.heappush(open_heap, (tentative_g + h(nxt), tentative_g, counter, nxt))
+                        if len(open_heap) > peak_open:
+                            peak_open = len(open_heap)
+        stats.count(expanded=expanded, pushes=counter + 1, pops=pops, stale_pops=pops - expanded, peak_open=peak_open)
+
+        if not found:
+            return [], stats, None
+        with stats.phase("path"):
+            path = workspace.path(t, W)
+        return path, stats, g_curr
+
+
+def find_path_bidirectional(grid, start: Coord, goal: Coord, *, diagonals: bool=False,
+                            heuristic: str|None="manhattan",
+                            stats: Optional[SearchStats]=None) -> tuple[list[Coord], SearchStats, float|None]:
+    """
+    Bidirectional A*: one search grows from `start`, one backwards from `goal`.
+    Both run on the same reduced costs using the average potential
+    p(v) = (h(v, goal) - h(start, v)) / 2, so the usual bidirectional Dijkstra
+    stopping rule (top_fwd + top_bwd >= best meeting cost) keeps the result
+    optimal whenever the heuristic is consistent. heuristic=None gives plain
+    bidirectional Dijkstra.
+    Returns: (path, stats, total_cost) like find_path; a recorded visited order
+    interleaves the expansions of both searches.
+    """
+    stats = SearchStats() if stats is None else stats
+    with stats.phase("setup"):
+        grid = as_grid(grid)
+    if not grid.walkable(*start) or not grid.walkable(*goal) or not grid.connected(start, goal, diagonals):
+        return [], stats, None
+    if start == goal:
+        stats.count(expanded=1)
+        return [start], stats, 0.0
+
+    W = grid.width
+    if heuristic is None:
+        potential = lambda v: 0.0
+    else:
+        h_goal, h_start = flat_heuristic(heuristic, goal, W), flat_heuristic(heuristic, start, W)
+        potential = lambda v: (h_goal(v) - h_start(v)) / 2
+    offsets, neighbors, costs = grid.adjacency(diagonals).views()
+    step_cost = grid.step_view
+    inf = float("inf")
+    on_expand = stats.recorder()
+    check = stats.checkpoint()
+
+    # Per direction: g-scores, parents, heap of (key, g, counter, node), potential sign.
+    s, t = start[0]*W + start[1], goal[0]*W + goal[1]
+    g_f, g_b = {s: 0.0}, {t: 0.0}
+    parent_f, parent_b = {}, {}
+    heap_f = [(potential(s), 0.0, 0, s)]
+    heap_b = [(-potential(t), 0.0, 0, t)]
     counter = 0
-    g = {start: 0.0}
-    f0 = h_fn(start, goal)
-    heapq.heappush(open_heap, (f0, 0.0, counter, start))
-    came_from = {}
-    visited_order = []
-    in_open = {start}
-
-    while open_heap:
-        _, g_curr, _, current = heapq.heappop(open_heap)
-        in_open.discard(current)
-        visited_order.append(current)
-
-        if current == goal:
-            path = reconstruct_path(came_from, current)
-            return path, visited_order, g_curr
-
-        for nxt in nbrs(grid, *current):
-            step = cell_cost(grid[nxt[0]][nxt[1]])
-            if step == float("inf"):
+    pops = expanded = peak_open = 0
+    best, meet = inf, None
+
+    with stats.phase("search"):
+        while heap_f and heap_b:
+            if heap_f[0][0] + heap_b[0][0] >= best:
+                break
+            forward = len(heap_f) <= len(heap_b)
+            if forward:
+                heap, g, other_g, parent, sign = heap_f, g_f, g_b, parent_f, 1.0
+            else:
+                heap, g, other_g, parent, sign = heap_b, g_b, g_f, parent_b, -1.0
+
+            _, g_curr, _, u = heapq.heappop(heap)
+            pops += 1
+            if g_curr > g[u]:
                 continue
-            tentative_g = g_curr + step
-            if tentative_g < g.get(nxt, float("inf")):
-                came_from[nxt] = current
-                g[nxt] = tentative_g
-                f = tentative_g + h_fn(nxt, goal)
-                if nxt not in in_open:
+            expanded += 1
+            if on_expand:
+                on_expand(divmod(u, W))
+            if check and not expanded % CHECK_INTERVAL and check(expanded):
+                break
+            # Moving u -> v costs the step into v; the backward search walks v -> u instead.
+            back_step = step_cost[u]
+            for j in range(offsets[u], offsets[u+1]):
+                step = costs[j]
+                if step == inf:
+                    continue
+                if not forward:
+                    step = back_step
+                v = neighbors[j]
+                tentative_g = g_curr + step
+                if tentative_g < g.get(v, inf):
+                    g[v] = tentative_g
+                    parent[v] = u
                     counter += 1
-                    heapq.heappush(open_heap, (f, tentative_g, counter, nxt))
-                    in_open.add(nxt)
-
-    return [], visited_order, None
+                    heapq.heappush(heap, (tentative_g + sign*potential(v), tentative_g, counter, v))
+                    if len(heap_f) + len(heap_b) > peak_open:
+                        peak_open = len(heap_f) + len(heap_b)
+                    if v in other_g and tentative_g + other_g[v] < best:
+                        best, meet = tentative_g + other_g[v], v
+    stats.count(expanded=expanded, pushes=counter + 2, pops=pops, stale_pops=pops - expanded, peak_open=peak_open)
+
+    if meet is None or stats.stopped:
+        return [], stats, None
+    with stats.phase("path"):
+        path = flat_path(parent_f, meet, W)
+        node = meet
+        while node in parent_b:
+            node = parent_b[node]
+            path.append(divmod(node, W))
+    return path, stats, best
@@ -0,0 +1,166 @@
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from .grid import Grid, as_grid
+from .bfs import distance_field
+from .dijkstra import shortest_path_tree
+
+Coord = Tuple[int, int]
+
+# Distance to a cell no path reaches, in integral (uint32) tables.
+UNREACHED = np.iinfo(np.uint32).max
+
+
+def landmark_path(maze_path: str, landmarks: int, diagonals: bool) -> str:
+    """Where the landmark table of a maze file is persisted: next to the maze."""
+    return f"{maze_path}.alt{landmarks}{'d' if diagonals else ''}.npz"
+
+
+class LandmarkTable:
+    """
+    ALT (A*, Landmarks, Triangle inequality; Goldberg & Harrelson 2005)
+    preprocessing of a grid: k landmark cells and the shortest-path cost from
+    each of them to every cell. Landmarks are picked by farthest-point
+    selection inside the largest component, so they end up in the far corners
+    and dead ends of the maze, where the bounds are tightest.
+
+    Distances are uint32 when every step cost is an integer (UNREACHED marks
+    cells no path reaches) and float32 otherwise (inf), k * H * W * 4 bytes in
+    all. Built once per (grid, k, diagonals); save()/load() persist the table
+    so later sessions skip the k full searches. The table describes the maze
+    it was built from: rebuild it after set_cell.
+    """
+
+    def __init__(self, grid, landmarks: int=8, diagonals: bool=False,
+                 cells: Optional[List[Coord]]=None, distances: Optional[np.ndarray]=None):
+        if landmarks < 1:
+            raise ValueError("at least one landmark is needed")
+        self.grid = as_grid(grid)
+        self.diagonals = diagonals
+        self.integral = self.grid.adjacency(diagonals).integer_costs() is not None
+        if distances is None:
+            cells, distances = self._build(landmarks)
+        self.cells = cells
+        self.distances = distances
+        step = self.grid.step_cost
+        finite = step[np.isfinite(step)]
+        self.min_step = (int(finite.min()) if self.integral else float(finite.min())) if len(finite) else 1
+        if self.grid.uniform:
+            self._cell_cost = None
+        else:
+            cell_cost = np.where(np.isfinite(step), step, 0)
+            self._cell_cost = memoryview(cell_cost.astype(np.uint32 if self.integral else np.float32))
+        # Float tables round each distance to float32: shave the bounds by the largest such error.
+        reached = distances[distances != (UNREACHED if self.integral else np.inf)]
+        self._slack = 0 if self.integral or not len(reached) else float(reached.max()) * 2.0**-22
+        self._views = [memoryview(row) for row in distances]
+
+    @property
+    def landmarks(self) -> int:
+        return len(self.cells)
+
+    @property
+    def nbytes(self) -> int:
+        return self.distances.nbytes
+
+    def matches(self, grid: Grid, diagonals: bool) -> bool:
+        return self.grid is grid and self.diagonals == diagonals
+
+    def _tree(self, cell: Coord) -> np.ndarray:
+        """Flat float64 costs from `cell` to every cell, inf where unreachable."""
+        if self.grid.uniform:
+            steps = distance_field(self.grid, cell, diagonals=self.diagonals).reshape(-1)
+            return np.where(steps >= 0, steps, np.inf).astype(np.float64)
+        return shortest_path_tree(self.grid, cell, diagonals=self.diagonals)[0]
+
+    def _build(self, k: int) -> Tuple[List[Coord], np.ndarray]:
+        grid = self.grid
+        W, n = grid.width, grid.height * grid.width
+        comps = grid.components(self.diagonals)
+        inside = comps.labels == comps.largest() if comps.count else np.zeros(n, dtype=bool)
+        k = min(k, int(inside.sum()))
+        dtype = np.uint32 if self.integral else np.float32
+        distances = np.empty((k, n), dtype=dtype)
+        cells = []
+        if not k:
+            return cells, distances
+        # Seed with the farthest cell from an arbitrary one, then keep adding the
+        # cell farthest from every landmark chosen so far.
+        nearest = np.where(inside, self._tree(divmod(int(np.argmax(inside)), W)), -1.0)
+        for i in range(k):
+            cell = divmod(int(np.argmax(nearest)), W)
+            dist = self._tree(cell)
+            cells.append(cell)
+            if self.integral:
+                distances[i] = np.where(np.isfinite(dist), dist, UNREACHED)
+            else:
+                distances[i] = dist
+            nearest = np.minimum(nearest, np.where(inside, dist, -1.0)) if i else np.where(inside, dist, -1.0)
+        return cells, distances
+
+    def heuristic(self, goal: Coord) -> Callable[[int], float]:
+        """
+        Lower bound on the cost from flat cell v to `goal`. Costs are paid on
+        entering a cell, so with D = distances from landmark L and c the cell
+        costs, the cost v -> goal is at least D(goal) - D(v) and at least
+        D(v) - D(goal) + c(goal) - c(v). The best bound over the landmarks that
+        reach the goal is combined with the geometric distance times the
+        cheapest step. The result is consistent, and integral when the table is.
+        """
+        W = self.grid.width
+        gr, gc = goal
+        t = gr * W + gc
+        missing = UNREACHED if self.integral else float("inf")
+        active = [(view, view[t]) for view in self._views if view[t] != missing]
+        slack, min_step, diagonals = self._slack, self.min_step, self.diagonals
+        cell_cost = self._cell_cost
+        goal_cost = None if cell_cost is None else cell_cost[t]
+
+        if cell_cost is None:
+            # Uniform costs: c(goal) = c(v), so both bounds are |D(goal) - D(v)|.
+            def h(v: int) -> float:
+                r, c = divmod(v, W)
+                dr, dc = abs(r - gr), abs(c - gc)
+                best = max(dr, dc) if diagonals else dr + dc
+                for view, dt in active:
+                    bound = abs(dt - view[v])
+                    if bound > best:
+                        best = bound
+                return best
+            return h
+
+        def h(v: int) -> float:
+            r, c = divmod(v, W)
+            dr, dc = abs(r - gr), abs(c - gc)
+            best = (max(dr, dc) if diagonals else dr + dc) * min_step
+            entry = goal_cost - cell_cost[v]
+            for view, dt in active:
+                dv = view[v]
+                bound = max(dt - dv, dv - dt + entry) - slack
+                if bound > best:
+                    best = bound
+            return best
+        return h
+
+    # ---------------------- Persistence ----------------------
+    def save(self, path: str, digest: str="") -> None:
+        """Write the table to a .npz; `digest` identifies the maze it belongs to."""
+        with open(path, "wb") as fh:
+            np.savez(fh, shape=np.asarray(self.grid.shape, dtype=np.int64),
+                     diagonals=np.bool_(self.diagonals), digest=np.str_(digest),
+                     cells=np.asarray(self.cells, dtype=np.int32).reshape(-1, 2), distances=self.distances)
+
+    @classmethod
+    def load(cls, path: str, grid, digest: Optional[str]=None) -> "LandmarkTable":
+        """Read a saved table for `grid`; raises ValueError if it belongs to another maze."""
+        grid = as_grid(grid)
+        with np.load(path) as data:
+            if tuple(data["shape"].tolist()) != grid.shape or (digest and str(data["digest"]) != digest):
+                raise ValueError(f"{path}: landmark table was built for a different maze")
+            cells = [tuple(c) for c in data["cells"].tolist()]
+            distances = np.ascontiguousarray(data["distances"])
+            table = cls(grid, max(1, len(cells)), bool(data["diagonals"]), cells, distances)
+        if (distances.dtype == np.uint32) != table.integral:
+            raise ValueError(f"{path}: landmark table was built for a different maze")
+        return table
@@ -0,0 +1,174 @@
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+import heapq
+import time
+
+from .graph import flat_path
+from .grid import as_grid
+from .stats import CHECK_INTERVAL, SearchStats
+from .a_star import flat_heuristic
+
+Coord = Tuple[int, int]
+
+# The clock is read every DEADLINE_INTERVAL expansions.
+DEADLINE_INTERVAL = 64
+
+
+class Solution(NamedTuple):
+    path: List[Coord]
+    cost: float
+    bound: float      # cost <= bound * optimal cost
+    weight: float     # heuristic inflation the search ran with
+    expanded: int     # nodes expanded so far, over all iterations
+    elapsed: float    # seconds since the search started
+
+
+def solutions(grid, start: Coord, goal: Coord, *, diagonals: bool=False, heuristic: str="manhattan",
+              weight: float=3.0, weight_step: float=0.5, deadline: Optional[float]=None,
+              max_expansions: Optional[int]=None, stats: Optional[SearchStats]=None) -> Iterator[Solution]:
+    """
+    Anytime Repairing A* (ARA*, Likhachev, Gordon & Thrun 2003). Yields a
+    sequence of improving solutions: the first comes from weighted A* with
+    f = g + weight * h, then the weight drops by `weight_step` (down to 1)
+    and the search resumes from the nodes whose g improved, reusing all
+    earlier g-values instead of starting over. Each solution carries the
+    suboptimality bound proven for it, min(weight, cost / min(g + h) over
+    the open and inconsistent nodes); the last one has bound 1.0 (optimal)
+    unless the budget ran out first.
+
+    deadline: seconds from the call; max_expansions: total expansions over
+    all iterations. When either runs out the generator stops and sets
+    stats.stopped ("time budget" or "max expansions"). The heuristic must be
+    admissible for the bound to hold (manhattan on 4-connected grids,
+    chebyshev with diagonals, costs >= 1).
+    """
+    stats = SearchStats() if stats is None else stats
+    with stats.phase("setup"):
+        grid = as_grid(grid)
+    if not grid.walkable(*start) or not grid.walkable(*goal) or not grid.connected(start, goal, diagonals):
+        return
+    t0 = time.perf_counter()
+    if start == goal:
+        stats.count(expanded=1)
+        stats.bound = 1.0
+        yield Solution([start], 0.0, 1.0, 1.0, 1, 0.0)
+        return
+
+    W = grid.width
+    h_fn = flat_heuristic(heuristic, goal, W)
+    offsets, neighbors, costs = grid.adjacency(diagonals).views()
+    step_cost = grid.step_view
+    on_expand = stats.recorder()
+    check = stats.checkpoint()
+    stop_at = None if deadline is None else t0 + deadline
+    limit = float("inf") if max_expansions is None else max_expansions
+    inf = float("inf")
+
+    s, t = start[0]*W + start[1], goal[0]*W + goal[1]
+    g = {s: 0.0}
+    h = {s: h_fn(s)}
+    came_from = {}
+    open_set = {s}   # nodes on the open list (heap entries for other nodes are stale)
+    incons = set()       # improved after being closed in this iteration; reopened next iteration
+    eps = max(1.0, weight)
+    counter = 0
+    open_heap = [(eps * h[s], 0.0, counter, s)]
+    pushes, pops, expanded, peak_open = 1, 0, 0, 1
+    last = None
+
+    try:
+        while True:
+            closed = set()
+            with stats.phase("search"):
+                while open_heap:
+                    key, g_curr, _, u = open_heap[0]
+                    if g.get(t, inf) <= key:
+                        break
+                    heapq.heappop(open_heap)
+                    pops += 1
+                    if u not in open_set or g_curr > g[u]:
+                        continue
+                    open_set.discard(u)
+                    closed.add(u)
+                    expanded += 1
+                    if on_expand:
+                        on_expand(divmod(u, W))
+                    if expanded >= limit:
+                        stats.stopped = "max expansions"
+                    elif stop_at is not None and not expanded % DEADLINE_INTERVAL and time.perf_counter() > stop_at:
+                        stats.stopped = "time budget"
+                    elif check and not expanded % CHECK_INTERVAL:
+                        check(expanded)
+                    if stats.stopped:
+                        break
+
+                    for j in range(offsets[u], offsets[u+1]):
+                        step = costs[j]
+                        if step == inf:
+                            continue
+                        v = neighbors[j]
+                        tentative_g = g_curr + step
+                        if tentative_g < g.get(v, inf):
+                            g[v] = tentative_g
+                            came_from[v] = u
+                            if v in closed:
+                                incons.add(v)
+                                continue
+                            if v not in h:
+                                h[v] = h_fn(v)
+                            open_set.add(v)
+                            counter += 1
+                            heapq.heappush(open_heap, (tentative_g + eps * h[v], tentative_g, counter, v))
+                            pushes += 1
+                            if len(open_heap) > peak_open:
+                                peak_open = len(open_heap)
+
+            if t not in g:
+                break
+            with stats.phase("path"):
+                path = flat_path(came_from, t, W)
+                # Parents may have improved since the goal was reached, so the path can be cheaper than g[t].
+                cost = float(sum(step_cost[r*W + c] for r, c in path[1:]))
+            if stats.stopped and last is not None and cost >= last.cost:
+                break  # nothing better found before the budget ran out
+            # Every optimal path still runs through an open or inconsistent node whose g is
+            # exact, so the smallest g + h among them bounds the optimal cost from below.
+            lower = min((g[v] + h[v] for v in open_set | incons), default=inf)
+            bound = 1.0 if cost <= lower else cost / lower
+            if not stats.stopped:
+                bound = min(bound, eps)   # a completed iteration is eps-suboptimal
+            elif last is not None:
+                bound = min(bound, last.bound)
+            stats.bound = bound
+            last = Solution(path, cost, bound, eps, expanded, time.perf_counter() - t0)
+            yield last
+            if bound <= 1.0 or stats.stopped:
+                break
+
+            # Tighten the weight; reopen the inconsistent nodes and re-key the open list.
+            eps = max(1.0, min(eps - weight_step, bound))
+            open_set |= incons
+            incons = set()
+            open_heap = [(g[v] + eps * h[v], g[v], i, v) for i, v in enumerate(open_set, counter + 1)]
+            counter += len(open_heap)
+            heapq.heapify(open_heap)
+    finally:
+        stats.count(expanded=expanded, pushes=pushes, pops=pops, stale_pops=pops - expanded, peak_open=peak_open)
+
+
+def find_path(grid, start: Coord, goal: Coord, *, diagonals: bool=False, heuristic: str="manhattan",
+              weight: float=3.0, weight_step: float=0.5, deadline: Optional[float]=None,
+              max_expansions: Optional[int]=None,
+              stats: Optional[SearchStats]=None) -> tuple[list[Coord], SearchStats, float|None]:
+    """
+    Best path ARA* finds within the budget (see solutions()); with no deadline
+    or max_expansions this is an optimal path. Returns (path, stats, total_cost)
+    like a_star.find_path, with the proven suboptimality bound in stats.bound.
+    """
+    stats = SearchStats() if stats is None else stats
+    best = None
+    for best in solutions(grid, start, goal, diagonals=diagonals, heuristic=heuristic, weight=weight,
+                          weight_step=weight_step, deadline=deadline, max_expansions=max_expansions, stats=stats):
+        pass
+    if best is None:
+        return [], stats, None
+    return best.path, stats, best.cost
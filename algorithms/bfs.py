@@ -1,82 +1,237 @@
-
 from typing import List, Tuple, Optional, Callable, Iterable
 from collections import deque
 import heapq
 
+import numpy as np
+
+from .graph import OFFSETS4, OFFSETS8
+from .grid import as_grid
+from .stats import CHECK_INTERVAL, SearchStats
+
 Coord = Tuple[int, int]
 
-def in_bounds(grid: List[List[float]], r: int, c: int) -> bool:
-    return 0 <= r < len(grid) and 0 <= c < len(grid[0])
-
-def is_blocked(val) -> bool:
-    return val in (1, '#', False)
-
-def cell_cost(val) -> float:
-    # If the cell stores a numeric cost > 1, use it; otherwise cost=1 for traversable cells.
-    try:
-        v = float(val)
-        if v <= 0 or v == 1.0:  # treat 1 as wall by default; adjust if your grid differs
-            return 1.0 if v == 0.0 else float("inf")
-        return v
-    except Exception:
-        return 1.0
-
-def walkable(grid: List[List[float]], r: int, c: int) -> bool:
-    if not in_bounds(grid, r, c):
-        return False
-    return not is_blocked(grid[r][c])
-
-def neighbors4(grid: List[List[float]], r: int, c: int) -> Iterable[Coord]:
-    for dr, dc in ((1,0),(-1,0),(0,1),(0,-1)):
-        nr, nc = r+dr, c+dc
-        if walkable(grid, nr, nc):
-            yield (nr, nc)
-
-def neighbors8(grid: List[List[float]], r: int, c: int) -> Iterable[Coord]:
-    for dr, dc in ((1,0),(-1,0),(0,1),(0,-1),(1,1),(1,-1),(-1,1),(-1,-1)):
-        nr, nc = r+dr, c+dc
-        if walkable(grid, nr, nc):
-            yield (nr, nc)
-
-def reconstruct_path(came_from: dict, current: Coord) -> List[Coord]:
-    path = [current]
-    while current in came_from:
-        current = came_from[current]
-        path.append(current)
-    path.reverse()
-    return path
 
-def manhattan(a: Coord, b: Coord) -> int:
-    return abs(a[0]-b[0]) + abs(a[1]-b[1])
+def distance_field(grid, start: Coord, *, diagonals: bool=False, goal: Coord|None=None) -> np.ndarray:
+    """
+    Vectorized wavefront BFS. Returns an int32 (H, W) array of step counts from
+    `start`; unreachable cells and walls are -1. If `goal` is given the wave stops
+    at the layer that reaches it.
 
-def euclidean(a: Coord, b: Coord) -> float:
-    return ((a[0]-b[0])**2 + (a[1]-b[1])**2) ** 0.5
+    Each layer is expanded with NumPy: the frontier's flat indices are shifted by
+    the neighbor offsets on a wall-padded mask, so no bounds checks are needed and
+    the per-layer cost is proportional to the frontier, not to the whole grid.
+    """
+    grid = as_grid(grid)
+    H, W = grid.shape
+    if not grid.walkable(*start):
+        return np.full((H, W), -1, dtype=np.int32)
+
+    Wp = W + 2
+    # Padded "not yet reached" mask; the border ring stays False and acts as walls.
+    open_ = np.zeros((H + 2, Wp), dtype=bool)
+    open_[1:-1, 1:-1] = grid.wall_array() == 0
+    open_ = open_.reshape(-1)
+    dist = np.full(open_.size, -1, dtype=np.int32)
+    offsets = np.array([dr*Wp + dc for dr, dc in (OFFSETS8 if diagonals else OFFSETS4)], dtype=np.intp)
+
+    s = (start[0] + 1) * Wp + start[1] + 1
+    g = None if goal is None else (goal[0] + 1) * Wp + goal[1] + 1
+    dist[s] = 0
+    open_[s] = False
+    frontier = np.array([s], dtype=np.intp)
+    d = 0
+    while frontier.size and s != g:
+        d += 1
+        cand = (frontier[:, None] + offsets).ravel()
+        cand = np.unique(cand[open_[cand]])
+        if not cand.size:
+            break
+        open_[cand] = False
+        dist[cand] = d
+        if g is not None and dist[g] >= 0:
+            break
+        frontier = cand
+
+    return np.ascontiguousarray(dist.reshape(H + 2, Wp)[1:-1, 1:-1])
+
+
+def path_from_field(dist: np.ndarray, goal: Coord, *, diagonals: bool=False) -> list[Coord]:
+    """
+    Recover a shortest path by descending the distance field from `goal` back to
+    the source (the cell with distance 0). Returns [] if `goal` was not reached.
+    Raises ValueError if the field was not built with the same `diagonals`.
+    """
+    H, W = dist.shape
+    r, c = goal
+    if not (0 <= r < H and 0 <= c < W) or dist[r, c] < 0:
+        return []
+    offsets = OFFSETS8 if diagonals else OFFSETS4
+    d = int(dist[r, c])
+    path = [(r, c)]
+    while d > 0:
+        for dr, dc in offsets:
+            nr, nc = r+dr, c+dc
+            if 0 <= nr < H and 0 <= nc < W and dist[nr, nc] == d - 1:
+                r, c, d = nr, nc, d - 1
+                path.append((r, c))
+                break
+        else:
+            raise ValueError(f"no neighbor of {(r, c)} is one step closer: "
+                             f"was the field built with diagonals={not diagonals}?")
+    path.reverse()
+    return path
 
 
-def find_path(grid, start: Coord, goal: Coord, *, diagonals: bool=False) -> tuple[list[Coord], list[Coord], int|None]:
+def find_path(grid, start: Coord, goal: Coord, *, diagonals: bool=False,
+              wavefront: bool=False, bidirectional: bool=False,
+              stats: Optional[SearchStats]=None) -> tuple[list[Coord], SearchStats, int|None]:
+    """
+    Unweighted shortest path (each move cost=1). Returns (path, stats, steps).
+    With wavefront=True the search runs as a vectorized distance_field() and the
+    path is recovered by gradient descent; a recorded visited order is then in layer order.
+    bidirectional=True alternates BFS layers from both ends (see find_path_bidirectional).
+    """
+    stats = SearchStats() if stats is None else stats
+    with stats.phase("setup"):
+        grid = as_grid(grid)
+    if not grid.walkable(*start) or not grid.walkable(*goal) or not grid.connected(start, goal, diagonals):
+        return [], stats, None
+    if bidirectional:
+        return find_path_bidirectional(grid, start, goal, diagonals=diagonals, stats=stats)
+    on_expand = stats.recorder()
+
+    if wavefront:
+        with stats.phase("search"):
+            dist = distance_field(grid, start, diagonals=diagonals, goal=goal)
+            flat = dist.reshape(-1)
+            reached = np.flatnonzero(flat >= 0)
+            layers = np.bincount(flat[reached])
+        stats.count(expanded=len(reached), pushes=len(reached), pops=len(reached), peak_open=int(layers.max()))
+        if on_expand:
+            reached = reached[np.argsort(flat[reached], kind="stable")]
+            rows, cols = np.divmod(reached, grid.width)
+            for node in zip(rows.tolist(), cols.tolist()):
+                on_expand(node)
+        with stats.phase("path"):
+            path = path_from_field(dist, goal, diagonals=diagonals)
+        return path, stats, (len(path)-1 if path else None)
+
+    W = grid.width
+    offsets, neighbors, costs = grid.adjacency(diagonals).views()
+    inf = float("inf")
+    check = stats.checkpoint()
+    s, t = start[0]*W + start[1], goal[0]*W + goal[1]
+    q = deque([s])
+    pushes, pops, peak_open = 1, 0, 0
+    found = False
+
+    with grid.search_workspace() as workspace:
+        generation, visited, _, came_from = workspace.begin()
+        visited[s], came_from[s] = generation, -1
+        with stats.phase("search"):
+            while q:
+                if len(q) > peak_open:
+                    peak_open = len(q)
+                u = q.popleft()
+                pops += 1
+                if on_expand:
+                    on_expand(divmod(u, W))
+                if check and not pops % CHECK_INTERVAL and check(pops):
+                    break
+                if u == t:
+                    found = True
+                    break
+
+                for j in range(offsets[u], offsets[u+1]):
+                    if costs[j] == inf:
+                        continue
+                    v = neighbors[j]
+                    if visited[v] != generation:
+                        visited[v] = generation
+                        came_from[v] = u
+                        pushes += 1
+                        q.append(v)
+        stats.count(expanded=pops, pushes=pushes, pops=pops, peak_open=peak_open)
+
+        if not found:
+            return [], stats, None
+        with stats.phase("path"):
+            path = workspace.path(t, W)
+        return path, stats, len(path)-1
+
+
+def find_path_bidirectional(grid, start: Coord, goal: Coord, *, diagonals: bool=False,
+                            stats: Optional[SearchStats]=None) -> tuple[list[Coord], SearchStats, int|None]:
     """
-    Unweighted shortest path (each move cost=1). Returns (path, visited_order, steps).
+    Bidirectional BFS: expands one full layer at a time from whichever side has
+    the smaller frontier. The first meeting found while expanding a layer lies on
+    a shortest path, so the search stops there.
     """
-    if not walkable(grid, *start) or not walkable(grid, *goal):
-        return [], [], None
-
-    nbrs = neighbors8 if diagonals else neighbors4
-    q = deque([start])
-    visited = {start}
-    came_from = {}
-    visited_order = []
-
-    while q:
-        u = q.popleft()
-        visited_order.append(u)
-        if u == goal:
-            path = reconstruct_path(came_from, u)
-            return path, visited_order, len(path)-1
-
-        for v in nbrs(grid, *u):
-            if v not in visited:
-                visited.add(v)
-                came_from[v] = u
-                q.append(v)
-
-    return [], visited_order, None
+    stats = SearchStats() if stats is None else stats
+    with stats.phase("setup"):
+        grid = as_grid(grid)
+    if not grid.walkable(*start) or not grid.walkable(*goal) or not grid.connected(start, goal, diagonals):
+        return [], stats, None
+    if start == goal:
+        stats.count(expanded=1)
+        return [start], stats, 0
+
+    W = grid.width
+    offsets, neighbors, costs = grid.adjacency(diagonals).views()
+    inf = float("inf")
+    on_expand = stats.recorder()
+    check = stats.checkpoint()
+    s, t = start[0]*W + start[1], goal[0]*W + goal[1]
+    parent_f = {s: None}
+    parent_b = {t: None}
+    frontier_f, frontier_b = [s], [t]
+    expanded = peak_open = 0
+    meet = None
+
+    with stats.phase("search"):
+        while frontier_f and frontier_b:
+            peak_open = max(peak_open, len(frontier_f) + len(frontier_b))
+            forward = len(frontier_f) <= len(frontier_b)
+            frontier, parent, other = (frontier_f, parent_f, parent_b) if forward else (frontier_b, parent_b, parent_f)
+            layer = []
+            for u in frontier:
+                expanded += 1
+                if on_expand:
+                    on_expand(divmod(u, W))
+                if check and not expanded % CHECK_INTERVAL and check(expanded):
+                    break
+                for j in range(offsets[u], offsets[u+1]):
+                    if costs[j] == inf:
+                        continue
+                    v = neighbors[j]
+                    if v not in parent:
+                        parent[v] = u
+                        layer.append(v)
+                        if v in other:
+                            meet = v
+                            break
+                if meet is not None:
+                    break
+            if meet is not None or stats.stopped:
+                break
+
+            if forward:
+                frontier_f = layer
+            else:
+                frontier_b = layer
+    stats.count(expanded=expanded, pushes=len(parent_f) + len(parent_b), pops=expanded, peak_open=peak_open)
+
+    if meet is None:
+        return [], stats, None
+    with stats.phase("path"):
+        path = []
+        node = meet
+        while node is not None:
+            path.append(divmod(node, W))
+            node = parent_f[node]
+        path.reverse()
+        node = parent_b[meet]
+        while node is not None:
+            path.append(divmod(node, W))
+            node = parent_b[node]
+    return path, stats, len(path)-1
@@ -0,0 +1,108 @@
+from typing import Optional, Tuple
+import numpy as np
+
+Coord = Tuple[int, int]
+
+
+def label_components(walls: np.ndarray, diagonals: bool=False) -> Tuple[np.ndarray, int]:
+    """
+    Connected components of the free cells of an (H, W) wall mask (nonzero =
+    wall) under 4- or 8-connectivity. Returns (labels, count): int32 (H, W)
+    labels, 0 on walls and 1..count on free cells, numbered in row-major order
+    of each component's first cell.
+
+    Vectorized union-find: every round hooks the root of the larger index
+    onto the smaller for all adjacent free pairs at once (np.minimum.at), then
+    pointer-jumps until every cell points at its root. Rounds stop when no
+    adjacent pair has different roots, typically after a handful of them.
+    """
+    walls = np.asarray(walls)
+    H, W = walls.shape
+    n = H * W
+    free = walls == 0
+    index_dtype = np.int32 if n < 2**31 else np.int64
+    parent = np.arange(n, dtype=index_dtype)
+    # (pair mask, first-cell slices, second-cell slices) per forward direction
+    pairs = []
+    for dr, dc in ((0, 1), (1, 0)) + (((1, 1), (1, -1)) if diagonals else ()):
+        a = (slice(0, H - dr), slice(max(0, -dc), W - max(0, dc)))
+        b = (slice(dr, H), slice(max(0, dc), W + min(0, dc)))
+        pairs.append((free[a] & free[b], a, b))
+
+    while True:
+        merged = False
+        roots = parent.reshape(H, W)
+        for mask, a, b in pairs:
+            ru, rv = roots[a][mask], roots[b][mask]
+            differ = ru != rv
+            if differ.any():
+                merged = True
+                ru, rv = ru[differ], rv[differ]
+                np.minimum.at(parent, np.maximum(ru, rv), np.minimum(ru, rv))
+        if not merged:
+            break
+        while True:
+            jumped = parent[parent]
+            if np.array_equal(jumped, parent):
+                break
+            parent = jumped
+
+    labels = np.zeros(n, dtype=np.int32)
+    flat_free = free.reshape(-1)
+    roots, inverse = np.unique(parent[flat_free], return_inverse=True)
+    labels[flat_free] = inverse + 1
+    return labels.reshape(H, W), len(roots)
+
+
+class Components:
+    """
+    Component labels of a grid, built once per connectivity by
+    Grid.components(). Two cells are joined by some path exactly when both
+    are free and have the same label, so once built, searches use
+    Grid.connected() to answer unreachable queries without exploring anything.
+    """
+
+    def __init__(self, grid, diagonals: bool=False):
+        self.diagonals = diagonals
+        labels, self.count = label_components(grid.wall_array(), diagonals)
+        self.height, self.width = labels.shape
+        self.labels = labels.reshape(-1)
+        self.sizes = np.bincount(self.labels, minlength=self.count + 1)
+        self.sizes[0] = 0
+        self._view = memoryview(self.labels)
+
+    @property
+    def nbytes(self) -> int:
+        return self.labels.nbytes + self.sizes.nbytes
+
+    def label(self, cell: Coord) -> int:
+        """Component of `cell`; 0 for walls."""
+        return self._view[cell[0] * self.width + cell[1]]
+
+    def connected(self, a: Coord, b: Coord) -> bool:
+        la = self.label(a)
+        return la != 0 and la == self.label(b)
+
+    def size(self, cell: Coord) -> int:
+        return int(self.sizes[self.label(cell)])
+
+    def largest(self) -> int:
+        """Label of the biggest component (0 if the grid has no free cell)."""
+        return int(np.argmax(self.sizes)) if self.count else 0
+
+    def nearest(self, label: int, target: Coord) -> Optional[Coord]:
+        """The cell of component `label` closest (Euclidean) to `target`, or None for an empty label."""
+        cells = np.flatnonzero(self.labels == label) if label else np.empty(0, dtype=np.int64)
+        if not len(cells):
+            return None
+        r, c = np.divmod(cells, self.width)
+        best = int(np.argmin((r - target[0]) ** 2 + (c - target[1]) ** 2))
+        return int(r[best]), int(c[best])
+
+    def reachable_goal(self, start: Coord, target: Coord) -> Optional[Coord]:
+        """`target` if start can reach it, else the cell reachable from start nearest to it."""
+        label = self.label(start)
+        inside = 0 <= target[0] < self.height and 0 <= target[1] < self.width
+        if label and inside and self.label(target) == label:
+            return target
+        return self.nearest(label, target)
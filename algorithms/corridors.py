@@ -0,0 +1,212 @@
+from typing import List, Tuple, Optional, Dict
+import heapq
+
+import numpy as np
+
+from .graph import INF, OFFSETS4, OFFSETS8
+from .grid import Grid, as_grid
+from .a_star import HEURISTICS, euclidean
+from .stats import CHECK_INTERVAL, SearchStats
+
+Coord = Tuple[int, int]
+
+
+def free_degree(grid: Grid, diagonals: bool=False) -> np.ndarray:
+    """(H, W) int8 count of walkable neighbors of each free cell (0 for walls)."""
+    H, W = grid.shape
+    free = np.zeros((H + 2, W + 2), dtype=np.int8)
+    free[1:-1, 1:-1] = grid.wall_array() == 0
+    deg = np.zeros((H, W), dtype=np.int8)
+    for dr, dc in (OFFSETS8 if diagonals else OFFSETS4):
+        deg += free[1+dr:H+1+dr, 1+dc:W+1+dc]
+    deg *= free[1:-1, 1:-1]
+    return deg
+
+
+class CorridorGraph:
+    """
+    Junction graph of a maze: every free cell whose degree is not 2 (junctions,
+    dead ends, open-area cells) is a node, and every run of degree-2 corridor
+    cells between two nodes becomes one directed edge weighted by the sum of
+    step costs along it. Only the first corridor cell of an edge is stored; the
+    pixel path is recovered by re-walking the corridor.
+    Built once per (grid, diagonals).
+    """
+
+    def __init__(self, grid, diagonals: bool=False):
+        grid = as_grid(grid)
+        self.grid = grid
+        self.diagonals = diagonals
+        self._views = grid.adjacency(diagonals).views()
+        self.is_node = free_degree(grid, diagonals).reshape(-1) != 2
+        self.is_node &= grid.walls == 0
+        # node -> [(target node, cost, first cell), ...]; all keyed by flat cell index
+        self.adj: Dict[int, List[Tuple[int, float, int]]] = {}
+        step = grid.step_view
+        for u in np.flatnonzero(self.is_node).tolist():
+            edges = []
+            for f in self._free_neighbors(u):
+                v, cost = self._walk(u, f, step)
+                if v is not None and v != u:
+                    edges.append((v, cost, f))
+            self.adj[u] = edges
+
+    @property
+    def node_count(self) -> int:
+        return len(self.adj)
+
+    @property
+    def edge_count(self) -> int:
+        return sum(len(e) for e in self.adj.values())
+
+    def matches(self, grid: Grid, diagonals: bool) -> bool:
+        return self.grid is grid and self.diagonals == diagonals
+
+    def _free_neighbors(self, i: int) -> List[int]:
+        offsets, neighbors, costs = self._views
+        return [neighbors[j] for j in range(offsets[i], offsets[i+1]) if costs[j] != INF]
+
+    def _next(self, prev: int, cur: int) -> int:
+        """The other neighbor of a degree-2 corridor cell."""
+        a, b = self._free_neighbors(cur)
+        return b if a == prev else a
+
+    def _walk(self, u: int, first: int, step) -> Tuple[Optional[int], float]:
+        """Follow a corridor from node u through `first` to the next node."""
+        is_node = self.is_node
+        prev, cur = u, first
+        cost = step[cur]
+        while not is_node[cur]:
+            prev, cur = cur, self._next(prev, cur)
+            if cur == first:
+                return None, cost  # loop of corridor cells with no node on it
+            cost += step[cur]
+        return cur, cost
+
+    def cells(self, u: int, first: int, target: int) -> List[int]:
+        """Corridor cells from u (exclusive) to target (inclusive) starting at `first`."""
+        out = [first]
+        prev, cur = u, first
+        while cur != target:
+            prev, cur = cur, self._next(prev, cur)
+            out.append(cur)
+        return out
+
+    def _endpoint_edges(self, s: int, other: int, step):
+        """
+        Temporary edges for a query endpoint lying inside a corridor: walk both ways
+        to the nearest node (or the other endpoint). Returns (out_edges, in_edges) where
+        in_edges maps a node to (cost into s, first cell after that node).
+        """
+        out_edges, in_edges = [], {}
+        for f in self._free_neighbors(s):
+            cells = [s, f]
+            prev, cur = s, f
+            cost_out = step[f]
+            while not self.is_node[cur] and cur != other and cur != s:
+                prev, cur = cur, self._next(prev, cur)
+                cells.append(cur)
+                cost_out += step[cur]
+            if cur == s:
+                continue
+            out_edges.append((cur, cost_out, f))
+            # Reverse direction: enter every cell from cells[-2] back to s.
+            cost_in = sum(step[x] for x in cells[:-1])
+            if cur not in in_edges or cost_in < in_edges[cur][0]:
+                in_edges[cur] = (cost_in, cells[-2])
+        return out_edges, in_edges
+
+
+def find_path(grid, start: Coord, goal: Coord, *, diagonals: bool=False,
+              heuristic: str|None=None, graph: Optional[CorridorGraph]=None,
+              stats: Optional[SearchStats]=None) -> tuple[list[Coord], SearchStats, float|None]:
+    """
+    Shortest path searched on the contracted corridor graph instead of pixels.
+    Returns: (path, stats, total_cost) like a_star.find_path; path is the full
+    pixel path, stats count (and record) the expanded graph nodes. heuristic=None
+    runs Dijkstra on the graph, otherwise A* with the named heuristic.
+    Pass a prebuilt CorridorGraph to reuse the contraction across queries.
+    """
+    stats = SearchStats() if stats is None else stats
+    with stats.phase("setup"):
+        grid = as_grid(grid)
+        if not grid.walkable(*start) or not grid.walkable(*goal) or not grid.connected(start, goal, diagonals):
+            return [], stats, None
+        if graph is None:
+            graph = CorridorGraph(grid, diagonals)
+        elif not graph.matches(grid, diagonals):
+            raise ValueError("corridor graph was built for a different maze or connectivity")
+
+    W = grid.width
+    step = grid.step_view
+    s, t = start[0]*W + start[1], goal[0]*W + goal[1]
+    if s == t:
+        stats.count(expanded=1)
+        return [start], stats, 0.0
+
+    # Query endpoints inside corridors become temporary nodes.
+    extra_out: Dict[int, list] = {}
+    into_t: Dict[int, Tuple[float, int]] = {}
+    if not graph.is_node[s]:
+        extra_out[s], _ = graph._endpoint_edges(s, t, step)
+    if not graph.is_node[t]:
+        extra_out[t], into_t = graph._endpoint_edges(t, s, step)
+
+    if heuristic is None:
+        h = lambda i: 0.0
+    else:
+        h_fn = HEURISTICS.get(heuristic, euclidean)
+        h = lambda i: h_fn(divmod(i, W), goal)
+    on_expand = stats.recorder()
+    check = stats.checkpoint()
+
+    g = {s: 0.0}
+    came_from: Dict[int, Tuple[int, int]] = {}
+    open_heap = [(h(s), 0.0, s)]
+    inf = float("inf")
+    pushes, pops, expanded, peak_open = 1, 0, 0, 1
+    found = False
+
+    with stats.phase("search"):
+        while open_heap:
+            _, g_curr, u = heapq.heappop(open_heap)
+            pops += 1
+            if g_curr > g[u]:
+                continue
+            expanded += 1
+            if on_expand:
+                on_expand(divmod(u, W))
+            if check and not expanded % CHECK_INTERVAL and check(expanded):
+                break
+            if u == t:
+                found = True
+                break
+            edges = extra_out[u] if u in extra_out else graph.adj[u]
+            if u in into_t:
+                cost, first = into_t[u]
+                edges = edges + [(t, cost, first)]
+            for v, cost, first in edges:
+                tentative_g = g_curr + cost
+                if tentative_g < g.get(v, inf):
+                    g[v] = tentative_g
+                    came_from[v] = (u, first)
+                    heapq.heappush(open_heap, (tentative_g + h(v), tentative_g, v))
+                    pushes += 1
+                    if len(open_heap) > peak_open:
+                        peak_open = len(open_heap)
+    stats.count(expanded=expanded, pushes=pushes, pops=pops, stale_pops=pops - expanded, peak_open=peak_open)
+    if not found:
+        return [], stats, None
+
+    # Expand node-to-node edges back into pixels.
+    with stats.phase("path"):
+        cells = []
+        v = t
+        while v in came_from:
+            u, first = came_from[v]
+            cells.append(graph.cells(u, first, v))
+            v = u
+        path = [start]
+        for seg in reversed(cells):
+            path.extend(divmod(i, W) for i in seg)
+    return path, stats, g[t]
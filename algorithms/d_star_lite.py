@@ -0,0 +1,152 @@
+from typing import List, Tuple, Optional, Iterable
+import heapq
+
+from .grid import as_grid
+from .a_star import HEURISTICS, euclidean, flat_heuristic
+
+Coord = Tuple[int, int]
+INF = float("inf")
+
+
+class DStarLite:
+    """
+    Incremental planner (D* Lite, Koenig & Likhachev 2002). The search runs
+    backwards from the goal and keeps its g/rhs values and open list between
+    calls, so after a few cells change only the affected part of the
+    shortest-path tree is repaired. The start may move between calls.
+
+        planner = DStarLite(grid, start, goal)
+        path = planner.path()
+        grid.set_cell(r, c, wall=True)
+        planner.update([(r, c)])
+        path = planner.path()
+
+    Moving u -> v costs the step cost of v, as in a_star.find_path. The
+    heuristic must be consistent for the paths to be optimal (manhattan on
+    4-connected grids, chebyshev with diagonals, costs >= 1). g and rhs are
+    keyed by flat cell index r*W + c; the grid's adjacency is patched by
+    set_cell, so it stays valid across updates.
+    """
+
+    def __init__(self, grid, start: Coord, goal: Coord, *, diagonals: bool=False,
+                 heuristic: str="manhattan"):
+        self.grid = as_grid(grid)
+        self.start = start
+        self.goal = goal
+        self.diagonals = diagonals
+        self._heuristic = heuristic
+        self._h = HEURISTICS.get(heuristic, euclidean)
+        self._views = self.grid.adjacency(diagonals).views()
+        W = self.grid.width
+        self._s, self._t = start[0]*W + start[1], goal[0]*W + goal[1]
+        self._h_start = flat_heuristic(heuristic, start, W)
+        self._km = 0.0
+        self._last = start
+        self.g = {}
+        self.rhs = {self._t: 0.0}
+        self._open = {}   # node -> current key; heap entries with another key are stale
+        self._heap = []
+        self.expanded = 0  # nodes expanded by the most recent repair
+        self._push(self._t)
+
+    # ---------------------- Queue ----------------------
+    def _key(self, s: int) -> Tuple[float, float]:
+        m = min(self.g.get(s, INF), self.rhs.get(s, INF))
+        return (m + self._h_start(s) + self._km, m)
+
+    def _push(self, s: int) -> None:
+        key = self._key(s)
+        self._open[s] = key
+        heapq.heappush(self._heap, (key, s))
+
+    def _top(self):
+        heap, open_ = self._heap, self._open
+        while heap and open_.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+        return heap[0] if heap else None
+
+    # ---------------------- D* Lite ----------------------
+    def _free_neighbors(self, u: int):
+        offsets, neighbors, costs = self._views
+        return [(neighbors[j], costs[j]) for j in range(offsets[u], offsets[u+1]) if costs[j] != INF]
+
+    def _update_vertex(self, u: int) -> None:
+        if u != self._t:
+            if not self.grid.walls_view[u]:
+                g = self.g
+                self.rhs[u] = min((cost + g.get(v, INF) for v, cost in self._free_neighbors(u)), default=INF)
+            else:
+                self.rhs[u] = INF
+        self._open.pop(u, None)
+        if self.g.get(u, INF) != self.rhs.get(u, INF):
+            self._push(u)
+
+    def _compute(self) -> None:
+        expanded = 0
+        g, rhs, s = self.g, self.rhs, self._s
+        while True:
+            top = self._top()
+            if top is None:
+                break
+            k_old, u = top
+            if not (k_old < self._key(s) or rhs.get(s, INF) != g.get(s, INF)):
+                break
+            k_new = self._key(u)
+            if k_old < k_new:
+                self._push(u)  # key grew since it was queued (km changed); requeue
+                continue
+            heapq.heappop(self._heap)
+            del self._open[u]
+            expanded += 1
+            if g.get(u, INF) > rhs.get(u, INF):
+                g[u] = rhs[u]
+                for p, _ in self._free_neighbors(u):
+                    self._update_vertex(p)
+            else:
+                g[u] = INF
+                self._update_vertex(u)
+                for p, _ in self._free_neighbors(u):
+                    self._update_vertex(p)
+        self.expanded = expanded
+
+    # ---------------------- Public API ----------------------
+    def move_to(self, start: Coord) -> None:
+        """The agent moved: later paths start here. No search happens until path()."""
+        self.start = start
+        self._s = start[0]*self.grid.width + start[1]
+        self._h_start = flat_heuristic(self._heuristic, start, self.grid.width)
+
+    def update(self, changed_cells: Iterable[Coord]) -> None:
+        """
+        Tell the planner which cells changed (wall flag or cost) since the last
+        call; the grid itself must already hold the new values.
+        """
+        self._km += self._h(self._last, self.start)
+        self._last = self.start
+        W = self.grid.width
+        for r, c in changed_cells:
+            u = r*W + c
+            self._update_vertex(u)
+            for p, _ in self._free_neighbors(u):
+                self._update_vertex(p)
+
+    def cost(self) -> Optional[float]:
+        """Cost of the current shortest path from start to goal, None if unreachable."""
+        if not self.grid.walkable(*self.start) or not self.grid.walkable(*self.goal):
+            return None
+        self._compute()
+        c = self.g.get(self._s, INF)
+        return None if c == INF else c
+
+    def path(self) -> List[Coord]:
+        """Shortest path from the current start to the goal ([] if unreachable), repairing as needed."""
+        if self.cost() is None:
+            return []
+        g = self.g
+        node = self._s
+        path = [node]
+        limit = self.grid.height * self.grid.width
+        while node != self._t and len(path) <= limit:
+            node = min(self._free_neighbors(node), key=lambda e: e[1] + g.get(e[0], INF))[0]
+            path.append(node)
+        return [divmod(i, self.grid.width) for i in path]
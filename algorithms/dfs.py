@@ -1,82 +1,64 @@
-
 from typing import List, Tuple, Optional, Callable, Iterable
 from collections import deque
 import heapq
 
-Coord = Tuple[int, int]
-
-def in_bounds(grid: List[List[float]], r: int, c: int) -> bool:
-    return 0 <= r < len(grid) and 0 <= c < len(grid[0])
-
-def is_blocked(val) -> bool:
-    return val in (1, '#', False)
-
-def cell_cost(val) -> float:
-    # If the cell stores a numeric cost > 1, use it; otherwise cost=1 for traversable cells.
-    try:
-        v = float(val)
-        if v <= 0 or v == 1.0:  # treat 1 as wall by default; adjust if your grid differs
-            return 1.0 if v == 0.0 else float("inf")
-        return v
-    except Exception:
-        return 1.0
-
-def walkable(grid: List[List[float]], r: int, c: int) -> bool:
-    if not in_bounds(grid, r, c):
-        return False
-    return not is_blocked(grid[r][c])
-
-def neighbors4(grid: List[List[float]], r: int, c: int) -> Iterable[Coord]:
-    for dr, dc in ((1,0),(-1,0),(0,1),(0,-1)):
-        nr, nc = r+dr, c+dc
-        if walkable(grid, nr, nc):
-            yield (nr, nc)
-
-def neighbors8(grid: List[List[float]], r: int, c: int) -> Iterable[Coord]:
-    for dr, dc in ((1,0),(-1,0),(0,1),(0,-1),(1,1),(1,-1),(-1,1),(-1,-1)):
-        nr, nc = r+dr, c+dc
-        if walkable(grid, nr, nc):
-            yield (nr, nc)
+from .grid import as_grid
+from .stats import CHECK_INTERVAL, SearchStats
 
-def reconstruct_path(came_from: dict, current: Coord) -> List[Coord]:
-    path = [current]
-    while current in came_from:
-        current = came_from[current]
-        path.append(current)
-    path.reverse()
-    return path
-
-def manhattan(a: Coord, b: Coord) -> int:
-    return abs(a[0]-b[0]) + abs(a[1]-b[1])
-
-def euclidean(a: Coord, b: Coord) -> float:
-    return ((a[0]-b[0])**2 + (a[1]-b[1])**2) ** 0.5
+Coord = Tuple[int, int]
 
 
-def find_path(grid, start: Coord, goal: Coord, *, diagonals: bool=False) -> tuple[list[Coord], list[Coord], int|None]:
+def find_path(grid, start: Coord, goal: Coord, *, diagonals: bool=False,
+              stats: Optional[SearchStats]=None) -> tuple[list[Coord], SearchStats, int|None]:
     """
-    Depth-first search (does not guarantee shortest path). Returns (path, visited_order, steps).
+    Depth-first search (does not guarantee shortest path). Returns (path, stats, steps).
     """
-    if not walkable(grid, *start) or not walkable(grid, *goal):
-        return [], [], None
-
-    nbrs = neighbors8 if diagonals else neighbors4
-    stack = [start]
-    visited = {start}
-    came_from = {}
-    visited_order = []
-
-    while stack:
-        u = stack.pop()
-        visited_order.append(u)
-        if u == goal:
-            path = reconstruct_path(came_from, u)
-            return path, visited_order, len(path)-1
-
-        for v in nbrs(grid, *u):
-            if v not in visited:
-                visited.add(v)
-                came_from[v] = u
-                stack.append(v)
-
-    return [], visited_order, None
+    stats = SearchStats() if stats is None else stats
+    with stats.phase("setup"):
+        grid = as_grid(grid)
+    if not grid.walkable(*start) or not grid.walkable(*goal) or not grid.connected(start, goal, diagonals):
+        return [], stats, None
+
+    W = grid.width
+    offsets, neighbors, costs = grid.adjacency(diagonals).views()
+    inf = float("inf")
+    on_expand = stats.recorder()
+    check = stats.checkpoint()
+    s, t = start[0]*W + start[1], goal[0]*W + goal[1]
+    stack = [s]
+    pushes, pops, peak_open = 1, 0, 0
+    found = False
+
+    with grid.search_workspace() as workspace:
+        generation, visited, _, came_from = workspace.begin()
+        visited[s], came_from[s] = generation, -1
+        with stats.phase("search"):
+            while stack:
+                if len(stack) > peak_open:
+                    peak_open = len(stack)
+                u = stack.pop()
+                pops += 1
+                if on_expand:
+                    on_expand(divmod(u, W))
+                if check and not pops % CHECK_INTERVAL and check(pops):
+                    break
+                if u == t:
+                    found = True
+                    break
+
+                for j in range(offsets[u], offsets[u+1]):
+                    if costs[j] == inf:
+                        continue
+                    v = neighbors[j]
+                    if visited[v] != generation:
+                        visited[v] = generation
+                        came_from[v] = u
+                        pushes += 1
+                        stack.append(v)
+        stats.count(expanded=pops, pushes=pushes, pops=pops, peak_open=peak_open)
+
+        if not found:
+            return [], stats, None
+        with stats.phase("path"):
+            path = workspace.path(t, W)
+        return path, stats, len(path)-1
@@ -1,90 +1,136 @@
-
 from typing import List, Tuple, Optional, Callable, Iterable
 from collections import deque
 import heapq
 
-Coord = Tuple[int, int]
-
-def in_bounds(grid: List[List[float]], r: int, c: int) -> bool:
-    return 0 <= r < len(grid) and 0 <= c < len(grid[0])
-
-def is_blocked(val) -> bool:
-    return val in (1, '#', False)
-
-def cell_cost(val) -> float:
-    # If the cell stores a numeric cost > 1, use it; otherwise cost=1 for traversable cells.
-    try:
-        v = float(val)
-        if v <= 0 or v == 1.0:  # treat 1 as wall by default; adjust if your grid differs
-            return 1.0 if v == 0.0 else float("inf")
-        return v
-    except Exception:
-        return 1.0
-
-def walkable(grid: List[List[float]], r: int, c: int) -> bool:
-    if not in_bounds(grid, r, c):
-        return False
-    return not is_blocked(grid[r][c])
-
-def neighbors4(grid: List[List[float]], r: int, c: int) -> Iterable[Coord]:
-    for dr, dc in ((1,0),(-1,0),(0,1),(0,-1)):
-        nr, nc = r+dr, c+dc
-        if walkable(grid, nr, nc):
-            yield (nr, nc)
+import numpy as np
 
-def neighbors8(grid: List[List[float]], r: int, c: int) -> Iterable[Coord]:
-    for dr, dc in ((1,0),(-1,0),(0,1),(0,-1),(1,1),(1,-1),(-1,1),(-1,-1)):
-        nr, nc = r+dr, c+dc
-        if walkable(grid, nr, nc):
-            yield (nr, nc)
+from .grid import as_grid
+from .queues import integer_search, select_queue
+from .stats import CHECK_INTERVAL, SearchStats
+from .a_star import find_path_bidirectional
 
-def reconstruct_path(came_from: dict, current: Coord) -> List[Coord]:
-    path = [current]
-    while current in came_from:
-        current = came_from[current]
-        path.append(current)
-    path.reverse()
-    return path
-
-def manhattan(a: Coord, b: Coord) -> int:
-    return abs(a[0]-b[0]) + abs(a[1]-b[1])
-
-def euclidean(a: Coord, b: Coord) -> float:
-    return ((a[0]-b[0])**2 + (a[1]-b[1])**2) ** 0.5
+Coord = Tuple[int, int]
 
 
-def find_path(grid, start: Coord, goal: Coord, *, diagonals: bool=False) -> tuple[list[Coord], list[Coord], float|None]:
+def find_path(grid, start: Coord, goal: Coord, *, diagonals: bool=False,
+              bidirectional: bool=False, queue: str="auto",
+              stats: Optional[SearchStats]=None) -> tuple[list[Coord], SearchStats, float|None]:
     """
     Dijkstra shortest path on weighted grid (non-negative costs).
-    Returns: (path, visited_order, total_cost). path=[] and cost=None if no path.
+    Returns: (path, stats, total_cost). path=[] and cost=None if no path.
+    bidirectional=True grows a second search backwards from the goal.
+    queue: priority queue backend (see algorithms.queues); "auto" uses a
+    bucket queue or radix heap when all step costs are integers.
     """
-    if not walkable(grid, *start) or not walkable(grid, *goal):
-        return [], [], None
-
-    nbrs = neighbors8 if diagonals else neighbors4
-    dist = {start: 0.0}
-    pq = [(0.0, start)]
-    visited_order = []
-    came_from = {}
-    seen = set()
+    stats = SearchStats() if stats is None else stats
+    with stats.phase("setup"):
+        grid = as_grid(grid)
+    if not grid.walkable(*start) or not grid.walkable(*goal) or not grid.connected(start, goal, diagonals):
+        return [], stats, None
+    if bidirectional:
+        return find_path_bidirectional(grid, start, goal, diagonals=diagonals, heuristic=None, stats=stats)
+
+    W = grid.width
+    adjacency = grid.adjacency(diagonals)
+    kind = select_queue(adjacency, queue)
+    on_expand = stats.recorder()
+    check = stats.checkpoint()
+    s, t = start[0]*W + start[1], goal[0]*W + goal[1]
+    with grid.search_workspace() as workspace:
+        if kind != "heap":
+            with stats.phase("search"):
+                cost, (expanded, pushes, pops, peak_open) = integer_search(
+                    adjacency, s, t, kind, workspace, width=W, on_expand=on_expand, check=check)
+            stats.count(expanded=expanded, pushes=pushes, pops=pops, stale_pops=pops - expanded, peak_open=peak_open)
+            if cost is None:
+                return [], stats, None
+            with stats.phase("path"):
+                path = workspace.path(t, W)
+            return path, stats, float(cost)
+
+        offsets, neighbors, costs = adjacency.views()
+        inf = float("inf")
+        generation, stamp, dist, came_from = workspace.begin()
+        done = generation + 1
+        stamp[s], dist[s], came_from[s] = generation, 0.0, -1
+        pq = [(0.0, s)]
+        pushes, pops, expanded, peak_open = 1, 0, 0, 1
+        found = False
+
+        with stats.phase("search"):
+            while pq:
+                d, u = heapq.heappop(pq)
+                pops += 1
+                if stamp[u] == done:
+                    continue
+                stamp[u] = done
+                expanded += 1
+                if on_expand:
+                    on_expand(divmod(u, W))
+                if check and not expanded % CHECK_INTERVAL and check(expanded):
+                    break
+                if u == t:
+                    found = True
+                    break
+
+                for j in range(offsets[u], offsets[u+1]):
+                    step = costs[j]
+                    if step == inf:
+                        continue
+                    v = neighbors[j]
+                    nd = d + step
+                    if stamp[v] < generation or nd < dist[v]:
+                        stamp[v] = generation
+                        dist[v] = nd
+                        came_from[v] = u
+                        heapq.heappush(pq, (nd, v))
+                        pushes += 1
+                        if len(pq) > peak_open:
+                            peak_open = len(pq)
+        stats.count(expanded=expanded, pushes=pushes, pops=pops, stale_pops=pops - expanded, peak_open=peak_open)
+
+        if not found:
+            return [], stats, None
+        with stats.phase("path"):
+            path = workspace.path(t, W)
+        return path, stats, d
+
+
+def shortest_path_tree(grid, source: Coord, *, diagonals: bool=False,
+                       dist: np.ndarray|None=None, parent: np.ndarray|None=None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Full single-source Dijkstra (no goal, no early exit).
+    Returns (dist, parent) as flat arrays indexed by r*W + c: float64 costs (inf where
+    unreachable) and int32 parent indices (-1 for the source and unreached cells).
+    Previously allocated flat arrays can be passed as dist/parent to be refilled in place.
+    """
+    grid = as_grid(grid)
+    W, n = grid.width, grid.height * grid.width
+    if dist is None:
+        dist = np.empty(n, dtype=np.float64)
+    if parent is None:
+        parent = np.empty(n, dtype=np.int32)
+    dist.fill(np.inf)
+    parent.fill(-1)
+    if not grid.walkable(*source):
+        return dist, parent
+
+    offsets, neighbors, costs = grid.adjacency(diagonals).views()
+    dv, pv = memoryview(dist), memoryview(parent)
+    s = source[0]*W + source[1]
+    dv[s] = 0.0
+    pq = [(0.0, s)]
 
     while pq:
         d, u = heapq.heappop(pq)
-        if u in seen:
+        if d > dv[u]:
             continue
-        seen.add(u)
-        visited_order.append(u)
-        if u == goal:
-            return reconstruct_path(came_from, u), visited_order, d
-
-        for v in nbrs(grid, *u):
-            step = cell_cost(grid[v[0]][v[1]])
-            if step == float("inf"):
-                continue
-            nd = d + step
-            if nd < dist.get(v, float("inf")):
-                dist[v] = nd
-                came_from[v] = u
+        for j in range(offsets[u], offsets[u+1]):
+            v = neighbors[j]
+            nd = d + costs[j]
+            if nd < dv[v]:
+                dv[v] = nd
+                pv[v] = u
                 heapq.heappush(pq, (nd, v))
 
-    return [], visited_order, None
+    return dist, parent
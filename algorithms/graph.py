@@ -0,0 +1,211 @@
+import weakref
+from typing import Dict, List, Tuple
+import numpy as np
+
+Coord = Tuple[int, int]
+
+OFFSETS4 = ((1,0),(-1,0),(0,1),(0,-1))
+OFFSETS8 = OFFSETS4 + ((1,1),(1,-1),(-1,1),(-1,-1))
+INF = float("inf")
+
+
+class CSRStructure:
+    """
+    (offsets, neighbors) of the grid graph of one shape: the in-bounds
+    neighbors of cell i are neighbors[offsets[i]:offsets[i+1]], in OFFSETS4 /
+    OFFSETS8 order. Read-only, shared by the Adjacency of every grid of
+    that shape for as long as one of them holds it.
+    """
+
+    __slots__ = ("offsets", "neighbors", "__weakref__")
+
+    def __init__(self, height: int, width: int, diagonals: bool=False):
+        H, W = height, width
+        n = H * W
+        deltas = OFFSETS8 if diagonals else OFFSETS4
+        index_dtype = np.int32 if n * len(deltas) < 2**31 else np.int64
+        rows, cols = np.arange(H), np.arange(W)
+        counts = np.zeros((H, W), dtype=np.uint8)
+        for dr, dc in deltas:
+            counts += ((rows + dr >= 0) & (rows + dr < H))[:, None] & ((cols + dc >= 0) & (cols + dc < W))[None, :]
+        offsets = np.zeros(n + 1, dtype=index_dtype)
+        np.cumsum(counts.reshape(-1), dtype=index_dtype, out=offsets[1:])
+        del counts
+        # One direction at a time: each in-bounds cell appends its neighbor at its next free slot.
+        neighbors = np.empty(int(offsets[-1]), dtype=index_dtype)
+        slot = offsets[:-1].copy()
+        for dr, dc in deltas:
+            src = (np.arange(max(0, -dr), H - max(0, dr), dtype=index_dtype)[:, None] * W
+                   + np.arange(max(0, -dc), W - max(0, dc), dtype=index_dtype)[None, :]).reshape(-1)
+            neighbors[slot[src]] = src + (dr * W + dc)
+            slot[src] += 1
+        offsets.setflags(write=False)
+        neighbors.setflags(write=False)
+        self.offsets, self.neighbors = offsets, neighbors
+
+
+_structures: "weakref.WeakValueDictionary[Tuple[int, int, bool], CSRStructure]" = weakref.WeakValueDictionary()
+
+
+def csr_structure(height: int, width: int, diagonals: bool=False) -> CSRStructure:
+    """
+    The CSRStructure of this shape, built once and shared while any grid's
+    adjacency still uses it: the cache holds it weakly, so it goes away with
+    the last of those grids.
+    """
+    key = (height, width, bool(diagonals))
+    structure = _structures.get(key)
+    if structure is None:
+        structure = _structures[key] = CSRStructure(height, width, diagonals)
+    return structure
+
+
+class Adjacency:
+    """
+    Compressed sparse row adjacency of a Grid, built once per (grid, diagonals)
+    by Grid.adjacency(). Edge j runs from cell i to neighbors[j] for
+    offsets[i] <= j < offsets[i+1] (flat indices r*W + c) and costs costs[j],
+    the step cost of its target (inf into walls, as with Grid.step_cost).
+    Edges into walls are kept so that Grid.set_cell only patches costs.
+
+    Searches iterate the memoryviews from views(), which return plain Python
+    numbers:
+
+        offsets, neighbors, costs = grid.adjacency(diagonals).views()
+        for j in range(offsets[u], offsets[u+1]):
+            w = costs[j]
+            if w == inf:
+                continue
+            v = neighbors[j]
+    """
+
+    def __init__(self, grid, diagonals: bool=False):
+        self.diagonals = diagonals
+        self._structure = csr_structure(grid.height, grid.width, diagonals)
+        self.offsets, self.neighbors = self._structure.offsets, self._structure.neighbors
+        self.costs = np.ascontiguousarray(grid.step_cost[self.neighbors], dtype=np.float32)
+        self._views = (memoryview(self.offsets), memoryview(self.neighbors), memoryview(self.costs))
+        self._integer = None
+
+    @property
+    def nbytes(self) -> int:
+        return self.offsets.nbytes + self.neighbors.nbytes + self.costs.nbytes
+
+    def views(self):
+        return self._views
+
+    def integer_costs(self):
+        """
+        (max_step, costs) when every finite step cost is an integer >= 1, for the
+        integer priority queues (algorithms.queues): costs is an int32 memoryview
+        parallel to views()[2] with -1 on edges into walls. None otherwise.
+        Computed on first use and dropped by set_cost.
+        """
+        if self._integer is None:
+            finite = np.isfinite(self.costs)
+            steps = self.costs[finite]
+            if len(steps) and (steps.min() < 1 or steps.max() >= 2**31 or np.any(steps != np.floor(steps))):
+                self._integer = False
+            else:
+                max_step = int(steps.max()) if len(steps) else 1
+                self._integer = (max_step, memoryview(np.where(finite, self.costs, -1).astype(np.int32)))
+        return self._integer or None
+
+    def set_cost(self, i: int, cost: float) -> None:
+        """Cell i's step cost changed: patch the cost of every edge into it."""
+        self._integer = None
+        offsets, neighbors, costs = self.offsets, self.neighbors, self.costs
+        for n in neighbors[offsets[i]:offsets[i+1]]:
+            lo, hi = offsets[n], offsets[n+1]
+            costs[lo + int(np.flatnonzero(neighbors[lo:hi] == i)[0])] = cost
+
+
+class _StrideOffsets:
+    __slots__ = ("k",)
+
+    def __init__(self, k: int):
+        self.k = k
+
+    def __getitem__(self, i: int) -> int:
+        return i * self.k
+
+
+class _LazyNeighbors:
+    """Edge j is offset j % K of cell j // K; -1 when it leaves the grid."""
+
+    __slots__ = ("height", "width", "deltas")
+
+    def __init__(self, height: int, width: int, deltas):
+        self.height, self.width, self.deltas = height, width, deltas
+
+    def __getitem__(self, j: int) -> int:
+        i, k = divmod(j, len(self.deltas))
+        r, c = divmod(i, self.width)
+        dr, dc = self.deltas[k]
+        r, c = r + dr, c + dc
+        return r * self.width + c if 0 <= r < self.height and 0 <= c < self.width else -1
+
+
+class _LazyCosts:
+    __slots__ = ("neighbors", "step")
+
+    def __init__(self, neighbors: _LazyNeighbors, step):
+        self.neighbors, self.step = neighbors, step
+
+    def __getitem__(self, j: int) -> float:
+        v = self.neighbors[j]
+        return INF if v < 0 else self.step[v]
+
+
+class _LazyIntCosts(_LazyCosts):
+    __slots__ = ()
+
+    def __getitem__(self, j: int) -> int:
+        v = self.neighbors[j]
+        if v < 0:
+            return -1
+        step = self.step[v]
+        return -1 if step == INF else int(step)
+
+
+class LazyAdjacency:
+    """
+    Adjacency with the same views() interface computed on access, for grids
+    that must not be materialized (PackedGrid memmaps, TiledGrid): every cell has K
+    edge slots (offsets[i] = K*i), slots leaving the grid cost inf, and costs
+    read the packed mask live, so set_cell only drops the integer check.
+    """
+
+    nbytes = 0
+
+    def __init__(self, grid, diagonals: bool=False):
+        self.diagonals = diagonals
+        deltas = OFFSETS8 if diagonals else OFFSETS4
+        neighbors = _LazyNeighbors(grid.height, grid.width, deltas)
+        self._views = (_StrideOffsets(len(deltas)), neighbors, _LazyCosts(neighbors, grid.step_view))
+        self._int_costs = _LazyIntCosts(neighbors, grid.step_view)
+        self._grid = grid
+        self._integer = None
+
+    def views(self):
+        return self._views
+
+    def integer_costs(self):
+        """Like Adjacency.integer_costs, with the bound from grid.integer_step_bound()."""
+        if self._integer is None:
+            max_step = self._grid.integer_step_bound()
+            self._integer = False if max_step is None else (max_step, self._int_costs)
+        return self._integer or None
+
+    def set_cost(self, i: int, cost: float) -> None:
+        self._integer = None
+
+
+def flat_path(parent: Dict[int, int], node: int, width: int) -> List[Coord]:
+    """Follow parent links (flat indices) back from `node`; returns the coordinate path root-first."""
+    path = [node]
+    while node in parent:
+        node = parent[node]
+        path.append(node)
+    path.reverse()
+    return [divmod(i, width) for i in path]
@@ -0,0 +1,392 @@
+from typing import Tuple, Optional, Iterable, Iterator
+from contextlib import contextmanager
+import numpy as np
+
+from .components import Components
+from .graph import Adjacency, LazyAdjacency
+from .workspace import SearchWorkspace, SparseWorkspace
+
+Coord = Tuple[int, int]
+
+# csr_cells for grids that answer a single query (batch files): building the CSR
+# adjacency costs about 0.15 s and 36 MB (68 MB with diagonals) per million cells up
+# front; a LazyAdjacency costs nothing up front and about twice as much per expansion.
+ONE_SHOT_CSR_CELLS = 1 << 22
+
+
+class Grid:
+    """
+    Compact maze representation shared by the algorithm modules.
+
+    Cells are stored row-major in flat arrays indexed by r*W + c:
+      - walls: uint8, 1 = wall, 0 = free
+      - costs: optional float32 traversal cost per cell (None = uniform cost 1)
+    The cost of stepping into each cell (inf for walls) is computed once here,
+    so searches only do an array lookup per relaxation. Searches walk the
+    graph through adjacency(), a CSR edge list built once per connectivity
+    (computed on access instead above csr_cells, for one-off queries);
+    components() labels the connected regions; once labeled, queries between
+    different regions are rejected without searching (see connected()), and
+    search_workspace() lends searches flat per-cell arrays reused across queries.
+    """
+
+    # Grids with more cells than this search on a SparseWorkspace (None: no limit).
+    dense_workspace_cells: Optional[int] = None
+    # Grids with more cells than this walk a LazyAdjacency instead of building CSR (None: no limit).
+    csr_cells: Optional[int] = None
+
+    def __init__(self, walls: np.ndarray, costs: Optional[np.ndarray] = None, *, csr_cells: Optional[int] = None):
+        walls = np.asarray(walls)
+        if walls.ndim != 2:
+            raise ValueError("walls must be a 2-D array")
+        self.height, self.width = walls.shape
+        self.walls = np.ascontiguousarray(walls != 0, dtype=np.uint8).reshape(-1)
+
+        if costs is not None:
+            costs = np.asarray(costs)
+            if costs.shape != walls.shape:
+                raise ValueError(f"costs shape {costs.shape} does not match walls shape {walls.shape}")
+            costs = np.ascontiguousarray(costs, dtype=np.float32).reshape(-1)
+        self.costs = costs
+
+        step = np.ones(self.walls.size, dtype=np.float32) if costs is None else costs.copy()
+        step[self.walls == 1] = np.inf
+        self.step_cost = step
+        self._adjacency = {}
+        self._components = {}
+        self._workspaces = []
+        self._padded = None
+        self.csr_cells = csr_cells
+        self._make_views()
+
+    def _make_views(self) -> None:
+        # memoryview indexing returns plain Python scalars, much cheaper than ndarray scalars
+        self.walls_view = memoryview(self.walls)
+        self.step_view = memoryview(self.step_cost)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["walls_view"], state["step_view"]
+        state["_adjacency"] = {}  # rebuilt on demand; not worth pickling
+        state["_components"] = {}
+        state["_workspaces"] = []
+        state["_padded"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__dict__.setdefault("_adjacency", {})
+        self.__dict__.setdefault("_components", {})
+        self.__dict__.setdefault("_workspaces", [])
+        self.__dict__.setdefault("_padded", None)
+        self._make_views()
+
+    # ---------------------- Construction ----------------------
+    @classmethod
+    def from_values(cls, values) -> "Grid":
+        """
+        Build a Grid from the legacy cell-value convention used by find_path:
+          - Walls: 1, "#", or False (negative numbers are impassable too)
+          - Free cell: 0 (cost 1) or any numeric >0 other than 1 (its traversal cost)
+          - Any other non-numeric value is a free cell of cost 1
+        """
+        arr = np.asarray(values)
+        if arr.ndim != 2:
+            raise ValueError("grid must be two-dimensional")
+        if arr.dtype == bool:
+            return cls(~arr)
+        if arr.dtype.kind in "iuf":
+            v = arr.astype(np.float64)
+            walls = (v == 1.0) | (v < 0) | np.isnan(v)
+            costs = np.where(v == 0.0, 1.0, v)
+            if np.all(costs[~walls] == 1.0):
+                return cls(walls)
+            return cls(walls, costs)
+
+        # Mixed / string cells: classify one by one.
+        H, W = arr.shape
+        walls = np.zeros((H, W), dtype=np.uint8)
+        costs = np.ones((H, W), dtype=np.float32)
+        for r, row in enumerate(values):
+            for c, val in enumerate(row):
+                if val is False or val == "#":
+                    walls[r, c] = 1
+                    continue
+                try:
+                    v = float(val)
+                except (TypeError, ValueError):
+                    continue
+                if v == 1.0 or v < 0 or v != v:
+                    walls[r, c] = 1
+                elif v != 0.0:
+                    costs[r, c] = v
+        if np.all(costs[walls == 0] == 1.0):
+            return cls(walls)
+        return cls(walls, costs)
+
+    # ---------------------- Accessors ----------------------
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.height, self.width
+
+    @property
+    def uniform(self) -> bool:
+        return self.costs is None
+
+    def index(self, r: int, c: int) -> int:
+        return r * self.width + c
+
+    def coord(self, idx: int) -> Coord:
+        return divmod(idx, self.width)
+
+    def in_bounds(self, r: int, c: int) -> bool:
+        return 0 <= r < self.height and 0 <= c < self.width
+
+    def walkable(self, r: int, c: int) -> bool:
+        return self.in_bounds(r, c) and not self.walls_view[r * self.width + c]
+
+    def cost(self, r: int, c: int) -> float:
+        return self.step_view[r * self.width + c]
+
+    def wall_array(self) -> np.ndarray:
+        """2-D view of the wall mask (no copy)."""
+        return self.walls.reshape(self.height, self.width)
+
+    def padded_walls(self) -> np.ndarray:
+        """
+        Flat uint8 wall mask of the (H+2, W+2) grid ringed by walls, for scans
+        that must not bounds-check (jps). Built on first use and kept until a wall changes.
+        """
+        if self._padded is None:
+            padded = np.ones((self.height + 2, self.width + 2), dtype=np.uint8)
+            padded[1:-1, 1:-1] = self.wall_array() != 0
+            self._padded = padded.reshape(-1)
+        return self._padded
+
+    def adjacency(self, diagonals: bool = False) -> Adjacency:
+        """
+        CSR adjacency for 4- or 8-connectivity, built on first use and kept with
+        the grid: a pass over the whole maze that later queries amortize, so
+        callers with one query on a large maze pass csr_cells (ONE_SHOT_CSR_CELLS)
+        to get a LazyAdjacency above that size instead.
+        """
+        adj = self._adjacency.get(diagonals)
+        if adj is None:
+            lazy = self.csr_cells is not None and self.height * self.width > self.csr_cells
+            adj = self._adjacency[diagonals] = LazyAdjacency(self, diagonals) if lazy else Adjacency(self, diagonals)
+        return adj
+
+    def components(self, diagonals: bool = False) -> Components:
+        """Connected components of the free cells, labeled on first use and kept with the grid."""
+        comp = self._components.get(diagonals)
+        if comp is None:
+            comp = self._components[diagonals] = Components(self, diagonals)
+        return comp
+
+    def connected(self, a: Coord, b: Coord, diagonals: bool = False) -> bool:
+        """
+        False when no path joins the free cells a and b. Only answers from
+        labels an explicit components() call built: labeling is a pass over the
+        whole maze, which a one-off query between nearby cells should not pay.
+        Long-lived owners (MazeSolver) label once so every later unreachable
+        query returns without exploring anything.
+        """
+        comp = self._components.get(diagonals)
+        return comp is None or comp.connected(a, b)
+
+    def integer_step_bound(self) -> Optional[int]:
+        """Largest step cost if every free cell costs an integer >= 1, else None."""
+        if self.costs is None:
+            return 1
+        steps = self.step_cost[self.walls == 0]
+        if not len(steps):
+            return 1
+        if steps.min() < 1 or steps.max() >= 2**31 or np.any(steps != np.floor(steps)):
+            return None
+        return int(steps.max())
+
+    @contextmanager
+    def search_workspace(self) -> Iterator[SearchWorkspace]:
+        """
+        A SearchWorkspace for one search, checked out of a pool kept with the
+        grid: consecutive queries reuse its arrays without clearing them, and
+        concurrent ones each get their own. TiledGrid pages it per tile.
+
+            with grid.search_workspace() as workspace:
+                generation, stamp, g, parent = workspace.begin()
+
+        Above dense_workspace_cells the search gets a fresh SparseWorkspace.
+        """
+        n = self.height * self.width
+        if self.dense_workspace_cells is not None and n > self.dense_workspace_cells:
+            yield SparseWorkspace(n)
+            return
+        pool = self._workspaces
+        workspace = pool.pop() if pool else SearchWorkspace.for_grid(self)
+        try:
+            yield workspace
+        finally:
+            pool.append(workspace)
+
+    # ---------------------- Mutation ----------------------
+    def set_cell(self, r: int, c: int, *, wall: Optional[bool] = None, cost: Optional[float] = None) -> None:
+        """
+        Change one cell in place (wall flag and/or traversal cost). Searches that
+        keep state across calls (d_star_lite.DStarLite) must be told via update().
+        """
+        i = r * self.width + c
+        if cost is not None:
+            self._workspaces = []  # the g precision they were sized for may no longer hold
+        if cost is not None and self.costs is None and cost != 1.0:
+            self.costs = np.ones(self.walls.size, dtype=np.float32)
+        if cost is not None and self.costs is not None:
+            self.costs[i] = cost
+        if wall is not None:
+            if bool(self.walls[i]) != bool(wall):
+                self._components.clear()
+                self._padded = None
+            self.walls[i] = 1 if wall else 0
+        if self.walls[i]:
+            self.step_cost[i] = np.inf
+        else:
+            self.step_cost[i] = 1.0 if self.costs is None else self.costs[i]
+        for adj in self._adjacency.values():
+            adj.set_cost(i, self.step_cost[i])
+
+    def neighbors4(self, r: int, c: int) -> Iterable[Coord]:
+        H, W, walls = self.height, self.width, self.walls_view
+        for dr, dc in ((1,0),(-1,0),(0,1),(0,-1)):
+            nr, nc = r+dr, c+dc
+            if 0 <= nr < H and 0 <= nc < W and not walls[nr*W + nc]:
+                yield (nr, nc)
+
+    def neighbors8(self, r: int, c: int) -> Iterable[Coord]:
+        H, W, walls = self.height, self.width, self.walls_view
+        for dr, dc in ((1,0),(-1,0),(0,1),(0,-1),(1,1),(1,-1),(-1,1),(-1,-1)):
+            nr, nc = r+dr, c+dc
+            if 0 <= nr < H and 0 <= nc < W and not walls[nr*W + nc]:
+                yield (nr, nc)
+
+
+def as_grid(grid) -> Grid:
+    """Return `grid` unchanged if it is already a Grid, else convert from list-of-lists/array."""
+    if isinstance(grid, Grid):
+        return grid
+    return Grid.from_values(grid)
+
+
+class _BitView:
+    """Flat-index view of a row-padded, bit-packed wall mask (1 = wall)."""
+
+    __slots__ = ("bits", "width", "stride")
+
+    def __init__(self, bits, width: int, stride: int):
+        self.bits, self.width, self.stride = bits, width, stride
+
+    def __getitem__(self, idx: int) -> int:
+        r, c = divmod(idx, self.width)
+        return (self.bits[r*self.stride + (c >> 3)] >> (c & 7)) & 1
+
+
+class _StepView:
+    """Flat-index step costs computed on access: inf for walls, else the cell cost (or 1)."""
+
+    __slots__ = ("walls", "costs")
+
+    def __init__(self, walls: _BitView, costs):
+        self.walls, self.costs = walls, costs
+
+    def __getitem__(self, idx: int) -> float:
+        if self.walls[idx]:
+            return float("inf")
+        return 1.0 if self.costs is None else self.costs[idx]
+
+
+class PackedGrid(Grid):
+    """
+    Grid backed by a bit-packed wall mask (one bit per cell, rows padded to whole
+    bytes, least significant bit first), typically an np.memmap of a .maze file
+    (see utils.maze_format). Per-cell lookups read the packed bits directly, so
+    cell-by-cell searches (A*, Dijkstra, BFS, DFS) touch only the pages they visit.
+    Beyond dense_workspace_cells their state is kept in dicts (SparseWorkspace):
+    flat arrays would take 12+ bytes per cell against the mask's one bit.
+    wall_array()/walls/step_cost unpack the whole mask and are meant for mazes
+    that fit in memory (wavefront BFS, JPS tables).
+    """
+
+    dense_workspace_cells = 1 << 22
+
+    def __init__(self, bits: np.ndarray, shape: Tuple[int, int], costs: Optional[np.ndarray] = None):
+        self.height, self.width = shape
+        self.stride = (self.width + 7) // 8
+        if bits.size != self.height * self.stride:
+            raise ValueError(f"packed mask has {bits.size} bytes, expected {self.height * self.stride}")
+        self.bits = bits.reshape(-1)
+        if costs is not None and costs.size != self.height * self.width:
+            raise ValueError("cost layer size does not match grid shape")
+        self.costs = None if costs is None else costs.reshape(-1)
+        self._adjacency = {}
+        self._components = {}
+        self._workspaces = []
+        self._padded = None
+        self._make_views()
+
+    def _make_views(self) -> None:
+        self.walls_view = _BitView(memoryview(self.bits), self.width, self.stride)
+        costs = None if self.costs is None else memoryview(self.costs)
+        self.step_view = _StepView(self.walls_view, costs)
+
+    @classmethod
+    def pack(cls, walls: np.ndarray, costs: Optional[np.ndarray] = None) -> "PackedGrid":
+        """Pack an in-memory (H, W) wall mask."""
+        walls = np.asarray(walls) != 0
+        bits = np.packbits(walls, axis=1, bitorder="little")
+        if costs is not None:
+            costs = np.ascontiguousarray(costs, dtype=np.float32)
+        return cls(bits, walls.shape, costs)
+
+    def wall_array(self) -> np.ndarray:
+        packed = self.bits.reshape(self.height, self.stride)
+        return np.unpackbits(packed, axis=1, count=self.width, bitorder="little")
+
+    @property
+    def walls(self) -> np.ndarray:
+        return self.wall_array().reshape(-1)
+
+    def adjacency(self, diagonals: bool = False) -> LazyAdjacency:
+        """Edges computed on access from the packed mask, so searches still touch only the pages they visit."""
+        adj = self._adjacency.get(diagonals)
+        if adj is None:
+            adj = self._adjacency[diagonals] = LazyAdjacency(self, diagonals)
+        return adj
+
+    def integer_step_bound(self) -> Optional[int]:
+        """Largest cost if the cost layer (walls included) is integers >= 1, else None; scans it."""
+        costs = self.costs
+        if costs is None or not len(costs):
+            return 1
+        if costs.min() < 1 or costs.max() >= 2**31 or np.any(costs != np.floor(costs)):
+            return None
+        return int(costs.max())
+
+    def set_cell(self, r: int, c: int, *, wall: Optional[bool] = None, cost: Optional[float] = None) -> None:
+        """Write through to the packed mask (and cost layer); the memmap must be writable."""
+        if cost is not None:
+            if self.costs is None:
+                raise ValueError("packed grid has no cost layer")
+            self.costs[r * self.width + c] = cost
+            self._workspaces = []
+            for adj in self._adjacency.values():
+                adj.set_cost(r * self.width + c, cost)
+        if wall is not None:
+            self._components.clear()
+            self._padded = None
+            byte, bit = r * self.stride + (c >> 3), 1 << (c & 7)
+            self.bits[byte] = (self.bits[byte] | bit) if wall else (self.bits[byte] & ~bit & 0xFF)
+
+    @property
+    def step_cost(self) -> np.ndarray:
+        step = np.ones(self.height * self.width, dtype=np.float32) if self.costs is None \
+            else np.array(self.costs, dtype=np.float32)
+        step[self.walls == 1] = np.inf
+        return step
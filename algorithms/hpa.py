@@ -0,0 +1,298 @@
+from typing import List, Tuple, Optional, Dict, Iterable
+from collections import deque
+import heapq
+
+import numpy as np
+
+from .grid import Grid, as_grid
+from .a_star import HEURISTICS, euclidean
+from .stats import CHECK_INTERVAL, SearchStats
+
+Coord = Tuple[int, int]
+Bounds = Tuple[int, int, int, int]
+
+# Entrances of at least this many cell pairs get a transition at each end instead of one in the middle.
+ENTRANCE_SPLIT = 6
+
+
+def cluster_map_path(maze_path: str, cluster_size: int, diagonals: bool) -> str:
+    """Where the abstraction of a maze file is persisted: next to the maze."""
+    return f"{maze_path}.hpa{cluster_size}{'d' if diagonals else ''}.npz"
+
+
+class ClusterMap:
+    """
+    HPA* abstraction of a grid: fixed-size square clusters, entrance cells on
+    the cluster borders, and precomputed distances between the entrances of each
+    cluster. Built once per (grid, cluster_size, diagonals); save()/load()
+    persist it so later sessions skip the build.
+    """
+
+    def __init__(self, grid, cluster_size: int=32, diagonals: bool=False,
+                 edges: Optional[Dict[Coord, List[Tuple[Coord, float]]]]=None):
+        if cluster_size < 2:
+            raise ValueError("cluster_size must be at least 2")
+        self.grid = as_grid(grid)
+        self.cluster_size = cluster_size
+        self.diagonals = diagonals
+        # entrance -> [(entrance, cost), ...] for transitions and intra-cluster routes
+        self.edges = self._build() if edges is None else edges
+        self._members: Dict[Coord, List[Coord]] = {}
+        for node in self.edges:
+            self._members.setdefault(self.cluster_of(node), []).append(node)
+
+    @property
+    def node_count(self) -> int:
+        return len(self.edges)
+
+    def matches(self, grid: Grid, diagonals: bool) -> bool:
+        return self.grid is grid and self.diagonals == diagonals
+
+    def cluster_of(self, cell: Coord) -> Coord:
+        C = self.cluster_size
+        return (cell[0] // C * C, cell[1] // C * C)
+
+    def bounds(self, cell: Coord) -> Bounds:
+        r0, c0 = self.cluster_of(cell)
+        H, W = self.grid.shape
+        return r0, c0, min(r0 + self.cluster_size, H), min(c0 + self.cluster_size, W)
+
+    # ---------------------- Build ----------------------
+    def _border(self, a_side: np.ndarray, b_side: np.ndarray, cell_a, cell_b, out: set) -> None:
+        """Transitions across one border line; runs are split where the cluster changes along it."""
+        C, n = self.cluster_size, len(a_side)
+        pair = a_side & b_side
+        for lo in range(0, n, C):
+            hi = min(lo + C, n)
+            i = lo
+            while i < hi:
+                if not pair[i]:
+                    i += 1
+                    continue
+                j = i
+                while j < hi and pair[j]:
+                    j += 1
+                ends = (i, j - 1) if j - i >= ENTRANCE_SPLIT else ((i + j - 1) // 2,)
+                for k in ends:
+                    out.add((cell_a(k), cell_b(k)))
+                i = j
+        if not self.diagonals:
+            return
+        # Diagonal crossings not already covered by a straight entrance of the same run.
+        for i in np.flatnonzero(a_side).tolist():
+            for k in (i - 1, i + 1):
+                if 0 <= k < n and b_side[k] and not (pair[i] and pair[k] and i // C == k // C):
+                    out.add((cell_a(i), cell_b(k)))
+
+    def _build(self) -> Dict[Coord, List[Tuple[Coord, float]]]:
+        grid, C = self.grid, self.cluster_size
+        H, W = grid.shape
+        free = grid.wall_array() == 0
+        transitions = set()
+        for x in range(C, W, C):
+            self._border(free[:, x-1], free[:, x], lambda i: (i, x-1), lambda i: (i, x), transitions)
+        for y in range(C, H, C):
+            self._border(free[y-1], free[y], lambda i: (y-1, i), lambda i: (y, i), transitions)
+
+        edges: Dict[Coord, List[Tuple[Coord, float]]] = {}
+        for a, b in transitions:
+            edges.setdefault(a, []).append((b, grid.cost(*b)))
+            edges.setdefault(b, []).append((a, grid.cost(*a)))
+        members: Dict[Coord, List[Coord]] = {}
+        for node in edges:
+            members.setdefault(self.cluster_of(node), []).append(node)
+        for nodes in members.values():
+            for u in nodes:
+                dist, _ = self._cluster_search(u, self.bounds(u), targets=nodes)
+                edges[u].extend((v, dist[v]) for v in nodes if v != u and v in dist)
+        return edges
+
+    def _cluster_search(self, source: Coord, bounds: Bounds, *, targets: Iterable[Coord]=(),
+                        reverse: bool=False) -> Tuple[Dict[Coord, float], Dict[Coord, Coord]]:
+        """
+        Dijkstra from `source` that never leaves the cluster `bounds`; stops once
+        every target is settled. reverse=True gives the costs of reaching `source`.
+        Returns: (dist, parent).
+        """
+        r0, c0, r1, c1 = bounds
+        W = self.grid.width
+        offsets, neighbors, costs = self.grid.adjacency(self.diagonals).views()
+        step_cost = self.grid.step_view
+        inf = float("inf")
+        lo, hi = r0*W, r1*W   # rows r0..r1-1 are one contiguous range of flat indices
+        s = source[0]*W + source[1]
+        remaining = {r*W + c for r, c in targets}
+        remaining.discard(s)
+        dist = {s: 0.0}
+        parent = {}
+        if self.grid.uniform:
+            # Every step costs 1: a plain BFS settles cells in order.
+            queue = deque([s])
+            while queue and (remaining or not targets):
+                u = queue.popleft()
+                remaining.discard(u)
+                d = dist[u] + 1.0
+                for j in range(offsets[u], offsets[u+1]):
+                    v = neighbors[j]
+                    if costs[j] != inf and lo <= v < hi and c0 <= v % W < c1 and v not in dist:
+                        dist[v] = d
+                        parent[v] = u
+                        queue.append(v)
+        else:
+            heap = [(0.0, s)]
+            while heap and (remaining or not targets):
+                d, u = heapq.heappop(heap)
+                if d > dist[u]:
+                    continue
+                remaining.discard(u)
+                leave = step_cost[u]
+                for j in range(offsets[u], offsets[u+1]):
+                    step = costs[j]
+                    v = neighbors[j]
+                    if step == inf or not (lo <= v < hi and c0 <= v % W < c1):
+                        continue
+                    nd = d + (leave if reverse else step)
+                    if nd < dist.get(v, inf):
+                        dist[v] = nd
+                        parent[v] = u
+                        heapq.heappush(heap, (nd, v))
+        return ({divmod(v, W): d for v, d in dist.items()},
+                {divmod(v, W): divmod(u, W) for v, u in parent.items()})
+
+    # ---------------------- Persistence ----------------------
+    def save(self, path: str, digest: str="") -> None:
+        """Write the abstraction to a .npz; `digest` identifies the maze it belongs to."""
+        nodes = list(self.edges)
+        index = {node: i for i, node in enumerate(nodes)}
+        src, dst, cost = [], [], []
+        for u, out in self.edges.items():
+            for v, c in out:
+                src.append(index[u])
+                dst.append(index[v])
+                cost.append(c)
+        with open(path, "wb") as fh:
+            np.savez(fh, shape=np.asarray(self.grid.shape, dtype=np.int64),
+                     cluster_size=np.int64(self.cluster_size), diagonals=np.bool_(self.diagonals),
+                     digest=np.str_(digest), nodes=np.asarray(nodes, dtype=np.int32).reshape(-1, 2),
+                     src=np.asarray(src, dtype=np.int32), dst=np.asarray(dst, dtype=np.int32),
+                     cost=np.asarray(cost, dtype=np.float64))
+
+    @classmethod
+    def load(cls, path: str, grid, digest: Optional[str]=None) -> "ClusterMap":
+        """Read a saved abstraction for `grid`; raises ValueError if it belongs to another maze."""
+        grid = as_grid(grid)
+        with np.load(path) as data:
+            if tuple(data["shape"].tolist()) != grid.shape or (digest and str(data["digest"]) != digest):
+                raise ValueError(f"{path}: cluster map was built for a different maze")
+            nodes = [tuple(n) for n in data["nodes"].tolist()]
+            edges = {node: [] for node in nodes}
+            for s, d, c in zip(data["src"].tolist(), data["dst"].tolist(), data["cost"].tolist()):
+                edges[nodes[s]].append((nodes[d], c))
+            return cls(grid, int(data["cluster_size"]), bool(data["diagonals"]), edges)
+
+    # ---------------------- Queries ----------------------
+    def find_path(self, start: Coord, goal: Coord, *, heuristic: str="manhattan",
+                  stats: Optional[SearchStats]=None) -> tuple[list[Coord], SearchStats, float|None]:
+        """
+        HPA* query: connect start and goal to the entrances of their clusters,
+        search the abstract graph, then refine each abstract edge inside its cluster.
+        Returns: (path, stats, total_cost) like a_star.find_path; stats count
+        (and record) the expanded abstract nodes. Paths are near-optimal:
+        they only cross cluster borders at entrance cells.
+        """
+        stats = SearchStats() if stats is None else stats
+        grid = self.grid
+        if not grid.walkable(*start) or not grid.walkable(*goal) or not grid.connected(start, goal, self.diagonals):
+            return [], stats, None
+        if start == goal:
+            stats.count(expanded=1)
+            return [start], stats, 0.0
+
+        with stats.phase("setup"):
+            start_nodes = self._members.get(self.cluster_of(start), [])
+            goal_nodes = self._members.get(self.cluster_of(goal), [])
+            same = self.cluster_of(start) == self.cluster_of(goal)
+            dist, _ = self._cluster_search(start, self.bounds(start), targets=start_nodes + ([goal] if same else []))
+            out_start = [(v, dist[v]) for v in start_nodes + ([goal] if same else []) if v != start and v in dist]
+            dist, _ = self._cluster_search(goal, self.bounds(goal), targets=goal_nodes, reverse=True)
+            into_goal = {v: dist[v] for v in goal_nodes if v != goal and v in dist}
+
+        h_fn = HEURISTICS.get(heuristic, euclidean)
+        on_expand = stats.recorder()
+        check = stats.checkpoint()
+        g = {start: 0.0}
+        came_from = {}
+        heap = [(h_fn(start, goal), 0.0, start)]
+        inf = float("inf")
+        pushes, pops, expanded, peak_open = 1, 0, 0, 1
+        found = False
+        with stats.phase("search"):
+            while heap:
+                _, g_curr, u = heapq.heappop(heap)
+                pops += 1
+                if g_curr > g[u]:
+                    continue
+                expanded += 1
+                if on_expand:
+                    on_expand(u)
+                if check and not expanded % CHECK_INTERVAL and check(expanded):
+                    break
+                if u == goal:
+                    found = True
+                    break
+                out = self.edges.get(u, [])
+                if u == start:
+                    out = out + out_start
+                if u in into_goal:
+                    out = out + [(goal, into_goal[u])]
+                for v, cost in out:
+                    tentative_g = g_curr + cost
+                    if tentative_g < g.get(v, inf):
+                        g[v] = tentative_g
+                        came_from[v] = u
+                        heapq.heappush(heap, (tentative_g + h_fn(v, goal), tentative_g, v))
+                        pushes += 1
+                        if len(heap) > peak_open:
+                            peak_open = len(heap)
+        stats.count(expanded=expanded, pushes=pushes, pops=pops, stale_pops=pops - expanded, peak_open=peak_open)
+        if not found:
+            return [], stats, None
+
+        with stats.phase("path"):
+            route = [goal]
+            while route[-1] in came_from:
+                route.append(came_from[route[-1]])
+            route.reverse()
+            path = self._refine(route)
+        return path, stats, g[goal]
+
+    def _refine(self, route: List[Coord]) -> List[Coord]:
+        path = [route[0]]
+        for u, v in zip(route, route[1:]):
+            if self.cluster_of(u) != self.cluster_of(v):
+                path.append(v)  # transition between neighboring clusters
+                continue
+            _, parent = self._cluster_search(u, self.bounds(u), targets=(v,))
+            segment = [v]
+            while segment[-1] != u:
+                segment.append(parent[segment[-1]])
+            path.extend(reversed(segment[:-1]))
+        return path
+
+
+def find_path(grid, start: Coord, goal: Coord, *, diagonals: bool=False, heuristic: str="manhattan",
+              cluster_size: int=32, cluster_map: Optional[ClusterMap]=None,
+              stats: Optional[SearchStats]=None) -> tuple[list[Coord], SearchStats, float|None]:
+    """
+    Hierarchical A* (HPA*). Builds a ClusterMap unless one is passed in; reuse it
+    across queries (or persist it with ClusterMap.save) to amortize the build.
+    Returns: (path, stats, total_cost) like a_star.find_path.
+    """
+    stats = SearchStats() if stats is None else stats
+    with stats.phase("setup"):
+        grid = as_grid(grid)
+        if cluster_map is None:
+            cluster_map = ClusterMap(grid, cluster_size, diagonals)
+        elif not cluster_map.matches(grid, diagonals):
+            raise ValueError("cluster map was built for a different maze or connectivity")
+    return cluster_map.find_path(start, goal, heuristic=heuristic, stats=stats)
@@ -0,0 +1,296 @@
+from typing import List, Tuple, Optional, Dict
+import heapq
+
+import numpy as np
+
+from .grid import Grid, as_grid
+from . import a_star
+from .a_star import HEURISTICS, manhattan, euclidean, chebyshev
+from .stats import CHECK_INTERVAL, SearchStats
+
+Coord = Tuple[int, int]
+
+DIRS4 = ((1,0),(-1,0),(0,1),(0,-1))
+DIRS8 = DIRS4 + ((1,1),(1,-1),(-1,1),(-1,-1))
+
+
+def _jump_points_right(V: np.ndarray, diagonals: bool) -> np.ndarray:
+    """Cells of V that stop a straight jump travelling in +column direction."""
+    F = ~V
+    jp = np.zeros_like(V)
+    if diagonals:
+        # forced diagonal neighbor: side cell blocked, cell diagonally ahead free
+        jp[1:-1, :-1] = F[1:-1, :-1] & ((V[:-2, :-1] & F[:-2, 1:]) | (V[2:, :-1] & F[2:, 1:]))
+    else:
+        # forced turn: side cell free while the side cell one step back is blocked
+        jp[1:-1, 1:] = F[1:-1, 1:] & ((F[:-2, 1:] & V[:-2, :-1]) | (F[2:, 1:] & V[2:, :-1]))
+    return jp
+
+
+def _jump_distances_right(V: np.ndarray, jp: np.ndarray, dtype) -> np.ndarray:
+    """
+    For each cell, steps to the next jump point to the right (positive), or minus the
+    number of free cells before the next wall (<= 0) when there is no jump point.
+    """
+    Hp, Wp = V.shape
+    cols = np.arange(Wp)
+    pos = np.where(V | jp, cols, Wp)
+    nearest = np.minimum.accumulate(pos[:, ::-1], axis=1)[:, ::-1]
+    after = np.full_like(nearest, Wp - 1)
+    after[:, :-1] = nearest[:, 1:]
+    after = np.minimum(after, Wp - 1)
+    k = after - cols
+    hit_jp = np.take_along_axis(jp, after, axis=1)
+    out = np.where(hit_jp, k, -(k - 1))
+    out[V] = 0
+    return out.astype(dtype)
+
+
+class JumpTable:
+    """
+    JPS+ preprocessing: precomputed straight-line jump distances for one maze.
+
+    For every cell and straight direction, `dist[(dr, dc)]` holds the number of steps to
+    the next jump point (> 0), or minus the free run length before a wall (<= 0). Straight
+    jumps then cost one lookup instead of a scan. Built once per (grid, diagonals);
+    it keeps the padded wall mask it was built from for the scans it cannot replace,
+    and no longer matches its grid once a wall changes.
+    """
+
+    def __init__(self, grid, diagonals: bool=False):
+        grid = as_grid(grid)
+        self.grid = grid
+        self.shape = grid.shape
+        self.diagonals = diagonals
+        self.blocked = grid.padded_walls()
+        B = self.blocked.reshape(grid.height + 2, grid.width + 2) != 0
+        dtype = np.int16 if max(B.shape) < np.iinfo(np.int16).max else np.int32
+        # (view of B in which direction d moves right, inverse transform)
+        frames = {
+            (0, 1): (lambda a: a, lambda a: a),
+            (0, -1): (lambda a: a[:, ::-1], lambda a: a[:, ::-1]),
+            (1, 0): (lambda a: a.T, lambda a: a.T),
+            (-1, 0): (lambda a: a[::-1, :].T, lambda a: a.T[::-1, :]),
+        }
+        # On 4-connected grids only vertical moves are plain straight jumps.
+        dirs = ((0,1),(0,-1),(1,0),(-1,0)) if diagonals else ((1,0),(-1,0))
+        self.dist: Dict[Tuple[int, int], np.ndarray] = {}
+        for d in dirs:
+            fwd, inv = frames[d]
+            V = np.ascontiguousarray(fwd(B))
+            table = _jump_distances_right(V, _jump_points_right(V, diagonals), dtype)
+            self.dist[d] = np.ascontiguousarray(inv(table)).reshape(-1)
+
+    def matches(self, grid: Grid, diagonals: bool) -> bool:
+        # A wall change drops the grid's padded mask, so a stale table holds an old one.
+        return self.grid is grid and self.diagonals == diagonals and grid.padded_walls() is self.blocked
+
+
+class _JumpSearch:
+    """Jump primitives on a wall-padded flat grid; coordinates are padded (r+1, c+1)."""
+
+    def __init__(self, grid: Grid, goal: Coord, diagonals: bool, table: Optional[JumpTable]):
+        self.Wp = grid.width + 2
+        blocked = grid.padded_walls() if table is None else table.blocked
+        self.blocked = memoryview(blocked)
+        self.gr, self.gc = goal[0] + 1, goal[1] + 1
+        self.goal = self.gr * self.Wp + self.gc
+        self.diagonals = diagonals
+        self.table = None if table is None else {d: memoryview(a) for d, a in table.dist.items()}
+
+    def straight(self, r: int, c: int, dr: int, dc: int) -> Optional[Coord]:
+        """Jump along a row/column; returns the jump point or None."""
+        if self.table is not None and (dr, dc) in self.table:
+            j = self.table[(dr, dc)][r*self.Wp + c]
+            reach = j if j > 0 else -j
+            if dr == 0 and r == self.gr and 0 < (self.gc - c)*dc <= reach:
+                return (self.gr, self.gc)
+            if dc == 0 and c == self.gc and 0 < (self.gr - r)*dr <= reach:
+                return (self.gr, self.gc)
+            return (r + j*dr, c + j*dc) if j > 0 else None
+
+        blocked, Wp, goal = self.blocked, self.Wp, self.goal
+        step = dr*Wp + dc
+        i = r*Wp + c
+        while True:
+            i += step
+            if blocked[i]:
+                return None
+            if i == goal:
+                return divmod(i, Wp)
+            if self.diagonals:
+                if dc:
+                    if (blocked[i-Wp] and not blocked[i-Wp+dc]) or (blocked[i+Wp] and not blocked[i+Wp+dc]):
+                        return divmod(i, Wp)
+                elif (blocked[i-1] and not blocked[i+dr*Wp-1]) or (blocked[i+1] and not blocked[i+dr*Wp+1]):
+                    return divmod(i, Wp)
+            elif (not blocked[i-1] and blocked[i-dr*Wp-1]) or (not blocked[i+1] and blocked[i-dr*Wp+1]):
+                return divmod(i, Wp)
+
+    def jump(self, r: int, c: int, dr: int, dc: int) -> Optional[Coord]:
+        if self.diagonals and dr and dc:
+            return self._diagonal(r, c, dr, dc)
+        if not self.diagonals and dc:
+            return self._horizontal4(r, c, dc)
+        return self.straight(r, c, dr, dc)
+
+    def _diagonal(self, r: int, c: int, dr: int, dc: int) -> Optional[Coord]:
+        blocked, Wp, goal = self.blocked, self.Wp, self.goal
+        while True:
+            r += dr
+            c += dc
+            i = r*Wp + c
+            if blocked[i]:
+                return None
+            if i == goal:
+                return (r, c)
+            if (blocked[i-dr*Wp] and not blocked[i-dr*Wp+dc]) or (blocked[i-dc] and not blocked[i+dr*Wp-dc]):
+                return (r, c)
+            if self.straight(r, c, dr, 0) is not None or self.straight(r, c, 0, dc) is not None:
+                return (r, c)
+
+    def _horizontal4(self, r: int, c: int, dc: int) -> Optional[Coord]:
+        # 4-connected canonical paths turn vertical anywhere along a row, so a row cell
+        # is a jump point whenever a vertical jump from it finds something.
+        blocked, Wp, goal = self.blocked, self.Wp, self.goal
+        while True:
+            c += dc
+            i = r*Wp + c
+            if blocked[i]:
+                return None
+            if i == goal:
+                return (r, c)
+            if self.straight(r, c, 1, 0) is not None or self.straight(r, c, -1, 0) is not None:
+                return (r, c)
+
+    def successors_dirs(self, r: int, c: int, parent: Optional[Coord]) -> List[Coord]:
+        """Pruned move directions from (r, c) given the jump point it was reached from."""
+        if parent is None:
+            return list(DIRS8 if self.diagonals else DIRS4)
+        dr = (r > parent[0]) - (r < parent[0])
+        dc = (c > parent[1]) - (c < parent[1])
+        blocked, Wp = self.blocked, self.Wp
+        i = r*Wp + c
+        if self.diagonals:
+            if dr and dc:
+                dirs = [(dr, 0), (0, dc), (dr, dc)]
+                if blocked[i - dr*Wp]:
+                    dirs.append((-dr, dc))
+                if blocked[i - dc]:
+                    dirs.append((dr, -dc))
+            elif dc:
+                dirs = [(0, dc)] + [(s, dc) for s in (1, -1) if blocked[i + s*Wp]]
+            else:
+                dirs = [(dr, 0)] + [(dr, s) for s in (1, -1) if blocked[i + s]]
+        else:
+            if dc:
+                dirs = [(0, dc), (1, 0), (-1, 0)]
+            else:
+                dirs = [(dr, 0)] + [(0, s) for s in (1, -1)
+                                    if not blocked[i + s] and blocked[i - dr*Wp + s]]
+        return dirs
+
+
+def _interpolate(points: List[Coord]) -> List[Coord]:
+    """Expand a jump-point path into the full cell-by-cell path."""
+    path = [points[0]]
+    for (r0, c0), (r1, c1) in zip(points, points[1:]):
+        dr = (r1 > r0) - (r1 < r0)
+        dc = (c1 > c0) - (c1 < c0)
+        r, c = r0, c0
+        while (r, c) != (r1, c1):
+            r += dr
+            c += dc
+            path.append((r, c))
+    return path
+
+
+def find_path(grid, start: Coord, goal: Coord, *, diagonals: bool=False,
+              heuristic: str="manhattan", table: Optional[JumpTable]=None,
+              stats: Optional[SearchStats]=None) -> tuple[list[Coord], SearchStats, float|None]:
+    """
+    Jump Point Search on a uniform-cost grid.
+    Returns: (path, stats, total_cost). path is the full cell path; stats count
+    (and record) the expanded jump points only. path=[] and cost=None if no path.
+    Passing a JumpTable (see find_path_plus) turns straight scans into table lookups.
+    Grids with a cost layer are not uniform and are delegated to a_star.find_path.
+    """
+    stats = SearchStats() if stats is None else stats
+    with stats.phase("setup"):
+        grid = as_grid(grid)
+    if not grid.uniform:
+        return a_star.find_path(grid, start, goal, diagonals=diagonals, heuristic=heuristic, stats=stats)
+    if not grid.walkable(*start) or not grid.walkable(*goal) or not grid.connected(start, goal, diagonals):
+        return [], stats, None
+    if table is not None and not table.matches(grid, diagonals):
+        raise ValueError("jump table was built for a different (or since modified) maze or connectivity")
+
+    h_fn = HEURISTICS.get(heuristic, euclidean)
+    step_len = chebyshev if diagonals else manhattan
+    search = _JumpSearch(grid, goal, diagonals, table)
+    on_expand = stats.recorder()
+    check = stats.checkpoint()
+
+    # All bookkeeping is in padded coordinates.
+    s = (start[0] + 1, start[1] + 1)
+    t = (goal[0] + 1, goal[1] + 1)
+    open_heap = []
+    # entries: (f, g, counter, node)
+    counter = 0
+    g = {s: 0}
+    heapq.heappush(open_heap, (h_fn(s, t), 0, counter, s))
+    came_from = {}
+    pops = expanded = peak_open = 0
+    found = False
+
+    with stats.phase("search"):
+        while open_heap:
+            _, g_curr, _, current = heapq.heappop(open_heap)
+            pops += 1
+            if g_curr > g[current]:
+                continue
+            expanded += 1
+            if on_expand:
+                on_expand((current[0] - 1, current[1] - 1))
+            if check and not expanded % CHECK_INTERVAL and check(expanded):
+                break
+
+            if current == t:
+                found = True
+                break
+
+            for dr, dc in search.successors_dirs(*current, came_from.get(current)):
+                jp = search.jump(current[0], current[1], dr, dc)
+                if jp is None:
+                    continue
+                tentative_g = g_curr + step_len(current, jp)
+                if tentative_g < g.get(jp, float("inf")):
+                    came_from[jp] = current
+                    g[jp] = tentative_g
+                    counter += 1
+                    heapq.heappush(open_heap, (tentative_g + h_fn(jp, t), tentative_g, counter, jp))
+                    if len(open_heap) > peak_open:
+                        peak_open = len(open_heap)
+    stats.count(expanded=expanded, pushes=counter + 1, pops=pops, stale_pops=pops - expanded, peak_open=peak_open)
+
+    if not found:
+        return [], stats, None
+    with stats.phase("path"):
+        points = a_star.reconstruct_path(came_from, t)
+        path = [(r - 1, c - 1) for r, c in _interpolate(points)]
+    return path, stats, g[t]
+
+
+def find_path_plus(grid, start: Coord, goal: Coord, *, diagonals: bool=False,
+                   heuristic: str="manhattan", table: Optional[JumpTable]=None,
+                   stats: Optional[SearchStats]=None) -> tuple[list[Coord], SearchStats, float|None]:
+    """
+    JPS+: Jump Point Search using precomputed straight jump distances.
+    Build the JumpTable once per maze and pass it in to amortize preprocessing across queries.
+    """
+    stats = SearchStats() if stats is None else stats
+    grid = as_grid(grid)
+    if table is None and grid.uniform:
+        with stats.phase("setup"):
+            table = JumpTable(grid, diagonals)
+    return find_path(grid, start, goal, diagonals=diagonals, heuristic=heuristic, table=table, stats=stats)
@@ -0,0 +1,161 @@
+from typing import Callable, Optional, Tuple
+
+from .stats import CHECK_INTERVAL
+
+# Priority-queue backends of dijkstra.find_path / a_star.find_path:
+#   "heap"    heapq with float keys; works for any non-negative costs
+#   "bucket"  Dial's bucket queue: a ring of max_step + 2 lists indexed by the integer key
+#   "radix"   radix heap: ~log2(max key) buckets of keys sharing a prefix with the last pop
+# "auto" picks bucket or radix when the cost layer is integral (see Adjacency.integer_costs)
+# and the heuristic is integral and consistent, heap otherwise.
+QUEUES = ("auto", "heap", "bucket", "radix")
+
+# Largest step cost Dial's ring is used for; beyond it the ring would mostly hold empty
+# buckets, so "auto" takes the radix heap instead and an explicit "bucket" is refused.
+BUCKET_LIMIT = 1 << 12
+
+# Heuristics whose values are integers and consistent with integer step costs >= 1.
+# ALT (algorithms.alt) is integral whenever the costs are, but its keys can jump by up
+# to twice the largest step, more than Dial's ring allows on weighted grids.
+INTEGER_HEURISTICS = {False: ("manhattan", "chebyshev", "alt"), True: ("chebyshev", "alt")}
+
+
+def select_queue(adjacency, queue: str="auto", heuristic: Optional[str]=None, diagonals: bool=False) -> str:
+    """
+    Resolve `queue` for a search over `adjacency` (heuristic=None for Dijkstra).
+    Raises ValueError when an integer queue is requested for costs or a
+    heuristic it cannot order exactly.
+    """
+    if queue not in QUEUES:
+        raise ValueError(f"unknown queue {queue!r}; expected one of {', '.join(QUEUES)}")
+    if queue == "heap":
+        return queue
+    integral = adjacency.integer_costs()
+    usable = integral is not None and (heuristic is None or heuristic in INTEGER_HEURISTICS[diagonals])
+    ring = usable and integral[0] <= BUCKET_LIMIT and (heuristic != "alt" or integral[0] == 1)
+    if queue != "auto":
+        if not usable:
+            raise ValueError(f"queue={queue!r} needs integer step costs >= 1 and an integer, consistent heuristic")
+        if queue == "bucket" and not ring:
+            raise ValueError(f"queue='bucket' needs step costs <= {BUCKET_LIMIT} (and unit costs with ALT); use 'radix'")
+        return queue
+    if not usable:
+        return "heap"
+    return "bucket" if ring else "radix"
+
+
+def integer_search(adjacency, s: int, t: int, queue: str, workspace, *,
+                   h: Optional[Callable[[int], int]]=None, width: int=1,
+                   on_expand=None, check=None) -> Tuple[Optional[int], Tuple[int, ...]]:
+    """
+    Best-first search from flat index s to t on integer keys g (+ h), with
+    queue "bucket" or "radix". Both need monotone keys, which integer step
+    costs >= 1 and a consistent integer h guarantee, so the first pop of a
+    node is final and later pops of it are stale. The search state lives in
+    `workspace` (see Grid.search_workspace()); workspace.path(t, width)
+    recovers the path afterwards.
+    Returns (cost of t or None, (expanded, pushes, pops, peak_open)).
+    """
+    max_step, costs = adjacency.integer_costs()
+    offsets, neighbors, _ = adjacency.views()
+    generation, stamp, g, came_from = workspace.begin()
+    done = generation + 1
+    stamp[s], g[s], came_from[s] = generation, 0, -1
+    key = h(s) if h else 0
+    size = pushes = peak_open = 1
+    pops = expanded = 0
+    found = None
+
+    if queue == "bucket":
+        # A key never exceeds the smallest queued key by more than max_step (+1 for the
+        # heuristic), so a ring of n lists holds every key without collisions.
+        n = max_step + 2
+        buckets = [[] for _ in range(n)]
+        buckets[key % n].append(s)
+        while size:
+            bucket = buckets[key % n]
+            while not bucket:
+                key += 1
+                bucket = buckets[key % n]
+            u = bucket.pop()
+            size -= 1
+            pops += 1
+            if stamp[u] == done:
+                continue
+            stamp[u] = done
+            expanded += 1
+            if on_expand:
+                on_expand(divmod(u, width))
+            if check and not expanded % CHECK_INTERVAL and check(expanded):
+                break
+            if u == t:
+                found = int(g[u])
+                break
+            g_u = int(g[u])   # g arrays hold floats
+            for j in range(offsets[u], offsets[u+1]):
+                step = costs[j]
+                if step < 0:
+                    continue
+                v = neighbors[j]
+                nd = g_u + step
+                if stamp[v] < generation or nd < g[v]:
+                    stamp[v] = generation
+                    g[v] = nd
+                    came_from[v] = u
+                    buckets[((nd + h(v)) if h else nd) % n].append(v)
+                    size += 1
+                    pushes += 1
+                    if size > peak_open:
+                        peak_open = size
+    elif queue == "radix":
+        # Bucket 0 holds keys equal to the last popped key `key`, bucket i > 0 keys whose
+        # highest bit differing from it is bit i - 1; emptying bucket 0 redistributes the
+        # first non-empty bucket around its minimum.
+        buckets = [[] for _ in range(65)]
+        buckets[0].append((key, s))
+        while size:
+            first = buckets[0]
+            if not first:
+                i = 1
+                while not buckets[i]:
+                    i += 1
+                spill = buckets[i]
+                key = min(spill)[0]
+                for entry in spill:
+                    buckets[(entry[0] ^ key).bit_length()].append(entry)
+                spill.clear()
+            u = first.pop()[1]
+            size -= 1
+            pops += 1
+            if stamp[u] == done:
+                continue
+            stamp[u] = done
+            expanded += 1
+            if on_expand:
+                on_expand(divmod(u, width))
+            if check and not expanded % CHECK_INTERVAL and check(expanded):
+                break
+            if u == t:
+                found = int(g[u])
+                break
+            g_u = int(g[u])   # g arrays hold floats
+            for j in range(offsets[u], offsets[u+1]):
+                step = costs[j]
+                if step < 0:
+                    continue
+                v = neighbors[j]
+                nd = g_u + step
+                if stamp[v] < generation or nd < g[v]:
+                    stamp[v] = generation
+                    g[v] = nd
+                    came_from[v] = u
+                    f = nd + h(v) if h else nd
+                    buckets[(f ^ key).bit_length()].append((f, v))
+                    size += 1
+                    pushes += 1
+                    if size > peak_open:
+                        peak_open = size
+    else:
+        raise ValueError(f"integer_search needs queue 'bucket' or 'radix', not {queue!r}")
+
+    return found, (expanded, pushes, pops, peak_open)
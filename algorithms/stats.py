@@ -0,0 +1,151 @@
+from typing import Callable, Dict, Optional, Tuple, Union
+from contextlib import contextmanager
+import time
+import tracemalloc
+
+Coord = Tuple[int, int]
+Record = Union[None, str, int, Callable[[Coord], None]]
+
+# Searches with a cancel token, time budget or progress callback check them every
+# CHECK_INTERVAL expansions, so the hot loop stays a counter test otherwise.
+CHECK_INTERVAL = 1024
+
+
+class SearchStats:
+    """
+    Counters for one search, returned as the second element of every find_path
+    (path, stats, cost).
+
+      expanded     nodes expanded (settled) by the search
+      pushes/pops  open-list insertions and removals (heap, queue or stack)
+      stale_pops   removals of entries superseded by a cheaper push
+      peak_open    largest open-list size seen
+      peak_memory  peak bytes allocated during the search (None unless track_memory=True)
+      phases       wall time in seconds per phase ("setup", "search", "path", ...)
+
+    The visited order is not kept by default. record="all" keeps every expanded
+    node in `visited`, an int n keeps every n-th one, and a callable is called
+    with each expanded node instead. len(stats) is the number of nodes expanded.
+
+    Searches stop cooperatively when `cancel` (anything with is_set(), e.g. a
+    threading.Event) is set or `time_budget` seconds have passed since the
+    first search checked in; they then return no path (anytime searches: their
+    best path so far) and `stopped` says why ("cancelled", "time budget", ...).
+    `progress` is called with the running number of expanded nodes at each check.
+    Anytime searches also set `bound`, the proven cost / optimal-cost ratio of
+    the path they returned.
+    """
+
+    def __init__(self, record: Record=None, *, track_memory: bool=False, cancel=None,
+                 time_budget: Optional[float]=None, progress: Optional[Callable[[int], None]]=None):
+        if record is not None and not callable(record) and record != "all" and not (isinstance(record, int) and record > 0):
+            raise ValueError(f"record must be None, 'all', a positive int or a callable, not {record!r}")
+        self.record = record
+        self.track_memory = track_memory
+        self.expanded = 0
+        self.pushes = 0
+        self.pops = 0
+        self.stale_pops = 0
+        self.peak_open = 0
+        self.peak_memory: Optional[int] = None
+        self.phases: Dict[str, float] = {}
+        self.visited = [] if record is not None and not callable(record) else None
+        self.cancel = cancel
+        self.time_budget = time_budget
+        self.progress = progress
+        self.stopped: Optional[str] = None
+        self.bound: Optional[float] = None
+        self._deadline: Optional[float] = None
+
+    def __len__(self) -> int:
+        return self.expanded
+
+    def __repr__(self) -> str:
+        return (f"SearchStats(expanded={self.expanded}, pushes={self.pushes}, pops={self.pops}, "
+                f"stale_pops={self.stale_pops}, peak_open={self.peak_open}, time={self.total_time:.6f}s)")
+
+    @property
+    def total_time(self) -> float:
+        return sum(self.phases.values())
+
+    def recorder(self) -> Optional[Callable[[Coord], None]]:
+        """What a search loop calls with each expanded node, or None when nothing is recorded."""
+        record = self.record
+        if record is None:
+            return None
+        if callable(record):
+            return record
+        if record == "all" or record == 1:
+            return self.visited.append
+        visited, every = self.visited, record
+        seen = [0]
+
+        def sample(node: Coord) -> None:
+            if seen[0] % every == 0:
+                visited.append(node)
+            seen[0] += 1
+        return sample
+
+    def checkpoint(self) -> Optional[Callable[[int], bool]]:
+        """
+        What a search loop calls every CHECK_INTERVAL expansions with its local
+        expanded count; True means stop now. None when there is nothing to check.
+        """
+        if self.cancel is None and self.time_budget is None and self.progress is None:
+            return None
+        if self.time_budget is not None and self._deadline is None:
+            self._deadline = time.perf_counter() + self.time_budget
+        cancel, deadline, progress, base = self.cancel, self._deadline, self.progress, self.expanded
+
+        def check(expanded: int) -> bool:
+            if progress is not None:
+                progress(base + expanded)
+            if cancel is not None and cancel.is_set():
+                self.stopped = "cancelled"
+            elif deadline is not None and time.perf_counter() > deadline:
+                self.stopped = "time budget"
+            return self.stopped is not None
+        return check
+
+    def count(self, *, expanded: int=0, pushes: int=0, pops: int=0, stale_pops: int=0,
+              peak_open: int=0) -> None:
+        """Add a search loop's local counters (searches keep plain ints in the hot loop)."""
+        self.expanded += expanded
+        self.pushes += pushes
+        self.pops += pops
+        self.stale_pops += stale_pops
+        self.peak_open = max(self.peak_open, peak_open)
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a block (accumulating per name) and, if track_memory, its peak allocation."""
+        started = self.track_memory and not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        if self.track_memory:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        t0 = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - t0
+            if self.track_memory:
+                peak = tracemalloc.get_traced_memory()[1] - base
+                self.peak_memory = max(self.peak_memory or 0, peak)
+                if started:
+                    tracemalloc.stop()
+
+    def as_dict(self) -> dict:
+        return {
+            "nodes_expanded": self.expanded,
+            "pushes": self.pushes,
+            "pops": self.pops,
+            "stale_pops": self.stale_pops,
+            "peak_open": self.peak_open,
+            "peak_memory": self.peak_memory,
+            "phases": dict(self.phases),
+            "time_taken": self.total_time,
+            "stopped": self.stopped,
+            "bound": self.bound,
+        }
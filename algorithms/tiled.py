@@ -0,0 +1,276 @@
+import os
+import tempfile
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Hashable, Iterator, Optional, Tuple
+
+import numpy as np
+
+from .graph import LazyAdjacency
+from .grid import Grid
+from .workspace import SearchWorkspace
+
+
+class LRUCache:
+    """
+    Bounded mapping that loads missing entries with `load(key)` and drops the
+    least recently used one when full, passing it to `evict(key, value)` if
+    given. hits / misses / evictions count lookups for sizing the capacity.
+    """
+
+    def __init__(self, capacity: int, load: Callable[[Hashable], object],
+                 evict: Optional[Callable[[Hashable, object], None]] = None):
+        if capacity < 1:
+            raise ValueError("cache capacity must be at least 1")
+        self.capacity = capacity
+        self.load, self.evict = load, evict
+        self.entries: "OrderedDict[Hashable, object]" = OrderedDict()
+        self.hits = self.misses = self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key):
+        value = self.entries.get(key)
+        if value is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return value
+        self.misses += 1
+        value = self.load(key)
+        self.entries[key] = value
+        if len(self.entries) > self.capacity:
+            old_key, old_value = self.entries.popitem(last=False)
+            self.evictions += 1
+            if self.evict is not None:
+                self.evict(old_key, old_value)
+        return value
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {"capacity": self.capacity, "resident": len(self.entries), "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
+class _TileView:
+    """Flat-index reads through the tile cache: step costs, or wall flags when wall=True."""
+
+    __slots__ = ("grid", "wall")
+
+    def __init__(self, grid: "TiledGrid", wall: bool):
+        self.grid, self.wall = grid, wall
+
+    def __getitem__(self, idx: int):
+        grid = self.grid
+        r, c = divmod(idx, grid.width)
+        T = grid.tile
+        step = grid.tiles.get((r // T, c // T))[(r % T) * T + c % T]
+        if self.wall:
+            return 1 if step == np.inf else 0
+        return step
+
+
+class TiledGrid(Grid):
+    """
+    Read-only Grid whose cells live on disk in fixed-size square tiles
+    (typically a directory written by utils.tile_format). `load_tile(tr, tc)`
+    returns the (walls, costs-or-None) arrays of one tile, at most tile x tile
+    cells; only the `cache_tiles` most recently used tiles stay resident, as
+    flat float32 step-cost arrays padded to tile * tile cells.
+
+    Searches (A*, Dijkstra) walk it through a LazyAdjacency, so the tiles
+    loaded are the ones the frontier touches, and keep their stamp / g /
+    parent state in per-tile arrays from search_workspace(): `cache_arrays` of
+    them stay in memory and evicted ones are spilled to a temporary directory.
+    tiles.stats() and search_arrays.stats() report hits and misses.
+    wall_array()/walls/costs/step_cost assemble the whole maze and are meant
+    for mazes that fit in memory.
+    """
+
+    def __init__(self, load_tile: Callable[[int, int], Tuple[np.ndarray, Optional[np.ndarray]]],
+                 shape: Tuple[int, int], tile: int, *, has_costs: bool = False,
+                 max_cost: Optional[int] = 1, cache_tiles: int = 64, cache_arrays: int = 64,
+                 spill_dir: Optional[str] = None):
+        self.height, self.width = shape
+        self.tile = tile
+        self.tile_rows, self.tile_cols = -(-self.height // tile), -(-self.width // tile)
+        self.has_costs = has_costs
+        self.max_cost = max_cost if has_costs else 1
+        self.spill_dir = spill_dir
+        self._load_tile = load_tile
+        self.tiles = LRUCache(cache_tiles, self._read_tile)
+        self.cache_arrays = cache_arrays
+        self.search_arrays: Optional[SearchArrays] = None
+        self._adjacency = {}
+        self._components = {}
+        self._workspaces = []
+        self._padded = None   # padded_walls() (jps) assembles the whole maze once, like wall_array()
+        self._make_views()
+
+    def _make_views(self) -> None:
+        self.walls_view = _TileView(self, wall=True)
+        self.step_view = _TileView(self, wall=False)
+
+    def __getstate__(self):
+        raise TypeError("TiledGrid reads its tiles through a loader; reopen it with utils.tile_format.open_tiles")
+
+    def _read_tile(self, key: Tuple[int, int]) -> memoryview:
+        walls, costs = self._load_tile(*key)
+        T = self.tile
+        step = np.full((T, T), np.inf, dtype=np.float32)
+        h, w = walls.shape
+        step[:h, :w] = 1.0 if costs is None else costs
+        step[:h, :w][np.asarray(walls) != 0] = np.inf
+        return memoryview(step.reshape(-1))
+
+    # ---------------------- Whole-maze views ----------------------
+    def _assemble(self, walls: bool) -> np.ndarray:
+        T = self.tile
+        out = np.empty((self.height, self.width), dtype=np.uint8 if walls else np.float32)
+        for tr in range(self.tile_rows):
+            for tc in range(self.tile_cols):
+                w, c = self._load_tile(tr, tc)
+                block = out[tr*T:(tr+1)*T, tc*T:(tc+1)*T]
+                if walls:
+                    block[...] = np.asarray(w) != 0
+                else:
+                    block[...] = 1.0 if c is None else c
+        return out
+
+    def wall_array(self) -> np.ndarray:
+        return self._assemble(walls=True)
+
+    @property
+    def walls(self) -> np.ndarray:
+        return self.wall_array().reshape(-1)
+
+    @property
+    def costs(self) -> Optional[np.ndarray]:
+        return self._assemble(walls=False).reshape(-1) if self.has_costs else None
+
+    @property
+    def step_cost(self) -> np.ndarray:
+        step = self._assemble(walls=False).reshape(-1)
+        step[self.walls == 1] = np.inf
+        return step
+
+    @property
+    def uniform(self) -> bool:
+        return not self.has_costs
+
+    # ---------------------- Search support ----------------------
+    def adjacency(self, diagonals: bool = False) -> LazyAdjacency:
+        """Edges computed on access; the tiles they read are loaded through the tile cache."""
+        adj = self._adjacency.get(diagonals)
+        if adj is None:
+            adj = self._adjacency[diagonals] = LazyAdjacency(self, diagonals)
+        return adj
+
+    def integer_step_bound(self) -> Optional[int]:
+        return self.max_cost
+
+    @contextmanager
+    def search_workspace(self) -> Iterator[SearchWorkspace]:
+        """
+        A fresh TileWorkspace for one search, paged per tile. The arrays of
+        the previous search are dropped (with its spill files).
+        """
+        if self.search_arrays is not None:
+            self.search_arrays.close()
+        self.search_arrays = SearchArrays(self, self.cache_arrays, self.spill_dir)
+        yield TileWorkspace(self.search_arrays)
+
+    def cache_stats(self) -> dict:
+        return {"tiles": self.tiles.stats(),
+                "search_arrays": None if self.search_arrays is None else self.search_arrays.cache.stats()}
+
+    def set_cell(self, r: int, c: int, *, wall: Optional[bool] = None, cost: Optional[float] = None) -> None:
+        raise ValueError("tiled grids are read-only; rewrite the tiles with utils.tile_format")
+
+
+class SearchArrays:
+    """
+    Per-tile search arrays shared by the TileArrays of one search: an LRU of
+    resident arrays keyed by (map id, tile). An evicted array is saved under
+    a temporary directory (created on the first spill) and read back on its
+    next miss; spills counts those writes.
+    """
+
+    def __init__(self, grid: TiledGrid, capacity: int, spill_dir: Optional[str] = None):
+        self.grid = grid
+        self.cache = LRUCache(capacity, self._load, self._spill)
+        self.spill_dir = spill_dir
+        self._tmp: Optional[tempfile.TemporaryDirectory] = None
+        self._spilled = set()
+        self._maps = []
+        self.spills = 0
+
+    def register(self, dtype, fill) -> int:
+        self._maps.append((dtype, fill))
+        return len(self._maps) - 1
+
+    def _path(self, key) -> str:
+        if self._tmp is None:
+            self._tmp = tempfile.TemporaryDirectory(prefix="maze-search-", dir=self.spill_dir)
+        m, tr, tc = key
+        return os.path.join(self._tmp.name, f"{m}_{tr}_{tc}.bin")
+
+    def _load(self, key) -> memoryview:
+        dtype, fill = self._maps[key[0]]
+        if key in self._spilled:
+            return memoryview(np.fromfile(self._path(key), dtype=dtype))
+        return memoryview(np.full(self.grid.tile * self.grid.tile, fill, dtype=dtype))
+
+    def _spill(self, key, array: memoryview) -> None:
+        np.asarray(array).tofile(self._path(key))
+        self._spilled.add(key)
+        self.spills += 1
+
+    def close(self) -> None:
+        self.cache.entries.clear()
+        if self._tmp is not None:
+            self._tmp.cleanup()
+            self._tmp = None
+        self._spilled.clear()
+
+
+class TileArray:
+    """
+    Flat array stand-in over cell indices (a[i], a[i] = v), stored in per-tile
+    arrays of `dtype` that start out as `fill`.
+    """
+
+    __slots__ = ("cache", "id", "width", "tile")
+
+    def __init__(self, arrays: SearchArrays, dtype, fill):
+        self.cache = arrays.cache
+        self.id = arrays.register(dtype, fill)
+        self.width, self.tile = arrays.grid.width, arrays.grid.tile
+
+    def _slot(self, idx: int):
+        r, c = divmod(idx, self.width)
+        T = self.tile
+        return self.cache.get((self.id, r // T, c // T)), (r % T) * T + c % T
+
+    def __getitem__(self, idx: int):
+        array, j = self._slot(idx)
+        return array[j]
+
+    def __setitem__(self, idx: int, value) -> None:
+        array, j = self._slot(idx)
+        array[j] = value
+
+
+class TileWorkspace(SearchWorkspace):
+    """SearchWorkspace over TileArrays, for one search: its stamps start at 0, so no generation is ever stale."""
+
+    def __init__(self, arrays: SearchArrays):
+        self.size = arrays.grid.height * arrays.grid.width
+        self.generation = 0
+        self._views = (TileArray(arrays, np.uint32, 0), TileArray(arrays, np.float64, np.inf),
+                       TileArray(arrays, np.int64, -1))
+
+    @property
+    def nbytes(self) -> int:
+        return 0
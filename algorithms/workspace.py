@@ -0,0 +1,94 @@
+from typing import List, Tuple
+
+import numpy as np
+
+Coord = Tuple[int, int]
+
+# Largest generation before the stamps wrap around and are cleared for real.
+STAMP_LIMIT = np.iinfo(np.uint32).max - 2
+
+
+class SearchWorkspace:
+    """
+    Per-cell search state of one grid, indexed by r*W + c and reused from
+    query to query: parent (int32), g-score (float32, or float64 when
+    float32 could round a path cost) and a uint32 visit stamp per cell.
+
+    begin() starts a query by advancing the generation rather than clearing
+    the arrays: a cell whose stamp is older than the generation is unvisited
+    and its g and parent are garbage. A cell stamped `generation` is open (g
+    and parent valid), one stamped `generation + 1` closed. So a query only
+    touches the cells it visits, and the arrays are cleared once every 2**31
+    queries when the stamps run out.
+
+    Workspaces come from Grid.search_workspace(), which keeps a small pool
+    per grid so concurrent searches never share one, and hands out a
+    SparseWorkspace instead for grids too large for flat arrays.
+    """
+
+    def __init__(self, size: int, g_dtype=np.float32):
+        self.size = size
+        self.parent = np.empty(size, dtype=np.int32 if size < 2**31 else np.int64)
+        self.g = np.empty(size, dtype=g_dtype)
+        self.stamp = np.zeros(size, dtype=np.uint32)
+        self.generation = 0
+        self._views = (memoryview(self.stamp), memoryview(self.g), memoryview(self.parent))
+
+    @classmethod
+    def for_grid(cls, grid) -> "SearchWorkspace":
+        """Sized for `grid`; g is float32 when every path cost is an integer float32 holds exactly."""
+        n = grid.height * grid.width
+        max_step = grid.integer_step_bound()
+        exact = max_step is not None and max_step * n < 2**24
+        return cls(n, np.float32 if exact else np.float64)
+
+    @property
+    def nbytes(self) -> int:
+        return self.parent.nbytes + self.g.nbytes + self.stamp.nbytes
+
+    def begin(self):
+        """
+        Start a query: returns (generation, stamp, g, parent) with memoryviews
+        of the three arrays. Stamp the start `generation` and set its parent to -1.
+        """
+        if self.generation >= STAMP_LIMIT:
+            self.stamp.fill(0)
+            self.generation = 0
+        self.generation += 2
+        return (self.generation,) + self._views
+
+    def path(self, node: int, width: int) -> List[Coord]:
+        """Follow parent links back from `node` to the start of the current query; root-first coordinates."""
+        parent = self._views[2]
+        path = [node]
+        while parent[node] >= 0:
+            node = parent[node]
+            path.append(node)
+        path.reverse()
+        return [divmod(i, width) for i in path]
+
+
+class _Unstamped(dict):
+    """Stamp map of a SparseWorkspace: cells never stamped read as 0."""
+
+    __slots__ = ()
+
+    def __missing__(self, key: int) -> int:
+        return 0
+
+
+class SparseWorkspace(SearchWorkspace):
+    """
+    SearchWorkspace over dicts, for one search on a grid whose flat arrays
+    would not fit in memory (PackedGrid memmaps): it holds only the cells
+    the search visits.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.generation = 0
+        self._views = (_Unstamped(), {}, {})
+
+    @property
+    def nbytes(self) -> int:
+        return 0
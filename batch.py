@@ -0,0 +1,218 @@
+"""
+Headless batch solver: solve every maze image in a directory on a process pool
+and stream one JSON line per maze as results complete.
+
+    python batch.py examples/ --algorithm astar --output results.jsonl
+    python batch.py examples/ --output results.jsonl --resume   # skip mazes already in results.jsonl
+    python batch.py examples/ --images solved/ --heatmap --scale 4  # also write solution PNGs
+    python batch.py examples/ --heuristic alt   # A* with landmark tables saved next to each image
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Iterator, List, Optional, Set
+
+from maze_solver import ALGORITHMS, HEURISTIC_ALGORITHMS, MazeSolver
+from algorithms.grid import ONE_SHOT_CSR_CELLS, Grid
+from algorithms.stats import SearchStats
+from utils.image_processor import load_maze_image
+from utils.render import save_solution
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".gif")
+
+
+def iter_maze_files(root: str) -> Iterator[str]:
+    """Yield image files under `root` (or `root` itself) in a stable order, lazily per directory."""
+    if os.path.isfile(root):
+        yield root
+        return
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                yield os.path.join(dirpath, name)
+
+
+def solution_image_path(file_path: str, root: str, image_dir: str) -> str:
+    """Where the solution PNG of `file_path` goes: its path under `root`, mirrored into `image_dir`."""
+    base = root if os.path.isdir(root) else os.path.dirname(root)
+    stem = os.path.splitext(os.path.relpath(file_path, base or "."))[0]
+    return os.path.join(image_dir, stem + ".solution.png")
+
+
+def solve_file(file_path: str, options: dict) -> dict:
+    """
+    Load and solve one maze; never raises, errors are reported in the record.
+    With options["images"] set the solution is also drawn to a PNG there.
+    With heuristic "alt" the landmark table is loaded from next to the image,
+    or built and saved there for the next run.
+    """
+    record = {"file": file_path, "algorithm": options["algorithm"]}
+    try:
+        t0 = time.perf_counter()
+        kwargs = {"diagonals": options["diagonals"]}
+        if options["algorithm"] in HEURISTIC_ALGORITHMS:
+            kwargs["heuristic"] = options["heuristic"]
+        if kwargs.get("heuristic") == "alt":
+            solver = MazeSolver(file_path, diagonals=options["diagonals"], landmarks=options.get("landmarks", 8))
+            grid = solver.grid
+            kwargs["landmarks"] = solver.landmark_table()
+        else:
+            # One query per maze: large mazes skip the CSR adjacency build (see ONE_SHOT_CSR_CELLS).
+            grid = Grid(load_maze_image(file_path), csr_cells=ONE_SHOT_CSR_CELLS)
+        t1 = time.perf_counter()
+        H, W = grid.shape
+        start = tuple(options["start"]) if options.get("start") else (1, 1)
+        goal = tuple(options["goal"]) if options.get("goal") else (H - 2, W - 2)
+        heatmap = options.get("images") and options.get("heatmap")
+        stats = SearchStats(record="all") if heatmap else None
+        path, stats, cost = ALGORITHMS[options["algorithm"]](grid, start, goal, stats=stats, **kwargs)
+        t2 = time.perf_counter()
+        record.update({
+            "shape": [H, W],
+            "start": list(start),
+            "goal": list(goal),
+            "found": bool(path),
+            "path_length": len(path) - 1 if path else None,
+            "cost": cost,
+            "nodes_expanded": stats.expanded,
+            "peak_open": stats.peak_open,
+            "load_ms": round((t1 - t0) * 1000, 3),
+            "solve_ms": round((t2 - t1) * 1000, 3),
+        })
+        if options.get("images"):
+            image = solution_image_path(file_path, options["root"], options["images"])
+            os.makedirs(os.path.dirname(image), exist_ok=True)
+            ends = [p if grid.in_bounds(*p) else None for p in (start, goal)]
+            save_solution(image, grid.wall_array(), path, *ends, visited=stats.visited if heatmap else None,
+                          scale=options.get("scale", 1))
+            record["image"] = image
+            record["render_ms"] = round((time.perf_counter() - t2) * 1000, 3)
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+    return record
+
+
+def solve_chunk(files: List[str], options: dict) -> List[dict]:
+    return [solve_file(f, options) for f in files]
+
+
+def completed_files(output: str) -> Set[str]:
+    """Files that already have a successful record in an existing JSON-lines output."""
+    done = set()
+    if not output or not os.path.exists(output):
+        return done
+    with open(output, "r", encoding="utf-8") as fh:
+        for line in fh:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # partially written last line of an interrupted run
+            if "error" not in record:
+                done.add(record["file"])
+    return done
+
+
+def _chunks(files: Iterator[str], size: int) -> Iterator[List[str]]:
+    chunk = []
+    for f in files:
+        chunk.append(f)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def run_batch(root: str, options: dict, out, *, workers: Optional[int] = None, chunk_size: int = 16,
+              skip: Optional[Set[str]] = None) -> int:
+    """
+    Solve all mazes under `root`, writing one JSON line per maze to `out` as soon as
+    its chunk completes. At most 2 chunks per worker are in flight, so memory stays
+    flat however many files there are. Returns the number of records written.
+    """
+    skip = skip or set()
+    files = (f for f in iter_maze_files(root) if f not in skip)
+    chunks = _chunks(files, chunk_size)
+    written = 0
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        max_in_flight = 2 * workers
+        pending = set()
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < max_in_flight:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    exhausted = True
+                else:
+                    pending.add(pool.submit(solve_chunk, chunk, options))
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                for record in fut.result():
+                    out.write(json.dumps(record) + "\n")
+                    written += 1
+                out.flush()
+    return written
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Solve a directory of maze images headlessly.")
+    parser.add_argument("input", help="maze image or directory of images")
+    parser.add_argument("--algorithm", choices=sorted(ALGORITHMS), default="astar")
+    parser.add_argument("--heuristic", choices=["manhattan", "euclidean", "chebyshev", "alt"], default="manhattan",
+                        help="alt: ALT landmarks (astar only), tables saved next to each image")
+    parser.add_argument("--landmarks", type=int, default=8, help="landmarks per table with --heuristic alt")
+    parser.add_argument("--diagonals", action="store_true", help="allow 8-neighbour moves")
+    parser.add_argument("--start", type=int, nargs=2, metavar=("R", "C"), help="default: 1 1")
+    parser.add_argument("--goal", type=int, nargs=2, metavar=("R", "C"), help="default: H-2 W-2")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=16, help="images per submitted task")
+    parser.add_argument("--output", help="JSON-lines file to append to (default: stdout)")
+    parser.add_argument("--images", metavar="DIR", help="also write each solution as a PNG under DIR")
+    parser.add_argument("--heatmap", action="store_true", help="shade expanded cells in the --images PNGs")
+    parser.add_argument("--scale", type=int, default=1, help="pixels per cell in the --images PNGs")
+    parser.add_argument("--resume", action="store_true", help="skip images already solved in --output")
+    args = parser.parse_args(argv)
+
+    if args.resume and not args.output:
+        parser.error("--resume needs --output")
+    if args.scale < 1:
+        parser.error("--scale must be at least 1")
+    if args.heuristic == "alt" and args.algorithm != "astar":
+        parser.error("--heuristic alt is only supported by --algorithm astar")
+    options = {
+        "algorithm": args.algorithm,
+        "heuristic": args.heuristic,
+        "landmarks": args.landmarks,
+        "diagonals": args.diagonals,
+        "start": args.start,
+        "goal": args.goal,
+        "root": args.input,
+        "images": args.images,
+        "heatmap": args.heatmap,
+        "scale": args.scale,
+    }
+    skip = completed_files(args.output) if args.resume else set()
+    out = open(args.output, "a+", encoding="utf-8") if args.output else sys.stdout
+    if out is not sys.stdout and out.tell() > 0:
+        out.seek(out.tell() - 1)
+        if out.read(1) != "\n":
+            out.write("\n")  # terminate a line cut off by an interrupted run
+    try:
+        written = run_batch(args.input, options, out, workers=args.workers,
+                            chunk_size=max(1, args.chunk_size), skip=skip)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"{written} mazes solved ({len(skip)} skipped)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
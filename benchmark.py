@@ -0,0 +1,196 @@
+"""
+Benchmark harness: run every algorithm in maze_solver.ALGORITHMS over the
+example images and deterministic synthetic mazes (utils.maze_generators),
+report time, nodes expanded, peak memory and optimality against Dijkstra,
+and compare with a saved JSON baseline.
+
+    python benchmark.py --save baseline.json
+    python benchmark.py --baseline baseline.json          # exit status 1 on regressions
+    python benchmark.py --examples "" --kinds perfect rooms --sizes 64 1024 8192 --algorithms astar jps+
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from maze_solver import ALGORITHMS, MazeSolver
+from algorithms.grid import Grid
+from algorithms.stats import SearchStats
+from batch import iter_maze_files
+from utils.image_processor import load_maze_image
+from utils.maze_generators import GENERATORS
+
+Coord = Tuple[int, int]
+
+DEFAULT_SIZES = (64, 256, 1024)
+# A slower query only counts as a regression past both the relative and the absolute margin.
+MIN_REGRESSION_MS = 1.0
+
+
+def iter_mazes(examples: Optional[str], kinds: Iterable[str], sizes: Iterable[int],
+               seed: int = 0) -> Iterator[Tuple[str, str, Grid]]:
+    """Yield (name, kind, grid): example images first, then each synthetic kind at each size."""
+    if examples:
+        for file_path in iter_maze_files(examples):
+            yield file_path, "example", Grid(load_maze_image(file_path))
+    for kind in kinds:
+        for size in sizes:
+            made = GENERATORS[kind](size, seed)
+            grid = Grid(*made) if isinstance(made, tuple) else Grid(made)
+            yield f"{kind}-{size}", kind, grid
+
+
+def endpoints(grid: Grid) -> Tuple[Coord, Coord]:
+    """GUI defaults (1,1) -> (H-2, W-2), or the first/last free cell when those are walls."""
+    H, W = grid.shape
+    start, goal = (1, 1), (H - 2, W - 2)
+    if grid.walkable(*start) and grid.walkable(*goal):
+        return start, goal
+    free = (grid.walls == 0).nonzero()[0]
+    return grid.coord(int(free[0])), grid.coord(int(free[-1]))
+
+
+def path_cost(grid: Grid, path: List[Coord]) -> Optional[float]:
+    return float(sum(grid.cost(*p) for p in path[1:])) if path else None
+
+
+def bench_maze(name: str, kind: str, grid: Grid, algorithms: Iterable[str], *, diagonals: bool = False,
+               heuristic: str = "manhattan", repeat: int = 3, memory: bool = True, landmarks: int = 8) -> List[dict]:
+    """
+    Run each algorithm on one maze; one record per algorithm. heuristic="alt"
+    applies to astar (its landmark table counts as preprocessing); the other
+    heuristic searches keep the geometric default.
+    """
+    solver = MazeSolver(grid, diagonals=diagonals, landmarks=landmarks)
+    geometric = "chebyshev" if diagonals else "manhattan"
+    start, goal = endpoints(grid)
+    ref = ALGORITHMS["dijkstra"](grid, start, goal, diagonals=diagonals)[2]
+    records = []
+    for algorithm in algorithms:
+        t0 = time.perf_counter()
+        options = solver.prepare(algorithm, geometric if heuristic == "alt" and algorithm != "astar" else heuristic)
+        preprocess = time.perf_counter() - t0
+        find_path = ALGORITHMS[algorithm]
+
+        best = float("inf")
+        for _ in range(max(1, repeat)):
+            t0 = time.perf_counter()
+            path, stats, _ = find_path(grid, start, goal, **options)
+            best = min(best, time.perf_counter() - t0)
+        peak = None
+        if memory:
+            peak = find_path(grid, start, goal, stats=SearchStats(track_memory=True), **options)[1].peak_memory
+
+        cost = path_cost(grid, path)
+        if ref is None or cost is None:
+            optimal = ref is None and cost is None
+        else:
+            optimal = abs(cost - ref) <= 1e-6 * max(1.0, ref)
+        records.append({
+            "maze": name,
+            "kind": kind,
+            "shape": list(grid.shape),
+            "algorithm": algorithm,
+            "diagonals": diagonals,
+            "found": bool(path),
+            "cost": cost,
+            "reference_cost": ref,
+            "optimal": optimal,
+            "cost_ratio": (cost / ref) if cost is not None and ref else None,
+            "nodes_expanded": stats.expanded,
+            "peak_open": stats.peak_open,
+            "time_ms": round(best * 1000, 3),
+            "preprocess_ms": round(preprocess * 1000, 3),
+            "peak_memory": peak,
+        })
+    return records
+
+
+def _key(record: dict) -> Tuple[str, str, bool]:
+    return record["maze"], record["algorithm"], record["diagonals"]
+
+
+def compare(results: List[dict], baseline: List[dict], *, tolerance: float = 0.5) -> List[str]:
+    """
+    Regressions of `results` against `baseline` (matched by maze, algorithm and
+    connectivity): slower by more than `tolerance` (and MIN_REGRESSION_MS), more
+    nodes expanded, more peak memory, or a path that is no longer optimal.
+    """
+    base: Dict[Tuple[str, str, bool], dict] = {_key(r): r for r in baseline}
+    problems = []
+    for r in results:
+        b = base.get(_key(r))
+        if b is None:
+            continue
+        name = f"{r['maze']} [{r['algorithm']}{', diagonals' if r['diagonals'] else ''}]"
+        if r["time_ms"] > b["time_ms"] * (1 + tolerance) and r["time_ms"] - b["time_ms"] > MIN_REGRESSION_MS:
+            problems.append(f"{name}: time {b['time_ms']:.3f} -> {r['time_ms']:.3f} ms")
+        if r["nodes_expanded"] > b["nodes_expanded"]:
+            problems.append(f"{name}: nodes expanded {b['nodes_expanded']} -> {r['nodes_expanded']}")
+        if r["peak_memory"] is not None and b.get("peak_memory") is not None \
+                and r["peak_memory"] > b["peak_memory"] * (1 + tolerance):
+            problems.append(f"{name}: peak memory {b['peak_memory']} -> {r['peak_memory']} bytes")
+        if b["optimal"] and not r["optimal"]:
+            problems.append(f"{name}: no longer optimal (cost {r['cost']} vs {r['reference_cost']})")
+    return problems
+
+
+def format_table(results: List[dict], header: bool = True) -> str:
+    title = f"{'maze':<28} {'algorithm':<10} {'time ms':>10} {'prep ms':>9} {'expanded':>10} {'peak KiB':>9} {'opt':>4}"
+    lines = [title, "-" * len(title)] if header else []
+    for r in results:
+        peak = "-" if r["peak_memory"] is None else f"{r['peak_memory'] / 1024:.0f}"
+        opt = "yes" if r["optimal"] else f"{r['cost_ratio']:.2f}" if r["cost_ratio"] else "no"
+        lines.append(f"{r['maze'][-28:]:<28} {r['algorithm']:<10} {r['time_ms']:>10.3f} {r['preprocess_ms']:>9.1f} "
+                     f"{r['nodes_expanded']:>10} {peak:>9} {opt:>4}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the pathfinding algorithms.")
+    parser.add_argument("--examples", default="examples", help='directory of maze images ("" to skip)')
+    parser.add_argument("--kinds", nargs="*", choices=sorted(GENERATORS), default=sorted(GENERATORS))
+    parser.add_argument("--sizes", nargs="*", type=int, default=list(DEFAULT_SIZES),
+                        help="synthetic maze side lengths, e.g. 64 256 1024 8192")
+    parser.add_argument("--algorithms", nargs="*", choices=sorted(ALGORITHMS), default=sorted(ALGORITHMS))
+    parser.add_argument("--diagonals", action="store_true")
+    parser.add_argument("--heuristic", choices=["manhattan", "euclidean", "chebyshev", "alt"], default=None,
+                        help="default: manhattan, or chebyshev with --diagonals; alt applies to astar only")
+    parser.add_argument("--landmarks", type=int, default=8, help="landmarks per table with --heuristic alt")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per query (best is kept)")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc run per query")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", help="write the results as a JSON baseline")
+    parser.add_argument("--baseline", help="compare against a JSON baseline; exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed relative slowdown or memory growth")
+    args = parser.parse_args(argv)
+
+    heuristic = args.heuristic or ("chebyshev" if args.diagonals else "manhattan")
+    results = []
+    for name, kind, grid in iter_mazes(args.examples, args.kinds, args.sizes, args.seed):
+        records = bench_maze(name, kind, grid, args.algorithms, diagonals=args.diagonals,
+                             heuristic=heuristic, repeat=args.repeat, memory=not args.no_memory,
+                             landmarks=args.landmarks)
+        print(format_table(records, header=not results), flush=True)
+        results.extend(records)
+
+    if args.save:
+        meta = {"python": platform.python_version(), "machine": platform.machine(),
+                "sizes": args.sizes, "seed": args.seed, "heuristic": heuristic}
+        with open(args.save, "w", encoding="utf-8") as fh:
+            json.dump({"meta": meta, "results": results}, fh, indent=1)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as fh:
+            baseline = json.load(fh)["results"]
+        problems = compare(results, baseline, tolerance=args.tolerance)
+        for p in problems:
+            print(f"REGRESSION {p}", file=sys.stderr)
+        print(f"{len(problems)} regressions against {args.baseline}", file=sys.stderr)
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
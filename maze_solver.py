@@ -0,0 +1,381 @@
+import os
+import sys
+from collections import OrderedDict, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from algorithms import a_star, alt, ara_star, bfs, corridors, dfs, dijkstra, hpa, jps
+from algorithms.components import Components
+from algorithms.grid import Grid, PackedGrid, as_grid
+from algorithms.tiled import TiledGrid
+from algorithms.stats import SearchStats
+from utils.cache import SolutionCache, grid_digest, solution_key
+from utils.image_processor import load_maze_image
+from utils.maze_format import open_maze
+from utils.render import save_solution
+from utils.tile_format import open_tiles
+
+Coord = Tuple[int, int]
+
+# Algorithm name -> find_path(grid, start, goal, diagonals=..., **options)
+ALGORITHMS = {
+    "astar": a_star.find_path,
+    "ara": ara_star.find_path,
+    "dijkstra": dijkstra.find_path,
+    "bfs": bfs.find_path,
+    "dfs": dfs.find_path,
+    "jps": jps.find_path,
+    "jps+": jps.find_path_plus,
+    "corridors": corridors.find_path,
+    "hpa": hpa.find_path,
+}
+HEURISTIC_ALGORITHMS = {"astar", "ara", "jps", "jps+", "hpa"}
+
+
+class SearchTree:
+    """
+    Shortest-path tree from one source, answering any number of goals.
+    Built by MazeSolver.shortest_paths_from(); do not construct directly.
+    """
+
+    def __init__(self, source: Coord, width: int, dist: np.ndarray,
+                 parent: Optional[np.ndarray], diagonals: bool):
+        self.source = source
+        self.width = width
+        self.diagonals = diagonals
+        self._dist = dist        # flat; float64 (Dijkstra) or int32 (BFS, -1 = unreached)
+        self._parent = parent    # flat int32 parent index, None for BFS trees
+
+    @property
+    def dist(self) -> np.ndarray:
+        """(H, W) array of path costs from the source."""
+        return self._dist.reshape(-1, self.width)
+
+    def _raw(self, goal: Coord):
+        r, c = goal
+        H = self._dist.size // self.width
+        if not (0 <= r < H and 0 <= c < self.width):
+            return None
+        d = self._dist[r*self.width + c]
+        if d < 0 or d == np.inf:
+            return None
+        return d
+
+    def cost_to(self, goal: Coord) -> Optional[float]:
+        d = self._raw(goal)
+        return None if d is None else float(d)
+
+    def path_to(self, goal: Coord) -> List[Coord]:
+        if self._raw(goal) is None:
+            return []
+        if self._parent is None:
+            return bfs.path_from_field(self.dist, goal, diagonals=self.diagonals)
+        W, parent = self.width, self._parent
+        i = goal[0]*W + goal[1]
+        path = [goal]
+        while parent[i] >= 0:
+            i = int(parent[i])
+            path.append(divmod(i, W))
+        path.reverse()
+        return path
+
+
+def _unreferenced(tree: SearchTree) -> bool:
+    """
+    True when only the caller's local variable holds `tree` and only the tree
+    holds its arrays, so they can be refilled. A view (tree.dist) keeps its
+    base array referenced. getrefcount() counts its own argument.
+    """
+    return sys.getrefcount(tree) == 3 and sys.getrefcount(tree._dist) == 2 and sys.getrefcount(tree._parent) == 2
+
+
+class MazeSolver:
+    """
+    Load a maze once and answer many queries on it.
+
+    The Grid and per-maze preprocessing (component labels, JPS+ jump tables,
+    corridor graphs, HPA* cluster maps, ALT landmark tables) are built once, and
+    full shortest-path trees are cached per (source, diagonals) in a bounded LRU,
+    so queries that share a source reuse one search. The arrays of an evicted
+    tree are refilled for the next one unless a caller still holds the tree
+    (or a view of its arrays), so handed-out trees stay valid. An optional
+    SolutionCache answers repeated point-to-point queries without searching.
+    """
+
+    def __init__(self, maze, *, diagonals: bool = False, max_trees: int = 16,
+                 cache: Optional[SolutionCache] = None, cluster_size: int = 32, landmarks: int = 8):
+        self.source = maze if isinstance(maze, str) else None
+        if isinstance(maze, str):
+            if os.path.isdir(maze):
+                maze = open_tiles(maze)
+            else:
+                maze = open_maze(maze) if maze.endswith(".maze") else load_maze_image(maze)
+        self.grid: Grid = as_grid(maze)
+        self.diagonals = diagonals
+        self.max_trees = max_trees
+        self._trees: "OrderedDict[Tuple[Coord, bool], SearchTree]" = OrderedDict()
+        self._spare: Optional[Tuple[np.ndarray, np.ndarray]] = None   # (dist, parent) nobody holds
+        self._jump_tables: Dict[bool, jps.JumpTable] = {}
+        self._corridor_graphs: Dict[bool, corridors.CorridorGraph] = {}
+        self.cluster_size = cluster_size
+        self._cluster_maps: Dict[bool, hpa.ClusterMap] = {}
+        self.landmarks = landmarks
+        self._landmark_tables: Dict[bool, alt.LandmarkTable] = {}
+        self.last_result: Optional[tuple] = None
+        self.cache = cache
+        self._digest: Optional[str] = None
+
+    @property
+    def digest(self) -> str:
+        """Content hash of the maze (computed once)."""
+        if self._digest is None:
+            self._digest = grid_digest(self.grid)
+        return self._digest
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.grid.shape
+
+    def default_endpoints(self) -> Tuple[Coord, Coord]:
+        """
+        Same defaults as the GUI: start (1,1), goal (H-2, W-2), or the cell nearest
+        to (H-2, W-2) that start can reach when the corner is walled off.
+        """
+        H, W = self.grid.shape
+        start, goal = (1, 1), (H - 2, W - 2)
+        comps = self.components()
+        if comps is not None and self.grid.walkable(*start) and self.grid.in_bounds(*goal):
+            goal = comps.reachable_goal(start, goal) or goal
+        return start, goal
+
+    def components(self, diagonals: Optional[bool] = None) -> Optional[Components]:
+        """
+        Component labels of the maze, built on first use. Searches only consult
+        labels that exist, so labeling here lets every query of this solver
+        reject unreachable goals without searching. None for packed and tiled
+        grids, whose labeling would unpack the whole maze.
+        """
+        if isinstance(self.grid, (PackedGrid, TiledGrid)):
+            return None
+        return self.grid.components(self.diagonals if diagonals is None else diagonals)
+
+    def prepare(self, algorithm: str, heuristic: str = "manhattan", diagonals: Optional[bool] = None) -> dict:
+        """
+        Build (once) whatever per-maze preprocessing `algorithm` uses and return the
+        keyword options to call ALGORITHMS[algorithm](grid, start, goal, **options) with.
+        """
+        diagonals = self.diagonals if diagonals is None else diagonals
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Unknown algorithm {algorithm!r}; choose from {sorted(ALGORITHMS)}")
+        options = {"diagonals": diagonals}
+        self.components(diagonals)
+        if algorithm in HEURISTIC_ALGORITHMS:
+            options["heuristic"] = heuristic
+        if heuristic == "alt" and "heuristic" in options:
+            if algorithm != "astar":
+                raise ValueError("heuristic 'alt' is only supported by astar")
+            options["landmarks"] = self.landmark_table(diagonals)
+        if algorithm == "jps+" and self.grid.uniform:
+            table = self._jump_tables.get(diagonals)
+            if table is None or not table.matches(self.grid, diagonals):   # rebuilt after set_cell
+                self._jump_tables[diagonals] = jps.JumpTable(self.grid, diagonals)
+            options["table"] = self._jump_tables[diagonals]
+        if algorithm == "corridors":
+            if diagonals not in self._corridor_graphs:
+                self._corridor_graphs[diagonals] = corridors.CorridorGraph(self.grid, diagonals)
+            options["graph"] = self._corridor_graphs[diagonals]
+        if algorithm == "hpa":
+            options["cluster_map"] = self.cluster_map(diagonals)
+        return options
+
+    def cluster_map(self, diagonals: Optional[bool] = None) -> hpa.ClusterMap:
+        """
+        HPA* abstraction of the maze. When the maze was loaded from a file it is
+        persisted next to it, so only the first session pays for the build.
+        """
+        diagonals = self.diagonals if diagonals is None else diagonals
+        cluster_map = self._cluster_maps.get(diagonals)
+        if cluster_map is not None:
+            return cluster_map
+        saved = hpa.cluster_map_path(self.source, self.cluster_size, diagonals) if self.source else None
+        if saved and os.path.exists(saved):
+            try:
+                cluster_map = hpa.ClusterMap.load(saved, self.grid, self.digest)
+            except (OSError, KeyError, ValueError):
+                cluster_map = None
+        if cluster_map is None:
+            cluster_map = hpa.ClusterMap(self.grid, self.cluster_size, diagonals)
+            if saved:
+                try:
+                    cluster_map.save(saved, self.digest)
+                except OSError:
+                    pass  # read-only maze directory: keep the in-memory copy only
+        self._cluster_maps[diagonals] = cluster_map
+        return cluster_map
+
+    def landmark_table(self, diagonals: Optional[bool] = None) -> alt.LandmarkTable:
+        """ALT landmark distances of the maze, persisted next to a maze file like cluster_map()."""
+        diagonals = self.diagonals if diagonals is None else diagonals
+        table = self._landmark_tables.get(diagonals)
+        if table is not None:
+            return table
+        saved = alt.landmark_path(self.source, self.landmarks, diagonals) if self.source else None
+        if saved and os.path.exists(saved):
+            try:
+                table = alt.LandmarkTable.load(saved, self.grid, self.digest)
+            except (OSError, KeyError, ValueError):
+                table = None
+        if table is None:
+            table = alt.LandmarkTable(self.grid, self.landmarks, diagonals)
+            if saved:
+                try:
+                    table.save(saved, self.digest)
+                except OSError:
+                    pass
+        self._landmark_tables[diagonals] = table
+        return table
+
+    def _tree_answers(self, algorithm: str) -> bool:
+        # Trees hold cost-optimal paths: not what DFS returns, nor BFS on a weighted grid.
+        return algorithm != "dfs" and (algorithm != "bfs" or self.grid.uniform)
+
+    # ---------------------- Single queries ----------------------
+    def find_path(self, start: Coord, goal: Coord, *, algorithm: str = "astar",
+                  heuristic: str = "manhattan", diagonals: Optional[bool] = None,
+                  stats: Optional[SearchStats] = None):
+        """
+        Run one algorithm; returns (path, stats, cost) like algorithms.*.find_path.
+        Answers served from a cached tree or the SolutionCache report 0 nodes expanded.
+        """
+        diagonals = self.diagonals if diagonals is None else diagonals
+        stats = SearchStats() if stats is None else stats
+        with stats.phase("setup"):
+            options = self.prepare(algorithm, heuristic, diagonals)
+        # A cached tree from this source already holds the optimal answer.
+        tree = self._trees.get((start, diagonals))
+        if tree is not None and self._tree_answers(algorithm):
+            self._trees.move_to_end((start, diagonals))
+            with stats.phase("lookup"):
+                path = tree.path_to(goal)
+            return path, stats, tree.cost_to(goal) if path else None
+
+        if self.cache is None:
+            return ALGORITHMS[algorithm](self.grid, start, goal, stats=stats, **options)
+        # HPA* paths depend on the cluster size, ALT tie-breaking on the landmarks.
+        params = {"cluster_size": self.cluster_size} if algorithm == "hpa" else {}
+        if "landmarks" in options:
+            params["landmarks"] = options["landmarks"].landmarks
+        key = solution_key(self.digest, start, goal, algorithm, diagonals, options.get("heuristic"), **params)
+        with stats.phase("lookup"):
+            hit = self.cache.get(key)
+        if hit is not None:
+            path, cost, _ = hit
+            return path, stats, cost
+        path, stats, cost = ALGORITHMS[algorithm](self.grid, start, goal, stats=stats, **options)
+        if stats.stopped is None:  # a cancelled or out-of-time search has no answer to keep
+            self.cache.put(key, path, cost, stats.expanded)
+        return path, stats, cost
+
+    def solve(self, start: Optional[Coord] = None, goal: Optional[Coord] = None, *,
+              algorithm: str = "astar", heuristic: str = "manhattan",
+              stats: Optional[SearchStats] = None) -> List[Coord]:
+        """Solve one query (GUI defaults for missing endpoints) and return the path."""
+        default_start, default_goal = self.default_endpoints()
+        start = default_start if start is None else start
+        goal = default_goal if goal is None else goal
+        self.last_result = (start, goal) + tuple(self.find_path(start, goal, algorithm=algorithm,
+                                                                heuristic=heuristic, stats=stats))
+        return self.last_result[2]
+
+    def save_solution(self, file, *, heatmap: bool = False, scale: int = 1) -> None:
+        """
+        Write the last solve() as a PNG: maze, path, start and goal, upscaled to
+        scale x scale pixels per cell. heatmap=True shades the expanded cells
+        by expansion order, which needs a solve() with SearchStats(record="all").
+        """
+        if self.last_result is None:
+            raise RuntimeError("nothing solved yet; call solve() first")
+        start, goal, path, stats, _ = self.last_result
+        visited = None
+        if heatmap:
+            if stats.record not in ("all", 1):
+                raise ValueError('heatmap needs the full visited order: solve(stats=SearchStats(record="all"))')
+            visited = stats.visited
+        save_solution(file, self.grid.wall_array(), path, start, goal, visited=visited, scale=scale)
+
+    def get_statistics(self) -> dict:
+        """Statistics of the last solve(): path length and cost, time, and the search counters."""
+        if self.last_result is None:
+            raise RuntimeError("nothing solved yet; call solve() first")
+        start, goal, path, stats, cost = self.last_result
+        summary = {
+            "start": start,
+            "goal": goal,
+            "path_length": len(path) - 1 if path else None,
+            "cost": cost,
+            "nodes_explored": stats.expanded,
+        }
+        summary.update(stats.as_dict())
+        return summary
+
+    # ---------------------- One-to-many / many-to-many ----------------------
+    def shortest_paths_from(self, source: Coord, *, diagonals: Optional[bool] = None) -> SearchTree:
+        """
+        Full shortest-path tree from `source`: vectorized BFS on uniform grids,
+        Dijkstra on weighted ones. Cached, so repeated sources are free.
+        """
+        diagonals = self.diagonals if diagonals is None else diagonals
+        key = (source, diagonals)
+        tree = self._trees.get(key)
+        if tree is not None:
+            self._trees.move_to_end(key)
+            return tree
+
+        W = self.grid.width
+        if self.grid.uniform:
+            dist = bfs.distance_field(self.grid, source, diagonals=diagonals).reshape(-1)
+            tree = SearchTree(source, W, dist, None, diagonals)
+        else:
+            spare, self._spare = self._spare or (None, None), None
+            dist, parent = dijkstra.shortest_path_tree(self.grid, source, diagonals=diagonals,
+                                                       dist=spare[0], parent=spare[1])
+            tree = SearchTree(source, W, dist, parent, diagonals)
+
+        self._trees[key] = tree
+        while len(self._trees) > self.max_trees:
+            _, evicted = self._trees.popitem(last=False)
+            if evicted._parent is not None and _unreferenced(evicted):
+                self._spare = (evicted._dist, evicted._parent)
+        return tree
+
+    def solve_many(self, queries: Iterable[Tuple[Coord, Coord]], *, algorithm: str = "astar",
+                   heuristic: str = "manhattan", diagonals: Optional[bool] = None
+                   ) -> List[Tuple[List[Coord], Optional[float]]]:
+        """
+        Answer a batch of (start, goal) queries; returns [(path, cost), ...] in input order.
+        Sources that appear in more than one query (or already have a cached tree) share
+        one shortest-path tree; the rest run `algorithm` point-to-point. DFS (and BFS on
+        a weighted grid) never use trees since their paths are not least-cost paths.
+        """
+        diagonals = self.diagonals if diagonals is None else diagonals
+        queries = list(queries)
+        by_source: Dict[Coord, List[int]] = defaultdict(list)
+        for i, (start, _) in enumerate(queries):
+            by_source[start].append(i)
+
+        results: List[Tuple[List[Coord], Optional[float]]] = [([], None)] * len(queries)
+        for source, idxs in by_source.items():
+            shared = self._tree_answers(algorithm) and (len(idxs) > 1 or (source, diagonals) in self._trees)
+            if shared and self.grid.walkable(*source):
+                tree = self.shortest_paths_from(source, diagonals=diagonals)
+                for i in idxs:
+                    goal = queries[i][1]
+                    path = tree.path_to(goal)
+                    results[i] = (path, tree.cost_to(goal) if path else None)
+            else:
+                for i in idxs:
+                    path, _, cost = self.find_path(source, queries[i][1], algorithm=algorithm,
+                                                   heuristic=heuristic, diagonals=diagonals)
+                    results[i] = (path, cost)
+        return results
@@ -0,0 +1,391 @@
+"""
+Resident solve server: keeps mazes, their preprocessing (jump tables, cluster
+maps, shortest-path trees) and a worker pool loaded between queries, so
+callers pay neither Python startup nor image decoding per solve.
+
+Protocol: newline-delimited JSON over a Unix socket (or TCP with --port). Each
+request is one object with an "op" and an optional "id" echoed in its reply;
+replies to pipelined requests may arrive out of order.
+
+    {"op": "register", "path": "maze.png"}                  -> {"maze": "<file hash>"}
+    {"op": "register", "walls": [[0, 1, ...], ...], "costs": [[...]], "maze": "site-7"}
+    {"op": "solve", "maze": "site-7", "start": [1, 1], "goal": [9, 9],
+     "algorithm": "astar", "heuristic": "manhattan", "diagonals": false}
+                                                            -> {"path": [[1, 1], ...], "cost": 16.0, "batch": 12}
+    {"op": "unregister", "maze": "site-7"}   {"op": "stats"}   {"op": "ping"}
+
+Solve requests for the same maze and options that arrive within --batch-ms of
+each other are answered together with MazeSolver.solve_many ("batch" is the size
+of the batch a reply came from). Each maze is pinned to one worker, so only that
+worker loads it and keeps its preprocessing.
+
+    python server.py --socket /tmp/mazes.sock --workers 4
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from maze_solver import ALGORITHMS, MazeSolver
+from algorithms.grid import Grid
+from utils.cache import grid_digest
+from utils.image_processor import file_digest
+
+Coord = Tuple[int, int]
+# How a worker loads a maze: ("path", file or tile directory, content hash) or
+# ("npz", spooled walls/costs file, content hash). Workers cache solvers by spec,
+# so re-registering an ID with new content never serves the old maze.
+Spec = Tuple[str, str, str]
+
+DEFAULT_SOCKET = os.path.join(tempfile.gettempdir(), "mazepathfinder.sock")
+MAX_BATCH = 256
+RESIDENT_MAZES = 32
+STREAM_LIMIT = 1 << 26   # registering inline walls sends the whole maze on one line
+
+
+# ---------------------- Worker side ----------------------
+_solvers: "OrderedDict[Spec, MazeSolver]" = OrderedDict()
+
+
+def _solver_for(spec: Spec) -> MazeSolver:
+    """This worker's MazeSolver for `spec`, loaded on first use; the RESIDENT_MAZES most recent are kept."""
+    solver = _solvers.get(spec)
+    if solver is not None:
+        _solvers.move_to_end(spec)
+        return solver
+    kind, source, _ = spec
+    if kind == "npz":
+        with np.load(source) as data:
+            solver = MazeSolver(Grid(data["walls"], data["costs"] if "costs" in data else None))
+    else:
+        solver = MazeSolver(source)
+    _solvers[spec] = solver
+    while len(_solvers) > RESIDENT_MAZES:
+        _solvers.popitem(last=False)
+    return solver
+
+
+def solve_batch(spec: Spec, options: dict, queries: List[Tuple[Coord, Coord]]) -> List[dict]:
+    """Answer one batch of (start, goal) queries on one maze; runs in a pool worker, never raises."""
+    try:
+        solver = _solver_for(spec)
+    except Exception as e:
+        return [{"error": f"{type(e).__name__}: {e}"}] * len(queries)
+    try:
+        results = solver.solve_many(queries, **options)
+    except Exception:
+        results = None   # one bad query (say, out of bounds) must not fail the rest: retry one by one
+    replies = []
+    for i, query in enumerate(queries):
+        try:
+            path, cost = results[i] if results is not None else solver.solve_many([query], **options)[0]
+            replies.append({"path": [list(p) for p in path], "cost": cost})
+        except Exception as e:
+            replies.append({"error": f"{type(e).__name__}: {e}"})
+    return replies
+
+
+# ---------------------- Server side ----------------------
+def _coord(value) -> Coord:
+    if not isinstance(value, (list, tuple)) or len(value) != 2 or not all(isinstance(v, int) for v in value):
+        raise ValueError(f"expected a [row, col] pair of integers, got {value!r}")
+    return int(value[0]), int(value[1])
+
+
+class MazeBatcher:
+    """
+    Collects the solve requests of one maze. The first request of a batch
+    starts a `window`-second timer; the batch goes to the pool when it fires
+    or when MAX_BATCH requests are waiting, split by search options.
+    """
+
+    def __init__(self, server: "SolveServer", maze: str, spec: Spec, worker: int):
+        self.server, self.maze, self.spec, self.worker = server, maze, spec, worker
+        self.pending: List[Tuple[tuple, Tuple[Coord, Coord], asyncio.Future]] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+    def submit(self, options: dict, start: Coord, goal: Coord) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append((tuple(sorted(options.items())), (start, goal), future))
+        if len(self.pending) >= MAX_BATCH:
+            self.flush()
+        elif self.timer is None:
+            self.timer = loop.call_later(self.server.batch_window, self.flush)
+        return future
+
+    def flush(self) -> None:
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        groups: Dict[tuple, list] = {}
+        for key, query, future in self.pending:
+            groups.setdefault(key, []).append((query, future))
+        self.pending = []
+        for key, items in groups.items():
+            asyncio.ensure_future(self._run(dict(key), items))
+
+    async def _run(self, options: dict, items: list) -> None:
+        server = self.server
+        queries = [query for query, _ in items]
+        server.batches += 1
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(
+                server.pools[self.worker], solve_batch, self.spec, options, queries)
+        except Exception as e:   # the pool itself failed (e.g. a worker died)
+            results = [{"error": f"{type(e).__name__}: {e}"}] * len(items)
+        for (_, future), result in zip(items, results):
+            if not future.done():
+                future.set_result(dict(result, batch=len(items)))
+
+
+class SolveServer:
+    """
+    Registry of mazes plus the workers that solve them. Every worker is a
+    single-process pool and each maze is assigned to one of them, so a maze
+    is loaded (and its preprocessing built) in one process rather than in
+    all of them. workers=0 solves on a single thread of this process instead
+    (handy for tests and for mazes too large to load in a worker).
+    """
+
+    def __init__(self, *, workers: Optional[int] = None, batch_window: float = 0.002,
+                 spool_dir: Optional[str] = None):
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        # Workers are not forked from the server: a forked worker would inherit the open
+        # client sockets and keep every connection alive after its client hangs up.
+        context = multiprocessing.get_context("spawn")
+        self.pools: List[Executor] = [ThreadPoolExecutor(max_workers=1)] if self.workers == 0 \
+            else [ProcessPoolExecutor(max_workers=1, mp_context=context) for _ in range(self.workers)]
+        self.batch_window = batch_window
+        self._spool = tempfile.TemporaryDirectory(prefix="maze-server-", dir=spool_dir)
+        self.mazes: Dict[str, MazeBatcher] = {}
+        self.requests = self.batches = 0
+
+    def close(self) -> None:
+        for pool in self.pools:
+            pool.shutdown(wait=False, cancel_futures=True)
+        self._spool.cleanup()
+
+    def _worker_for(self, spec: Spec) -> int:
+        """The worker that already has `spec` loaded, else the one serving the fewest mazes."""
+        load = [0] * len(self.pools)
+        for batcher in self.mazes.values():
+            if batcher.spec == spec:
+                return batcher.worker
+            load[batcher.worker] += 1
+        return load.index(min(load))
+
+    def _spec(self, request: dict) -> Spec:
+        """Hash (and for inline walls, spool) the maze of a register request; blocking, so run off the loop."""
+        if "path" in request:
+            path = os.path.abspath(request["path"])
+            if not os.path.exists(path):
+                raise ValueError(f"no such maze file: {request['path']}")
+            return ("path", path, file_digest(path) if os.path.isfile(path) else path)
+        if "walls" not in request:
+            raise ValueError("register needs 'path' or 'walls'")
+        costs = request.get("costs")
+        grid = Grid(np.asarray(request["walls"], dtype=np.uint8),
+                    None if costs is None else np.asarray(costs, dtype=np.float32))
+        digest = grid_digest(grid)
+        spool = os.path.join(self._spool.name, f"{digest}.npz")
+        if not os.path.exists(spool):
+            arrays = {"walls": grid.wall_array()}
+            if grid.costs is not None:
+                arrays["costs"] = grid.costs.reshape(grid.shape)
+            # Written aside and renamed, so a worker never loads a half-written file.
+            fd, partial = tempfile.mkstemp(suffix=".npz", dir=self._spool.name)
+            with os.fdopen(fd, "wb") as fh:
+                np.savez(fh, **arrays)
+            os.replace(partial, spool)
+        return ("npz", spool, digest)
+
+    # ---------------------- Operations ----------------------
+    async def register(self, request: dict) -> dict:
+        spec = await asyncio.get_running_loop().run_in_executor(None, self._spec, request)
+        maze = str(request.get("maze") or spec[2])
+        current = self.mazes.get(maze)
+        if current is None or current.spec != spec:
+            if current is not None:
+                current.flush()
+                del self.mazes[maze]
+            self.mazes[maze] = MazeBatcher(self, maze, spec, self._worker_for(spec))
+        return {"maze": maze}
+
+    async def solve(self, request: dict) -> dict:
+        maze = request.get("maze")
+        batcher = self.mazes.get(maze)
+        if batcher is None:
+            raise ValueError(f"unknown maze {maze!r}; register it first")
+        algorithm = request.get("algorithm", "astar")
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"unknown algorithm {algorithm!r}; choose from {sorted(ALGORITHMS)}")
+        options = {"algorithm": algorithm, "heuristic": request.get("heuristic", "manhattan")}
+        if "diagonals" in request:
+            options["diagonals"] = bool(request["diagonals"])
+        start, goal = _coord(request.get("start")), _coord(request.get("goal"))
+        return await batcher.submit(options, start, goal)
+
+    def stats(self) -> dict:
+        return {"mazes": sorted(self.mazes), "workers": self.workers, "requests": self.requests,
+                "batches": self.batches}
+
+    async def handle(self, request: dict) -> dict:
+        self.requests += 1
+        op = request.get("op")
+        if op == "solve":
+            return await self.solve(request)
+        if op == "register":
+            return await self.register(request)
+        if op == "unregister":
+            batcher = self.mazes.pop(request.get("maze"), None)
+            if batcher is not None:
+                batcher.flush()
+            return {"removed": batcher is not None}
+        if op == "stats":
+            return self.stats()
+        if op == "ping":
+            return {"ok": True}
+        raise ValueError(f"unknown op {op!r}")
+
+    # ---------------------- Connections ----------------------
+    async def _reply(self, line: bytes, writer: asyncio.StreamWriter) -> None:
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+            request_id = request.get("id")
+            reply = await self.handle(request)
+        except Exception as e:
+            reply = {"error": f"{type(e).__name__}: {e}"}
+        if request_id is not None:
+            reply = dict(reply, id=request_id)
+        writer.write(json.dumps(reply).encode() + b"\n")
+        await writer.drain()
+
+    async def serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        tasks = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if line.strip():
+                    task = asyncio.ensure_future(self._reply(line, writer))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            writer.close()
+
+    async def start(self, socket_path: Optional[str] = None, host: str = "127.0.0.1",
+                    port: Optional[int] = None) -> asyncio.AbstractServer:
+        if port is not None:
+            return await asyncio.start_server(self.serve_connection, host, port, limit=STREAM_LIMIT)
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)   # left over from a server that did not shut down cleanly
+        return await asyncio.start_unix_server(self.serve_connection, socket_path, limit=STREAM_LIMIT)
+
+
+# ---------------------- Client ----------------------
+class SolveClient:
+    """
+    Blocking client for planners: one request at a time over a persistent
+    connection (use several clients, or raw pipelining, for concurrency).
+
+        client = SolveClient("/tmp/mazes.sock")
+        maze = client.register(path="maze.png")
+        path, cost = client.solve(maze, (1, 1), (9, 9))
+    """
+
+    def __init__(self, socket_path: Optional[str] = None, *, host: str = "127.0.0.1", port: Optional[int] = None,
+                 timeout: Optional[float] = None):
+        import socket
+        if port is not None:
+            self.sock = socket.create_connection((host, port), timeout=timeout)
+        else:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.settimeout(timeout)
+            self.sock.connect(socket_path or DEFAULT_SOCKET)
+        self.file = self.sock.makefile("rwb")
+
+    def close(self) -> None:
+        self.file.close()
+        self.sock.close()
+
+    def __enter__(self) -> "SolveClient":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def request(self, op: str, **fields) -> dict:
+        self.file.write(json.dumps(dict(fields, op=op)).encode() + b"\n")
+        self.file.flush()
+        reply = json.loads(self.file.readline())
+        if "error" in reply:
+            raise RuntimeError(reply["error"])
+        return reply
+
+    def register(self, *, path: Optional[str] = None, walls=None, costs=None, maze: Optional[str] = None) -> str:
+        fields = {"maze": maze} if maze else {}
+        if path is not None:
+            fields["path"] = path
+        else:
+            fields["walls"] = np.asarray(walls).tolist()
+            if costs is not None:
+                fields["costs"] = np.asarray(costs).tolist()
+        return self.request("register", **fields)["maze"]
+
+    def solve(self, maze: str, start: Coord, goal: Coord, *, algorithm: str = "astar",
+              heuristic: str = "manhattan", diagonals: Optional[bool] = None) -> Tuple[List[Coord], Optional[float]]:
+        fields = {"maze": maze, "start": list(start), "goal": list(goal), "algorithm": algorithm,
+                  "heuristic": heuristic}
+        if diagonals is not None:
+            fields["diagonals"] = diagonals
+        reply = self.request("solve", **fields)
+        return [tuple(p) for p in reply["path"]], reply["cost"]
+
+
+async def _serve(args) -> None:
+    server = SolveServer(workers=args.workers, batch_window=args.batch_ms / 1000)
+    listener = await server.start(args.socket, args.host, args.port)
+    where = f"{args.host}:{args.port}" if args.port is not None else args.socket
+    print(f"serving on {where} with {server.workers or 'in-process'} workers", file=sys.stderr)
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        server.close()
+        if args.port is None and os.path.exists(args.socket):
+            os.unlink(args.socket)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Resident maze solve server (JSON lines over a socket).")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help=f"Unix socket path (default: {DEFAULT_SOCKET})")
+    parser.add_argument("--port", type=int, default=None, help="listen on TCP instead of a Unix socket")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: CPU count; 0 = solve in this process)")
+    parser.add_argument("--batch-ms", type=float, default=2.0, help="micro-batching window per maze")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
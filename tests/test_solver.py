@@ -0,0 +1,1067 @@
+import numpy as np
+import pytest
+
+from algorithms import a_star, alt, ara_star, bfs, corridors, d_star_lite, dfs, dijkstra, hpa, jps
+from algorithms.grid import Grid, as_grid
+from algorithms.stats import SearchStats
+
+MAZE = [
+    [0, 0, 0, 0, 0],
+    [1, 1, 1, 1, 0],
+    [0, 0, 0, 0, 0],
+    [0, 1, 1, 1, 1],
+    [0, 0, 0, 0, 0],
+]
+
+
+# ---------------------- Grid ----------------------
+def test_grid_from_values_conventions():
+    grid = as_grid([[0, 1, "#"], [3, -1, "."], [False, 0.5, 0]])
+    assert grid.shape == (3, 3)
+    assert [grid.walkable(0, c) for c in range(3)] == [True, False, False]
+    assert [grid.walkable(1, c) for c in range(3)] == [True, False, True]
+    assert [grid.walkable(2, c) for c in range(3)] == [False, True, True]
+    assert grid.cost(1, 0) == 3.0
+    assert grid.cost(2, 1) == 0.5
+    assert grid.cost(0, 0) == 1.0
+
+
+def test_grid_from_numpy_is_compact():
+    maze = np.array(MAZE)
+    grid = Grid(maze)
+    assert grid.walls.dtype == np.uint8 and grid.walls.shape == (25,)
+    assert grid.uniform
+    assert np.array_equal(grid.wall_array(), maze)
+    assert as_grid(grid) is grid
+
+
+@pytest.mark.parametrize("diagonals", [False, True])
+def test_adjacency_matches_neighbors(diagonals):
+    import pickle
+    from algorithms.graph import LazyAdjacency
+    from algorithms.grid import PackedGrid
+
+    rng = np.random.default_rng(5)
+    grid = Grid(rng.random((9, 13)) < 0.3, rng.integers(1, 6, (9, 13)))
+    adj = grid.adjacency(diagonals)
+    assert adj is grid.adjacency(diagonals) and adj.offsets.dtype == np.int32
+    packed = PackedGrid.pack(grid.wall_array(), grid.costs.reshape(grid.shape))
+    one_shot = Grid(grid.wall_array(), grid.costs.reshape(grid.shape), csr_cells=100)   # 117 cells: lazy
+    assert isinstance(one_shot.adjacency(diagonals), LazyAdjacency)
+    nbrs = grid.neighbors8 if diagonals else grid.neighbors4
+    for views in (adj.views(), packed.adjacency(diagonals).views(), one_shot.adjacency(diagonals).views()):
+        offsets, neighbors, costs = views
+        for i in np.flatnonzero(grid.walls == 0).tolist():
+            edges = [(neighbors[j], costs[j]) for j in range(offsets[i], offsets[i+1]) if costs[j] != float("inf")]
+            assert edges == [(r*13 + c, grid.cost(r, c)) for r, c in nbrs(*divmod(i, 13))]
+
+    grid.set_cell(4, 6, wall=True)
+    grid.set_cell(3, 6, wall=False, cost=4)
+    fresh = Grid(grid.wall_array(), grid.costs.reshape(grid.shape)).adjacency(diagonals)
+    assert np.array_equal(grid.adjacency(diagonals).costs, fresh.costs)
+    assert pickle.loads(pickle.dumps(grid))._adjacency == {}
+
+
+def test_csr_structure_is_shared_while_grids_use_it():
+    import gc
+    from algorithms import graph
+
+    a, b = Grid(np.zeros((6, 9), dtype=np.uint8)), Grid(np.ones((6, 9), dtype=np.uint8))
+    assert a.adjacency(True).neighbors is b.adjacency(True).neighbors
+    assert a.adjacency().neighbors is not a.adjacency(True).neighbors
+    del a, b
+    gc.collect()
+    assert (6, 9, True) not in graph._structures and (6, 9, False) not in graph._structures
+
+
+def test_search_workspace_is_reused_across_queries():
+    from algorithms.workspace import STAMP_LIMIT
+
+    grid = next(g for g, _, _ in _random_grids(1, (30, 30), seed=4))
+    free = [tuple(p) for p in np.argwhere(grid.wall_array() == 0).tolist()]
+    queries = [(free[i], free[-1 - i]) for i in range(0, 40, 4)]
+    expected = [bfs.find_path(Grid(grid.wall_array()), s, t)[2] for s, t in queries]
+    with grid.search_workspace() as workspace:
+        assert workspace.g.dtype == np.float32 and workspace.parent.dtype == np.int32
+    for module in (a_star, dijkstra, bfs, dfs):
+        for (s, t), steps in zip(queries, expected):
+            path, _, cost = module.find_path(grid, s, t)
+            assert path[0] == s and path[-1] == t and all(grid.walkable(*p) for p in path)
+            if module is not dfs:
+                assert cost == steps
+    assert grid._workspaces == [workspace] and workspace.generation == 2 * 4 * len(queries)
+
+    # Stamps wrap around without leaking an old query's cells into a new one.
+    workspace.generation = STAMP_LIMIT
+    assert a_star.find_path(grid, *queries[0])[2] == expected[0] and workspace.generation == 2
+    with grid.search_workspace() as first, grid.search_workspace() as second:
+        assert first is workspace and second is not first
+    grid.set_cell(*free[1], cost=2.5)
+    with grid.search_workspace() as workspace:
+        assert workspace.g.dtype == np.float64
+
+
+@pytest.mark.parametrize("module", [a_star, dijkstra, bfs])
+def test_optimal_algorithms_accept_grid_and_lists(module):
+    path_list, _, cost_list = module.find_path(MAZE, (0, 0), (4, 4))
+    path_grid, _, cost_grid = module.find_path(Grid(np.array(MAZE)), (0, 0), (4, 4))
+    assert path_list == path_grid
+    assert cost_list == cost_grid == 16
+    assert path_list[0] == (0, 0) and path_list[-1] == (4, 4)
+
+
+def test_dfs_finds_a_path():
+    path, visited, steps = dfs.find_path(MAZE, (0, 0), (4, 4))
+    assert path[0] == (0, 0) and path[-1] == (4, 4)
+    assert steps == len(path) - 1
+
+
+def test_weighted_costs():
+    grid = [
+        [0, 9, 0],
+        [0, 1, 0],
+        [0, 0, 0],
+    ]
+    path, _, cost = dijkstra.find_path(grid, (0, 0), (0, 2))
+    assert cost == 6
+    path, _, cost = a_star.find_path(grid, (0, 0), (0, 2))
+    assert cost == 6
+
+
+def test_blocked_endpoints():
+    for path, stats, cost in (a_star.find_path(MAZE, (1, 0), (4, 4)), bfs.find_path(MAZE, (0, 0), (9, 9))):
+        assert (path, stats.expanded, cost) == ([], 0, None)
+
+
+# ---------------------- Search statistics ----------------------
+def test_search_stats_counters_and_recording():
+    grid = Grid(np.zeros((20, 20), dtype=np.uint8))
+    path, stats, cost = dijkstra.find_path(grid, (0, 0), (19, 19))
+    assert stats.visited is None and stats.expanded == len(stats) > 0
+    assert stats.pops == stats.expanded + stats.stale_pops and stats.pushes >= stats.expanded
+    assert 0 < stats.peak_open <= stats.pushes
+    assert {"setup", "search", "path"} <= set(stats.phases) and stats.peak_memory is None
+
+    full = a_star.find_path(grid, (0, 0), (19, 19), stats=SearchStats(record="all"))[1]
+    sampled = a_star.find_path(grid, (0, 0), (19, 19), stats=SearchStats(record=10))[1]
+    seen = []
+    a_star.find_path(grid, (0, 0), (19, 19), stats=SearchStats(record=seen.append))
+    assert full.visited == seen and len(seen) == full.expanded
+    assert sampled.visited == seen[::10]
+
+    tracked = bfs.find_path(grid, (0, 0), (19, 19), stats=SearchStats(track_memory=True))[1]
+    assert tracked.peak_memory > 0
+    with pytest.raises(ValueError):
+        SearchStats(record="sometimes")
+
+
+@pytest.mark.parametrize("find_path", [a_star.find_path, dijkstra.find_path, bfs.find_path, dfs.find_path,
+                                       jps.find_path, corridors.find_path,
+                                       a_star.find_path_bidirectional, bfs.find_path_bidirectional])
+def test_search_cancellation_and_time_budget(find_path):
+    import threading
+    from utils.maze_generators import random_obstacles
+
+    # Checks happen every CHECK_INTERVAL expansions, so every search here must expand more.
+    grid = Grid(random_obstacles(160, 1, density=0.2))
+    goal = (158, 158)
+    cancel = threading.Event()
+    cancel.set()
+    path, stats, cost = find_path(grid, (1, 1), goal, stats=SearchStats(cancel=cancel))
+    assert (path, cost, stats.stopped) == ([], None, "cancelled")
+
+    path, stats, cost = find_path(grid, (1, 1), goal, stats=SearchStats(time_budget=0.0))
+    assert (path, cost, stats.stopped) == ([], None, "time budget")
+
+    seen = []
+    path, stats, cost = find_path(grid, (1, 1), goal, stats=SearchStats(cancel=threading.Event(),
+                                                                      time_budget=60, progress=seen.append))
+    assert path[-1] == goal and stats.stopped is None
+    assert seen == sorted(seen) and all(n <= stats.expanded for n in seen)
+
+
+def test_stopped_searches_are_not_cached():
+    import threading
+    from maze_solver import MazeSolver
+    from utils.cache import SolutionCache
+
+    solver = MazeSolver(np.zeros((80, 80), dtype=np.uint8), cache=SolutionCache())
+    cancel = threading.Event()
+    cancel.set()
+    path, stats, _ = solver.find_path((0, 0), (79, 79), algorithm="dijkstra", stats=SearchStats(cancel=cancel))
+    assert path == [] and stats.stopped == "cancelled"
+    path, stats, cost = solver.find_path((0, 0), (79, 79), algorithm="dijkstra")
+    assert cost == 158 and stats.expanded > 0
+
+
+def test_solver_get_statistics():
+    from maze_solver import MazeSolver
+
+    solver = MazeSolver(np.asarray(MAZE))
+    path = solver.solve((0, 0), (4, 4), algorithm="dijkstra")
+    stats = solver.get_statistics()
+    assert stats["path_length"] == len(path) - 1 == 16
+    assert stats["nodes_explored"] == stats["nodes_expanded"] > 0
+    assert stats["time_taken"] >= 0
+
+
+# ---------------------- Benchmark harness ----------------------
+@pytest.mark.parametrize("kind", ["perfect", "rooms", "random", "weighted"])
+def test_maze_generators_are_deterministic(kind):
+    from utils.maze_generators import GENERATORS
+
+    first, second = GENERATORS[kind](41, 3), GENERATORS[kind](41, 3)
+    walls = first[0] if isinstance(first, tuple) else first
+    assert walls.shape == (41, 41)
+    assert np.array_equal(walls, second[0] if isinstance(second, tuple) else second)
+    if kind in ("perfect", "rooms"):
+        # Every free cell is reachable; a perfect maze is a tree (free cells = corridors + 1).
+        dist = bfs.distance_field(walls, (1, 1))
+        assert np.count_nonzero(dist >= 0) == np.count_nonzero(walls == 0)
+    if kind == "perfect":
+        assert np.count_nonzero(walls == 0) == 2 * 20 * 20 - 1
+
+
+def test_benchmark_flags_regressions():
+    import benchmark
+    from utils.maze_generators import perfect_maze
+
+    grid = Grid(perfect_maze(33, 1))
+    results = benchmark.bench_maze("perfect-33", "perfect", grid, ["dijkstra", "astar", "dfs"],
+                                   repeat=1, memory=False)
+    assert [r["algorithm"] for r in results] == ["dijkstra", "astar", "dfs"]
+    assert all(r["found"] and r["optimal"] for r in results)  # a perfect maze has one path
+    assert benchmark.compare(results, results) == []
+
+    baseline = [dict(r) for r in results]
+    baseline[1]["nodes_expanded"] -= 1
+    baseline[2]["time_ms"] = results[2]["time_ms"] / 10 - benchmark.MIN_REGRESSION_MS
+    problems = benchmark.compare(results, baseline)
+    assert len(problems) == 2
+    assert "astar" in problems[0] and "nodes expanded" in problems[0]
+    assert "dfs" in problems[1] and "time" in problems[1]
+
+    alt_results = benchmark.bench_maze("perfect-33", "perfect", grid, ["astar", "jps"], heuristic="alt",
+                                       repeat=1, memory=False, landmarks=4)
+    assert all(r["found"] and r["optimal"] for r in alt_results)
+
+
+# ---------------------- Rendering ----------------------
+def test_maze_rgb_layers():
+    from utils.render import FREE, GOAL, PATH, START, WALL, maze_rgb
+
+    walls = np.array([[0, 0, 1], [1, 0, 0]], dtype=np.uint8)
+    rgb = maze_rgb(walls, [(0, 0), (0, 1), (1, 1), (1, 2)], start=(0, 0), goal=(1, 2))
+    assert rgb.shape == (2, 3, 3) and rgb.dtype == np.uint8
+    assert tuple(rgb[0, 2]) == WALL and tuple(rgb[1, 0]) == WALL
+    assert tuple(rgb[0, 1]) == PATH and tuple(rgb[1, 1]) == PATH
+    assert tuple(rgb[0, 0]) == START and tuple(rgb[1, 2]) == GOAL
+    assert tuple(maze_rgb(walls)[0, 1]) == FREE
+
+
+def test_solution_png_export(tmp_path):
+    from PIL import Image
+
+    from maze_solver import MazeSolver
+    from utils.render import GOAL, HEAT_FIRST, HEAT_LAST, PATH, START, WALL, maze_rgb
+
+    walls = np.array([[0, 0, 0], [1, 1, 0], [0, 0, 0]], dtype=np.uint8)
+    rgb = maze_rgb(walls, [(0, 2), (1, 2)], visited=[(0, 0), (0, 1), (0, 2), (2, 2), (2, 1)], scale=3)
+    assert rgb.shape == (9, 9, 3)
+    assert tuple(rgb[0, 0]) == HEAT_FIRST and tuple(rgb[8, 4]) == HEAT_LAST
+    assert tuple(rgb[1, 7]) == PATH and tuple(rgb[3, 0]) == WALL
+    assert np.all(rgb[:3, :3] == HEAT_FIRST)
+
+    solver = MazeSolver(walls)
+    with pytest.raises(RuntimeError):
+        solver.save_solution(str(tmp_path / "none.png"))
+    solver.solve((0, 0), (2, 0))
+    with pytest.raises(ValueError):
+        solver.save_solution(str(tmp_path / "heat.png"), heatmap=True)
+    solver.solve((0, 0), (2, 0), stats=SearchStats(record="all"))
+    solver.save_solution(str(tmp_path / "heat.png"), heatmap=True, scale=2)
+    with Image.open(tmp_path / "heat.png") as image:
+        saved = np.asarray(image.convert("RGB"))
+    assert saved.shape == (6, 6, 3)
+    assert tuple(saved[0, 0]) == START and tuple(saved[5, 0]) == GOAL and tuple(saved[0, 5]) == PATH
+
+
+def test_viewport_follow():
+    from utils.render import follow
+
+    assert follow(0, 5, 20, 100, margin=4) == 0            # inside the window: no scroll
+    assert follow(0, 17, 20, 100, margin=4) == 2           # past the margin: minimal scroll
+    assert follow(50, 51, 20, 100, margin=4) == 47
+    assert follow(0, 99, 20, 100, margin=4) == 80          # never past the maze
+    assert follow(0, 3, 200, 100) == 0                     # maze smaller than the window
+
+
+# ---------------------- Wavefront BFS ----------------------
+def test_distance_field_matches_bfs():
+    dist = bfs.distance_field(MAZE, (0, 0))
+    assert dist.dtype == np.int32
+    assert dist[1, 0] == -1
+    assert dist[4, 4] == 16
+    for diagonals in (False, True):
+        path, _, steps = bfs.find_path(MAZE, (0, 0), (4, 4), diagonals=diagonals)
+        wpath, stats, wsteps = bfs.find_path(MAZE, (0, 0), (4, 4), diagonals=diagonals, wavefront=True,
+                                             stats=SearchStats(record="all"))
+        assert wsteps == steps
+        assert wpath[0] == (0, 0) and wpath[-1] == (4, 4)
+        assert stats.visited[0] == (0, 0) and len(stats.visited) == stats.expanded
+
+
+def test_distance_field_unreachable():
+    grid = [[0, 1, 0]]
+    dist = bfs.distance_field(grid, (0, 0))
+    assert dist.tolist() == [[0, -1, -1]]
+    assert bfs.find_path(grid, (0, 0), (0, 2), wavefront=True)[0] == []
+
+
+def test_path_from_field_rejects_mismatched_connectivity():
+    dist = bfs.distance_field(np.zeros((4, 4), dtype=np.uint8), (0, 0), diagonals=True)
+    assert len(bfs.path_from_field(dist, (3, 3), diagonals=True)) == 4
+    with pytest.raises(ValueError):
+        bfs.path_from_field(dist, (3, 3), diagonals=False)
+
+
+# ---------------------- Connected components ----------------------
+@pytest.mark.parametrize("diagonals", [False, True])
+def test_components_match_bfs(diagonals):
+    from algorithms.components import label_components
+
+    rng = np.random.default_rng(7)
+    for _ in range(40):
+        walls = (rng.random((13, 17)) < 0.45).astype(np.uint8)
+        labels, count = label_components(walls, diagonals)
+        assert labels[walls == 1].max(initial=0) == 0 and labels.max() == count
+        free = np.argwhere(walls == 0)
+        for r, c in free[rng.choice(len(free), min(5, len(free)), replace=False)].tolist():
+            reached = bfs.distance_field(Grid(walls), (r, c), diagonals=diagonals) >= 0
+            assert np.array_equal(reached, labels == labels[r, c])
+        first = [labels.reshape(-1).tolist().index(k) for k in range(1, count + 1)]
+        assert first == sorted(first)   # numbered in row-major order
+
+
+def test_unreachable_queries_are_rejected_without_searching():
+    walls = np.zeros((20, 30), dtype=np.uint8)
+    walls[:, 15] = 1
+    grid = Grid(walls)
+    s, t = (3, 2), (17, 27)
+    assert bfs.find_path(grid, s, t, wavefront=True)[2] is None   # no labels yet: searched and not found
+    assert not grid._components
+    assert grid.components().count == 2   # labeled on request; every search below consults it
+    calls = [a_star.find_path(grid, s, t), a_star.find_path(grid, s, t, bidirectional=True),
+             dijkstra.find_path(grid, s, t), bfs.find_path(grid, s, t), dfs.find_path(grid, s, t),
+             jps.find_path(grid, s, t), corridors.find_path(grid, s, t), ara_star.find_path(grid, s, t)]
+    for path, stats, cost in calls:
+        assert (path, stats.expanded, cost) == ([], 0, None)
+    assert grid.components().count == 2 and grid.components().size(s) == 20 * 15
+
+    grid.set_cell(10, 15, wall=False)   # relabeled after the change
+    assert grid.connected(s, t) and a_star.find_path(grid, s, t)[2] == 14 + 25
+
+    # default goal: the corner when reachable, else the nearest reachable cell
+    from maze_solver import MazeSolver
+    walls[:, 15] = 1
+    walls[1, 16] = 1
+    solver = MazeSolver(walls)
+    assert solver.default_endpoints() == ((1, 1), (18, 14))
+    fresh = MazeSolver(walls)
+    path, stats, cost = fresh.find_path(s, t)
+    assert (path, stats.expanded, cost) == ([], 0, None)   # the solver labels the maze once, up front
+    assert MazeSolver(np.zeros((8, 8), dtype=np.uint8)).default_endpoints() == ((1, 1), (6, 6))
+
+
+# ---------------------- Jump Point Search ----------------------
+def _random_grids(count, size, seed=0):
+    rng = np.random.default_rng(seed)
+    for _ in range(count):
+        walls = rng.random(size) < 0.3
+        free = np.argwhere(~walls)
+        if len(free) < 2:
+            continue
+        s, t = (tuple(free[i].tolist()) for i in rng.choice(len(free), 2, replace=False))
+        yield Grid(walls), s, t
+
+
+@pytest.mark.parametrize("diagonals", [False, True])
+def test_jps_matches_bfs(diagonals):
+    heuristic = "chebyshev" if diagonals else "manhattan"
+    for grid, s, t in _random_grids(150, (12, 15)):
+        expected = bfs.find_path(grid, s, t, diagonals=diagonals)[2]
+        table = jps.JumpTable(grid, diagonals)
+        for fn in (jps.find_path, jps.find_path_plus):
+            path, _, cost = fn(grid, s, t, diagonals=diagonals, heuristic=heuristic)
+            assert cost == expected
+            if path:
+                assert path[0] == s and path[-1] == t and len(path) - 1 == cost
+                assert all(grid.walkable(*p) for p in path)
+        assert jps.find_path(grid, s, t, diagonals=diagonals, heuristic=heuristic, table=table)[2] == expected
+
+
+def test_jump_table_rejects_other_and_modified_mazes():
+    walls = np.zeros((12, 12), dtype=np.uint8)
+    walls[6, :10] = 1
+    grid, other = Grid(walls), Grid(np.zeros_like(walls))
+    table = jps.JumpTable(grid)
+    assert jps.find_path(grid, (0, 0), (11, 0), table=table)[2] == 11 + 2 * 10
+    with pytest.raises(ValueError):
+        jps.find_path(other, (0, 0), (11, 0), table=table)   # same shape, other maze
+    grid.set_cell(6, 10, wall=True)
+    with pytest.raises(ValueError):
+        jps.find_path(grid, (0, 0), (11, 0), table=table)    # stale after set_cell
+
+    from maze_solver import MazeSolver
+    solver = MazeSolver(walls)
+    assert solver.find_path((0, 0), (11, 0), algorithm="jps+")[2] == 31
+    solver.grid.set_cell(6, 10, wall=True)
+    assert solver.find_path((0, 0), (11, 0), algorithm="jps+")[2] == 33
+
+
+def test_jps_reuses_padded_wall_mask():
+    from algorithms.grid import PackedGrid
+    walls = np.zeros((20, 20), dtype=np.uint8)
+    walls[5, :15] = 1
+    for grid in (Grid(walls), PackedGrid.pack(walls)):
+        table = jps.JumpTable(grid, True)
+        assert table.blocked is grid.padded_walls()
+        assert jps.find_path(grid, (0, 0), (19, 0), diagonals=True, table=table)[2] == 30
+        assert jps.find_path(grid, (0, 0), (19, 0), diagonals=True)[2] == 30
+        assert grid.padded_walls() is table.blocked
+        grid.set_cell(5, 15, wall=True)
+        assert grid.padded_walls() is not table.blocked
+        assert jps.find_path(grid, (0, 0), (19, 0), diagonals=True)[2] == 32
+
+
+def test_jps_expands_few_nodes_in_open_room():
+    grid = Grid(np.zeros((60, 60), dtype=np.uint8))
+    path, visited, cost = jps.find_path(grid, (0, 0), (59, 59))
+    assert cost == 118 and len(path) == 119
+    assert len(visited) < 10
+
+
+# ---------------------- Bidirectional search ----------------------
+@pytest.mark.parametrize("diagonals", [False, True])
+def test_bidirectional_is_optimal(diagonals):
+    heuristic = "chebyshev" if diagonals else "manhattan"
+    rng = np.random.default_rng(1)
+    for grid, s, t in _random_grids(100, (12, 15), seed=2):
+        weighted = Grid(grid.wall_array(), rng.integers(1, 6, grid.shape))
+        for g in (grid, weighted):
+            expected = dijkstra.find_path(g, s, t, diagonals=diagonals)[2]
+            results = [
+                dijkstra.find_path(g, s, t, diagonals=diagonals, bidirectional=True),
+                a_star.find_path(g, s, t, diagonals=diagonals, heuristic=heuristic, bidirectional=True),
+            ]
+            if g.uniform:
+                results.append(bfs.find_path(g, s, t, diagonals=diagonals, bidirectional=True))
+            for path, _, cost in results:
+                assert cost == pytest.approx(expected) if expected is not None else cost is None
+                if path:
+                    assert path[0] == s and path[-1] == t
+                    assert sum(g.cost(*p) for p in path[1:]) == pytest.approx(cost)
+
+
+def test_bidirectional_explores_less():
+    grid = Grid(np.zeros((80, 80), dtype=np.uint8))
+    _, visited_uni, _ = bfs.find_path(grid, (40, 10), (40, 70))
+    _, visited_bi, steps = bfs.find_path(grid, (40, 10), (40, 70), bidirectional=True)
+    assert steps == 60
+    assert len(visited_bi) < len(visited_uni)
+
+
+# ---------------------- Priority queues ----------------------
+@pytest.mark.parametrize("diagonals", [False, True])
+def test_integer_queues_match_heap(diagonals):
+    heuristic = "chebyshev" if diagonals else "manhattan"
+    rng = np.random.default_rng(3)
+    for grid, s, t in _random_grids(60, (12, 15), seed=4):
+        for g in (grid, Grid(grid.wall_array(), rng.integers(1, 10, grid.shape)),
+                  Grid(grid.wall_array(), rng.integers(1, 100_000, grid.shape))):
+            expected = dijkstra.find_path(g, s, t, diagonals=diagonals, queue="heap")[2]
+            # Dial's ring is refused for 100000-cost steps (see test_queue_selection).
+            for queue in ("auto", "bucket", "radix") if g.uniform or g.costs.max() < 10 else ("auto", "radix"):
+                for path, _, cost in (dijkstra.find_path(g, s, t, diagonals=diagonals, queue=queue),
+                                      a_star.find_path(g, s, t, diagonals=diagonals, heuristic=heuristic, queue=queue)):
+                    assert cost == expected
+                    if path:
+                        assert path[0] == s and path[-1] == t
+                        assert sum(g.cost(*p) for p in path[1:]) == cost
+
+
+def test_queue_selection():
+    from algorithms.queues import select_queue
+    walls = np.zeros((4, 4), dtype=np.uint8)
+    unit, small, large = Grid(walls), Grid(walls, np.full((4, 4), 7)), Grid(walls, np.full((4, 4), 10**6))
+    fractional = Grid(walls, np.full((4, 4), 1.5))
+    assert select_queue(unit.adjacency()) == "bucket"
+    assert select_queue(small.adjacency(True), heuristic="chebyshev", diagonals=True) == "bucket"
+    assert select_queue(large.adjacency()) == "radix"
+    assert select_queue(fractional.adjacency()) == "heap"
+    assert select_queue(unit.adjacency(), heuristic="euclidean") == "heap"
+    assert select_queue(unit.adjacency(True), heuristic="manhattan", diagonals=True) == "heap"
+    with pytest.raises(ValueError):
+        dijkstra.find_path(fractional, (0, 0), (3, 3), queue="bucket")
+    # A forced ring would allocate a list per key up to the largest step.
+    huge = Grid(np.zeros((3, 3), dtype=np.uint8), np.full((3, 3), 5e7))
+    with pytest.raises(ValueError):
+        dijkstra.find_path(huge, (0, 0), (2, 2), queue="bucket")
+    assert select_queue(large.adjacency(), "radix") == "radix"
+    assert dijkstra.find_path(huge, (0, 0), (2, 2), queue="radix")[2] == 2e8
+    # set_cell invalidates the integer cost layer
+    small.set_cell(1, 1, cost=2.5)
+    assert select_queue(small.adjacency()) == "heap"
+    assert dijkstra.find_path(small, (0, 0), (3, 3))[2] == 37.5
+
+
+# ---------------------- Corridor contraction ----------------------
+@pytest.mark.parametrize("diagonals", [False, True])
+def test_corridor_graph_is_optimal(diagonals):
+    rng = np.random.default_rng(3)
+    for grid, s, t in _random_grids(100, (12, 15), seed=4):
+        weighted = Grid(grid.wall_array(), rng.integers(1, 6, grid.shape))
+        for g in (grid, weighted):
+            expected = dijkstra.find_path(g, s, t, diagonals=diagonals)[2]
+            path, _, cost = corridors.find_path(g, s, t, diagonals=diagonals)
+            assert cost == pytest.approx(expected) if expected is not None else cost is None
+            if path:
+                assert path[0] == s and path[-1] == t
+                assert all(max(abs(a - c), abs(b - d)) == 1 for (a, b), (c, d) in zip(path, path[1:]))
+                assert sum(g.cost(*p) for p in path[1:]) == pytest.approx(cost)
+
+
+def test_corridor_graph_contracts_serpentine():
+    walls = np.ones((21, 21), dtype=np.uint8)
+    walls[1::2, 1:-1] = 0
+    walls[2:-1:4, -2] = 0
+    walls[4:-1:4, 1] = 0
+    grid = Grid(walls)
+    graph = corridors.CorridorGraph(grid)
+    assert graph.node_count == 2  # the two dead ends
+    path, visited, cost = corridors.find_path(grid, (1, 5), (19, 7), graph=graph)
+    assert cost == bfs.find_path(walls, (1, 5), (19, 7))[2]
+    assert len(path) == cost + 1 and len(visited) <= 3
+
+
+# ---------------------- Hierarchical A* ----------------------
+@pytest.mark.parametrize("diagonals", [False, True])
+def test_hpa_paths_are_valid_and_near_optimal(diagonals):
+    rng = np.random.default_rng(5)
+    for grid, s, t in _random_grids(25, (20, 23), seed=6):
+        weighted = Grid(grid.wall_array(), rng.integers(1, 6, grid.shape))
+        for g in (grid, weighted):
+            expected = dijkstra.find_path(g, s, t, diagonals=diagonals)[2]
+            cluster_map = hpa.ClusterMap(g, 6, diagonals)
+            path, _, cost = a_star.find_path(g, s, t, diagonals=diagonals, hierarchy=cluster_map)
+            if expected is None:
+                assert cost is None
+                continue
+            assert cost >= expected - 1e-9
+            assert path[0] == s and path[-1] == t
+            assert all(g.walkable(*p) for p in path)
+            assert sum(g.cost(*p) for p in path[1:]) == pytest.approx(cost)
+
+
+def test_hpa_cluster_map_persists_next_to_maze(tmp_path):
+    import os
+
+    from PIL import Image
+    from maze_solver import MazeSolver
+
+    pixels = np.full((40, 40), 255, dtype=np.uint8)
+    pixels[10, :30] = 0
+    pixels[25, 10:] = 0
+    image = tmp_path / "maze.png"
+    Image.fromarray(pixels).save(image)
+
+    solver = MazeSolver(str(image), cluster_size=8)
+    path, visited, cost = solver.find_path((1, 1), (38, 38), algorithm="hpa")
+    saved = hpa.cluster_map_path(str(image), 8, False)
+    assert path[-1] == (38, 38) and cost >= solver.find_path((1, 1), (38, 38))[2]
+    assert os.path.exists(saved)
+
+    reloaded = MazeSolver(str(image), cluster_size=8)
+    assert reloaded.cluster_map().edges == solver.cluster_map().edges
+    assert reloaded.find_path((1, 1), (38, 38), algorithm="hpa")[2] == cost
+
+
+# ---------------------- ALT landmarks ----------------------
+@pytest.mark.parametrize("diagonals", [False, True])
+def test_alt_heuristic_is_exact(diagonals):
+    rng = np.random.default_rng(8)
+    for grid, s, t in _random_grids(20, (18, 21), seed=9):
+        walls = grid.wall_array()
+        weighted = Grid(walls, rng.integers(1, 6, grid.shape))
+        fractional = Grid(walls, rng.uniform(1, 4, grid.shape).astype(np.float32))
+        for g in (grid, weighted, fractional):
+            table = alt.LandmarkTable(g, 4, diagonals)
+            assert table.distances.dtype == (np.float32 if g is fractional else np.uint32)
+            expected = dijkstra.find_path(g, s, t, diagonals=diagonals)[2]
+            path, _, cost = a_star.find_path(g, s, t, diagonals=diagonals, heuristic="alt", landmarks=table)
+            if expected is None:
+                assert cost is None
+                continue
+            assert cost == pytest.approx(expected, rel=1e-6)
+            assert path[0] == s and path[-1] == t
+            assert sum(g.cost(*p) for p in path[1:]) == pytest.approx(cost, rel=1e-6)
+    with pytest.raises(ValueError):
+        a_star.find_path(grid, s, t, diagonals=not diagonals, heuristic="alt", landmarks=table)
+
+
+def test_alt_expands_less_and_persists(tmp_path):
+    import os
+
+    from maze_solver import MazeSolver
+    from utils.maze_format import save_maze
+    from utils.maze_generators import perfect_maze
+
+    walls = perfect_maze(121, seed=3)
+    path = tmp_path / "perfect.maze"
+    save_maze(str(path), walls)
+    solver = MazeSolver(str(path), landmarks=6)
+    free = np.argwhere(walls == 0)
+    pairs = [tuple(tuple(free[i].tolist()) for i in pair)
+             for pair in np.random.default_rng(1).choice(len(free), (10, 2))]
+    expanded = {"manhattan": 0, "alt": 0}
+    for s, t in pairs:
+        costs = set()
+        for heuristic in expanded:
+            _, stats, cost = solver.find_path(s, t, heuristic=heuristic)
+            expanded[heuristic] += stats.expanded
+            costs.add(cost)
+        assert len(costs) == 1
+    assert expanded["alt"] * 2 < expanded["manhattan"]
+    assert os.path.exists(alt.landmark_path(str(path), 6, False))
+
+    reloaded = MazeSolver(str(path), landmarks=6)
+    assert np.array_equal(reloaded.landmark_table().distances, solver.landmark_table().distances)
+    s, t = pairs[0]
+    assert reloaded.find_path(s, t, heuristic="alt")[1].expanded == solver.find_path(s, t, heuristic="alt")[1].expanded
+    with pytest.raises(ValueError):
+        solver.find_path(s, t, algorithm="jps", heuristic="alt")
+
+
+# ---------------------- Anytime ARA* ----------------------
+def test_ara_star_improves_to_optimal_with_valid_bounds():
+    from utils.maze_generators import weighted_grid
+
+    for diagonals in (False, True):
+        heuristic = "chebyshev" if diagonals else "manhattan"
+        weighted = [(Grid(*weighted_grid(24, seed)), (1, 1), (22, 22)) for seed in range(10)]
+        for grid, s, t in list(_random_grids(25, (20, 20), seed=17)) + weighted:
+            _, _, expected = dijkstra.find_path(grid, s, t, diagonals=diagonals)
+            sols = list(ara_star.solutions(grid, s, t, diagonals=diagonals, heuristic=heuristic, weight=4.0))
+            if expected is None:
+                assert sols == [] and ara_star.find_path(grid, s, t, diagonals=diagonals)[0] == []
+                continue
+            assert [x.cost for x in sols] == sorted((x.cost for x in sols), reverse=True)
+            for x in sols:
+                assert expected <= x.cost <= x.bound * expected + 1e-9
+                assert x.path[0] == s and x.path[-1] == t
+                assert sum(grid.cost(*p) for p in x.path[1:]) == pytest.approx(x.cost)
+            assert sols[-1].bound == 1.0 and sols[-1].cost == pytest.approx(expected)
+
+
+def test_ara_star_budget_returns_bounded_path():
+    from utils.maze_generators import random_obstacles
+
+    grid = Grid(random_obstacles(200, 2, density=0.2))
+    path, stats, cost = ara_star.find_path(grid, (1, 1), (198, 198), max_expansions=500)
+    assert stats.stopped == "max expansions" and stats.expanded == 500
+    _, _, expected = a_star.find_path(grid, (1, 1), (198, 198))
+    if path:
+        assert expected <= cost <= stats.bound * expected + 1e-9 and stats.bound <= 3.0
+    path, stats, cost = ara_star.find_path(grid, (1, 1), (198, 198))
+    assert cost == expected and stats.bound == 1.0 and stats.stopped is None
+
+
+# ---------------------- Incremental replanning ----------------------
+@pytest.mark.parametrize("diagonals", [False, True])
+def test_d_star_lite_tracks_changes(diagonals):
+    rng = np.random.default_rng(7)
+    heuristic = "chebyshev" if diagonals else "manhattan"
+    for grid, s, t in _random_grids(20, (14, 16), seed=8):
+        grid = Grid(grid.wall_array(), rng.integers(1, 4, grid.shape))
+        planner = d_star_lite.DStarLite(grid, s, t, diagonals=diagonals, heuristic=heuristic)
+        for _ in range(8):
+            path = planner.path()
+            expected = dijkstra.find_path(grid, planner.start, t, diagonals=diagonals)[2]
+            assert planner.cost() == pytest.approx(expected) if expected is not None else path == []
+            if path:
+                assert path[0] == planner.start and path[-1] == t
+                assert sum(grid.cost(*p) for p in path[1:]) == pytest.approx(expected)
+                if len(path) > 2:
+                    planner.move_to(path[1])
+            changed = []
+            for r, c in rng.integers(0, grid.shape, (3, 2)).tolist():
+                if (r, c) not in (planner.start, t):
+                    grid.set_cell(r, c, wall=not grid.walkable(r, c), cost=float(rng.integers(1, 4)))
+                    changed.append((r, c))
+            planner.update(changed)
+
+
+def test_d_star_lite_replans_locally():
+    walls = np.zeros((60, 60), dtype=np.uint8)
+    walls[30, 5:55] = 1
+    grid = Grid(walls)
+    planner = d_star_lite.DStarLite(grid, (0, 30), (59, 30))
+    first = planner.path()
+    initial = planner.expanded
+    grid.set_cell(45, 30, wall=True)
+    planner.update([(45, 30)])
+    assert len(planner.path()) - 1 == bfs.find_path(grid, (0, 30), (59, 30))[2]
+    assert len(first) > 0 and planner.expanded < initial / 5
+
+
+# ---------------------- MazeSolver ----------------------
+def test_solver_solve_many_shares_trees():
+    from maze_solver import MazeSolver
+
+    for weighted in (False, True):
+        rng = np.random.default_rng(3)
+        walls = rng.random((20, 20)) < 0.25
+        costs = rng.integers(1, 5, walls.shape) if weighted else None
+        grid = Grid(walls, costs)
+        solver = MazeSolver(grid)
+        free = [tuple(p) for p in np.argwhere(~walls).tolist()]
+        queries = [(free[0], g) for g in free[1:30]] + [(free[5], free[-1])]
+        results = solver.solve_many(queries, algorithm="dijkstra")
+        assert len(solver._trees) == 1
+        for (s, t), (path, cost) in zip(queries, results):
+            _, _, expected = dijkstra.find_path(grid, s, t)
+            assert cost == pytest.approx(expected) if expected is not None else cost is None
+            if path:
+                assert path[0] == s and path[-1] == t
+                assert sum(grid.cost(*p) for p in path[1:]) == pytest.approx(cost)
+        tree = solver.shortest_paths_from(free[0])
+        assert tree is solver.shortest_paths_from(free[0])
+        assert tree.cost_to(free[0]) == 0
+
+        # Trees handed out stay intact after the LRU evicts them.
+        small = MazeSolver(grid, max_trees=1)
+        first = small.shortest_paths_from(free[0])
+        cost, path = first.cost_to(free[-1]), first.path_to(free[-1])
+        small.shortest_paths_from(free[5])
+        small.shortest_paths_from(free[-1])
+        assert len(small._trees) == 1
+        assert first.cost_to(free[-1]) == cost and first.path_to(free[-1]) == path and path[0] == free[0]
+        if weighted:   # Dijkstra trees nobody holds any more lend their arrays to the next one
+            view = small.shortest_paths_from(free[-1]).dist
+            small.shortest_paths_from(free[3])    # evicts the viewed tree: kept as is
+            assert small._spare is None
+            del view
+            reused = id(small._trees[(free[3], False)]._dist)
+            small.shortest_paths_from(free[7])    # evicts the tree nobody holds: its arrays are spare
+            assert id(small._spare[0]) == reused
+            tree = small.shortest_paths_from(free[9])
+            assert id(tree._dist) == reused and tree.cost_to(free[9]) == 0
+            assert tree.cost_to(free[-1]) == pytest.approx(dijkstra.find_path(grid, free[9], free[-1])[2])
+
+
+def test_solver_loads_image():
+    from maze_solver import MazeSolver
+
+    solver = MazeSolver("examples/0065541.png")
+    assert solver.shape == (191, 191)
+    path = solver.solve((1, 0), (189, 190), algorithm="bfs")
+    assert path[0] == (1, 0) and path[-1] == (189, 190)
+
+
+# ---------------------- Batch CLI ----------------------
+def test_batch_streams_and_resumes(tmp_path):
+    import io
+    import json
+    import shutil
+
+    from PIL import Image
+
+    import batch
+
+    for name in ("0065541.png", "0065542.png"):
+        shutil.copy(f"examples/{name}", tmp_path / name)
+    options = {"algorithm": "bfs", "heuristic": "manhattan", "diagonals": False, "start": None, "goal": None}
+    out = io.StringIO()
+    assert batch.run_batch(str(tmp_path), options, out, workers=1, chunk_size=1) == 2
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert {r["file"] for r in records} == {str(tmp_path / "0065541.png"), str(tmp_path / "0065542.png")}
+    assert all(r["found"] and r["path_length"] == r["cost"] for r in records)
+
+    output = tmp_path / "results.jsonl"
+    output.write_text(out.getvalue().splitlines()[0] + "\n")
+    skip = batch.completed_files(str(output))
+    assert len(skip) == 1
+    out = io.StringIO()
+    assert batch.run_batch(str(tmp_path), options, out, workers=1, skip=skip) == 1
+
+    images = tmp_path / "solved"
+    options.update(root=str(tmp_path), images=str(images), heatmap=True, scale=2)
+    record = batch.solve_file(str(tmp_path / "0065541.png"), options)
+    assert record["image"] == str(images / "0065541.solution.png")
+    with Image.open(record["image"]) as image:
+        assert image.size == (382, 382)
+
+    options.update(algorithm="astar", heuristic="alt", landmarks=4, images=None)
+    record = batch.solve_file(str(tmp_path / "0065541.png"), options)
+    assert record["cost"] == {r["file"]: r["cost"] for r in records}[str(tmp_path / "0065541.png")]
+    assert (tmp_path / "0065541.png.alt4.npz").exists()
+    assert batch.solve_file(str(tmp_path / "0065541.png"), options)["cost"] == record["cost"]
+
+
+def test_solve_server_batches_queries(tmp_path):
+    import asyncio
+    import json
+    import threading
+
+    from server import SolveClient, SolveServer
+
+    rng = np.random.default_rng(6)
+    walls = (rng.random((30, 40)) < 0.25).astype(np.uint8)
+    free = [tuple(p) for p in np.argwhere(walls == 0).tolist()]
+    queries = [(free[i], free[-1 - 3 * i]) for i in range(20)]
+    sock = str(tmp_path / "solve.sock")
+
+    async def scenario():
+        server = SolveServer(workers=0, batch_window=0.05)
+        listener = await server.start(sock)
+        reader, writer = await asyncio.open_unix_connection(sock)
+
+        async def ask(request):
+            writer.write(json.dumps(request).encode() + b"\n")
+            await writer.drain()
+            return json.loads(await reader.readline())
+
+        maze = (await ask({"op": "register", "walls": walls.tolist(), "maze": "site"}))["maze"]
+        assert maze == "site"
+        assert "error" in await ask({"op": "solve", "maze": "nope", "start": [0, 0], "goal": [1, 1]})
+        assert "error" in await ask({"op": "solve", "maze": maze, "start": [0, 0], "goal": "far"})
+        for i, (s, t) in enumerate(queries + [((0, 0), (99, 99))]):   # pipelined; the last is out of bounds
+            writer.write(json.dumps({"op": "solve", "id": i, "maze": maze, "start": s, "goal": t,
+                                     "algorithm": "dijkstra"}).encode() + b"\n")
+        await writer.drain()
+        replies = {}
+        for _ in range(len(queries) + 1):
+            reply = json.loads(await reader.readline())
+            replies[reply["id"]] = reply
+        stats = await ask({"op": "stats"})
+        writer.close()
+        await writer.wait_closed()
+        await asyncio.sleep(0.01)   # let the server see the disconnect
+        listener.close()
+        await listener.wait_closed()
+        server.close()
+        return replies, stats
+
+    replies, stats = asyncio.run(scenario())
+    assert (replies[len(queries)]["path"], replies[len(queries)]["cost"]) == ([], None)
+    for i, (s, t) in enumerate(queries):
+        expected = dijkstra.find_path(Grid(walls), s, t)[2]
+        assert replies[i]["cost"] == expected and replies[i]["batch"] == len(queries) + 1
+    assert stats["mazes"] == ["site"] and stats["batches"] == 1
+
+    # Worker processes behind the blocking client; each maze is pinned to one of them
+    np.save(tmp_path / "maze.npy", walls)
+    server = SolveServer(workers=2)
+    loop = asyncio.new_event_loop()
+    listener = loop.run_until_complete(server.start(sock))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        with SolveClient(sock, timeout=60) as client:
+            maze = client.register(walls=walls)
+            assert client.register(walls=walls) == maze   # content hash
+            other = client.register(walls=1 - walls, maze="other")
+            assert client.register(walls=walls, maze="alias") == "alias"
+            assert server.mazes["alias"].worker == server.mazes[maze].worker != server.mazes[other].worker
+            path, cost = client.solve(maze, *queries[0], algorithm="astar")
+            assert path[0] == queries[0][0] and cost == dijkstra.find_path(Grid(walls), *queries[0])[2]
+            with pytest.raises(RuntimeError):
+                client.register(path=str(tmp_path / "missing.png"))
+    finally:
+        async def shutdown():
+            listener.close()
+            await listener.wait_closed()
+            await asyncio.sleep(0.01)
+
+        asyncio.run_coroutine_threadsafe(shutdown(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+        server.close()
+
+
+# ---------------------- Solution cache ----------------------
+def test_solution_cache_tiers(tmp_path):
+    from utils.cache import SolutionCache, grid_digest, solution_key
+
+    digest = grid_digest(Grid(np.array(MAZE)))
+    assert digest == grid_digest(as_grid(MAZE))
+    assert digest != grid_digest(Grid(np.array(MAZE), np.full((5, 5), 2.0)))
+    key = solution_key(digest, (0, 0), (4, 4), "astar", False, "manhattan")
+    assert key != solution_key(digest, (0, 0), (4, 4), "astar", True, "manhattan")
+    hpa_key = solution_key(digest, (0, 0), (4, 4), "hpa", False, "manhattan", cluster_size=8)
+    assert hpa_key != solution_key(digest, (0, 0), (4, 4), "hpa", False, "manhattan", cluster_size=16)
+
+    cache = SolutionCache(max_items=2, disk_dir=str(tmp_path))
+    assert cache.get(key) is None
+    cache.put(key, [(0, 0), (0, 1)], 1.0, 7)
+    assert cache.get(key) == ([(0, 0), (0, 1)], 1.0, 7)
+
+    # A fresh instance only has the disk tier.
+    cache = SolutionCache(max_items=2, disk_dir=str(tmp_path))
+    assert cache.get(key) == ([(0, 0), (0, 1)], 1.0, 7)
+    cache.put("nopath", [], None, 3)
+    assert cache.get("nopath") == ([], None, 3)
+
+    small = SolutionCache(max_items=1, disk_dir=str(tmp_path), disk_max_bytes=1)
+    small.put("other", [(1, 1)], 0.0, 1)
+    assert len(small) == 1
+    assert len(list(tmp_path.glob("*.npz"))) == 0
+
+
+def test_solver_uses_cache():
+    from maze_solver import MazeSolver
+    from utils.cache import SolutionCache
+
+    cache = SolutionCache()
+    solver = MazeSolver(MAZE, cache=cache)
+    first = solver.find_path((0, 0), (4, 4))
+    again = solver.find_path((0, 0), (4, 4))
+    assert again[0] == first[0] and again[2] == first[2]
+    assert cache.hits == 1 and cache.misses == 1
+
+    # Options that shape the path are part of the key: another cluster size misses.
+    MazeSolver(MAZE, cache=cache, cluster_size=2).find_path((0, 0), (4, 4), algorithm="hpa")
+    MazeSolver(MAZE, cache=cache, cluster_size=3).find_path((0, 0), (4, 4), algorithm="hpa")
+    assert cache.hits == 1 and cache.misses == 3
+    MazeSolver(MAZE, cache=cache, cluster_size=3).find_path((0, 0), (4, 4), algorithm="hpa")
+    assert cache.hits == 2
+
+
+# ---------------------- Image loading ----------------------
+def test_load_maze_image_and_sidecar_cache(tmp_path):
+    import os
+    import shutil
+
+    from PIL import Image
+    from utils import image_processor
+
+    src = tmp_path / "maze.png"
+    shutil.copy("examples/0065541.png", src)
+    walls = image_processor.load_maze_image(str(src))
+    assert walls.dtype == np.uint8 and walls.shape == (191, 191)
+    gray = np.asarray(Image.open(src).convert("L"))
+    assert np.array_equal(walls, (gray < 128).astype(np.uint8))
+
+    cached = image_processor.load_maze_image(str(src), cache=True)
+    sidecar = tmp_path / "maze.png.t128.npz"
+    assert sidecar.exists() and np.array_equal(cached, walls)
+    # A valid sidecar is used without decoding the image.
+    with np.load(sidecar) as data:
+        fake = dict(data)
+    fake["walls"] = np.zeros_like(walls)
+    np.savez(sidecar, **fake)
+    assert not image_processor.load_maze_image(str(src), cache=True).any()
+    # Changing the image invalidates it.
+    Image.fromarray(np.full((4, 4), 255, dtype=np.uint8)).save(src)
+    os.utime(src, ns=(1, 1))
+    assert image_processor.load_maze_image(str(src), cache=True).shape == (4, 4)
+
+    central = tmp_path / "grids"
+    image_processor.load_maze_image(str(src), cache=str(central))
+    assert len(list(central.glob("*.npz"))) == 1
+
+
+# ---------------------- Packed .maze format ----------------------
+def test_packed_maze_round_trip(tmp_path):
+    from algorithms.grid import PackedGrid
+    from utils import maze_format
+
+    rng = np.random.default_rng(4)
+    walls = (rng.random((23, 37)) < 0.3).astype(np.uint8)
+    costs = rng.integers(1, 5, walls.shape).astype(np.float32)
+    fname = str(tmp_path / "grid.maze")
+    maze_format.save_maze(fname, walls, costs)
+    info = maze_format.read_header(fname)
+    assert (info["height"], info["width"], info["row_stride"], info["has_costs"]) == (23, 37, 5, True)
+
+    packed = maze_format.open_maze(fname)
+    assert isinstance(packed.bits, np.memmap)
+    assert np.array_equal(packed.wall_array(), walls)
+    dense = Grid(walls, costs)
+    free = [tuple(p) for p in np.argwhere(walls == 0).tolist()]
+    for s, t in [(free[0], free[-1]), (free[3], free[40])]:
+        for fn, kwargs in ((dijkstra.find_path, {}), (a_star.find_path, {"diagonals": True})):
+            (p1, st1, c1), (p2, st2, c2) = fn(packed, s, t, **kwargs), fn(dense, s, t, **kwargs)
+            assert (p1, st1.expanded, c1) == (p2, st2.expanded, c2)
+    assert np.array_equal(PackedGrid.pack(walls).wall_array(), walls)
+
+
+def test_huge_packed_maze_searches_without_dense_arrays(tmp_path):
+    from algorithms.workspace import SparseWorkspace
+    from utils import maze_format
+
+    # 10^10 cells: a sparse 1.25 GB file, while flat search arrays would need over 100 GB.
+    fname = str(tmp_path / "huge.maze")
+    walls, _ = maze_format.create_maze(fname, 100_000, 100_000)
+    walls[2, :2] = 0xFF
+    walls.flush()
+    del walls
+    packed = maze_format.open_maze(fname)
+    with packed.search_workspace() as workspace:
+        assert isinstance(workspace, SparseWorkspace)
+    assert a_star.find_path(packed, (1, 1), (1, 13))[2] == 12.0
+    for fn in (a_star.find_path, dijkstra.find_path, bfs.find_path):
+        path, _, cost = fn(packed, (1, 1), (3, 1))   # around the wall on row 2, columns 0-15
+        assert cost == 32 and path[-1] == (3, 1) and all(packed.walkable(*p) for p in path)
+
+
+def test_tiled_grid_matches_dense(tmp_path):
+    from maze_solver import MazeSolver
+    from utils import maze_format, tile_format
+
+    rng = np.random.default_rng(5)
+    walls = (rng.random((45, 61)) < 0.25).astype(np.uint8)
+    costs = rng.integers(1, 6, walls.shape).astype(np.float32)
+    tile_format.save_tiles(str(tmp_path / "tiles"), walls, costs, tile=8)
+    tiled = tile_format.open_tiles(str(tmp_path / "tiles"), cache_tiles=12, cache_arrays=32)
+    assert tiled.shape == (45, 61) and tiled.tile_rows == 6 and tiled.tile_cols == 8
+    assert np.array_equal(tiled.wall_array(), walls) and tiled.integer_step_bound() == 5
+    dense = Grid(walls, costs)
+    free = [tuple(p) for p in np.argwhere(walls == 0).tolist()]
+    for s, t in [(free[0], free[-1]), (free[7], free[500])]:
+        for fn, kwargs in ((dijkstra.find_path, {}), (dijkstra.find_path, {"queue": "heap"}),
+                           (a_star.find_path, {"diagonals": True, "heuristic": "chebyshev"})):
+            (p1, st1, c1), (p2, st2, c2) = fn(tiled, s, t, **kwargs), fn(dense, s, t, **kwargs)
+            assert (p1, st1.expanded, c1) == (p2, st2.expanded, c2)
+            # The search arrays of 48 tiles x 3 maps do not fit: evicted ones are spilled and reloaded.
+            arrays = tiled.cache_stats()["search_arrays"]
+            assert arrays["resident"] <= 32 and arrays["hits"] > 0
+            assert tiled.search_arrays.spills > 0 or len(p1) < 60
+    tiles = tiled.cache_stats()["tiles"]
+    assert tiles["resident"] <= 12 and tiles["hits"] > tiles["misses"] > 0 and tiles["evictions"] > 0
+    with pytest.raises(ValueError):
+        tiled.set_cell(0, 0, wall=True)
+
+    # .maze files convert band by band
+    maze_format.save_maze(str(tmp_path / "grid.maze"), walls)
+    tile_format.convert(str(tmp_path / "grid.maze"), str(tmp_path / "from_maze"), tile=16)
+    unit = tile_format.open_tiles(str(tmp_path / "from_maze"))
+    assert unit.uniform and np.array_equal(unit.wall_array(), walls)
+    assert dijkstra.find_path(unit, free[0], free[-1])[2] == bfs.find_path(Grid(walls), free[0], free[-1])[2]
+    solver = MazeSolver(str(tmp_path / "from_maze"))
+    for algorithm in ("jps", "jps+"):
+        assert solver.find_path(free[0], free[-1], algorithm=algorithm)[2] == \
+            bfs.find_path(Grid(walls), free[0], free[-1])[2]
+
+
+def test_convert_image_to_maze(tmp_path):
+    from utils import maze_format
+    from utils.image_processor import load_maze_image
+
+    fname = str(tmp_path / "example.maze")
+    maze_format.main(["examples/0065541.png", fname])
+    packed = maze_format.open_maze(fname)
+    assert packed.uniform
+    assert np.array_equal(packed.wall_array(), load_maze_image("examples/0065541.png"))
+    assert bfs.find_path(packed, (1, 0), (189, 190))[2] == 4062
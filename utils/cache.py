@@ -0,0 +1,152 @@
+import hashlib
+import os
+import tempfile
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from algorithms.grid import Grid
+
+Coord = Tuple[int, int]
+# Cached value: (path, cost, nodes_expanded)
+Solution = Tuple[List[Coord], Optional[float], int]
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "mazepathfinder", "solutions")
+
+
+def grid_digest(grid: Grid) -> str:
+    """Content hash of a grid: shape, wall mask and cost layer (if any)."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(np.asarray(grid.shape, dtype=np.int64).tobytes())
+    h.update(grid.walls.tobytes())
+    if grid.costs is not None:
+        h.update(grid.costs.tobytes())
+    return h.hexdigest()
+
+
+def solution_key(digest: str, start: Coord, goal: Coord, algorithm: str,
+                 diagonals: bool, heuristic: Optional[str] = None, **params) -> str:
+    """
+    Cache key for one query; pass heuristic=None for algorithms that ignore it,
+    and every other option that can change the returned path as a keyword
+    (e.g. cluster_size=32 for hpa).
+    """
+    raw = f"{digest}|{start[0]},{start[1]}|{goal[0]},{goal[1]}|{algorithm}|{int(bool(diagonals))}|{heuristic}"
+    raw += "".join(f"|{name}={params[name]!r}" for name in sorted(params))
+    return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+
+class SolutionCache:
+    """
+    Two-tier cache of solved queries.
+
+    The memory tier is a bounded LRU of recent solutions. The optional disk tier
+    stores one small .npz per solution under `disk_dir` and evicts the least
+    recently used files once their total size exceeds `disk_max_bytes`.
+    Disk hits are promoted into memory.
+    """
+
+    def __init__(self, max_items: int = 256, disk_dir: Optional[str] = None,
+                 disk_max_bytes: int = 256 * 1024 * 1024):
+        self.max_items = max_items
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._memory: "OrderedDict[str, Solution]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._disk_bytes = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._disk_bytes = sum(e.stat().st_size for e in os.scandir(disk_dir) if e.name.endswith(".npz"))
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def get(self, key: str) -> Optional[Solution]:
+        value = self._memory.get(key)
+        if value is not None:
+            self._memory.move_to_end(key)
+        elif self.disk_dir:
+            value = self._load(key)
+            if value is not None:
+                self._remember(key, value)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        path, cost, expanded = value
+        return list(path), cost, expanded
+
+    def put(self, key: str, path: List[Coord], cost: Optional[float], nodes_expanded: int) -> None:
+        value = (list(path), cost, int(nodes_expanded))
+        self._remember(key, value)
+        if self.disk_dir:
+            self._store(key, value)
+
+    def clear(self) -> None:
+        self._memory.clear()
+        if self.disk_dir:
+            for e in os.scandir(self.disk_dir):
+                if e.name.endswith(".npz"):
+                    os.remove(e.path)
+            self._disk_bytes = 0
+
+    # ---------------------- Memory tier ----------------------
+    def _remember(self, key: str, value: Solution) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+
+    # ---------------------- Disk tier ----------------------
+    def _file(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key + ".npz")
+
+    def _load(self, key: str) -> Optional[Solution]:
+        fname = self._file(key)
+        try:
+            with np.load(fname) as data:
+                path = [tuple(p) for p in data["path"].tolist()]
+                cost = float(data["cost"])
+                expanded = int(data["expanded"])
+            os.utime(fname)  # mtime doubles as the LRU clock
+        except (OSError, KeyError, ValueError):
+            return None
+        return path, (None if np.isnan(cost) else cost), expanded
+
+    def _store(self, key: str, value: Solution) -> None:
+        path, cost, expanded = value
+        fname = self._file(key)
+        fd, tmp = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                np.savez(fh, path=np.asarray(path, dtype=np.int32).reshape(-1, 2),
+                         cost=np.float64(np.nan if cost is None else cost),
+                         expanded=np.int64(expanded))
+            old = os.path.getsize(fname) if os.path.exists(fname) else 0
+            os.replace(tmp, fname)
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            return
+        self._disk_bytes += os.path.getsize(fname) - old
+        if self._disk_bytes > self.disk_max_bytes:
+            self._evict()
+
+    def _evict(self) -> None:
+        entries = sorted((e for e in os.scandir(self.disk_dir) if e.name.endswith(".npz")),
+                         key=lambda e: e.stat().st_mtime)
+        total = sum(e.stat().st_size for e in entries)
+        # Trim to 90% of the budget so a full cache does not rescan on every put.
+        target = int(self.disk_max_bytes * 0.9)
+        for e in entries:
+            if total <= target:
+                break
+            try:
+                size = e.stat().st_size
+                os.remove(e.path)
+                total -= size
+            except OSError:
+                pass
+        self._disk_bytes = total
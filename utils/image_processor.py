@@ -0,0 +1,94 @@
+import hashlib
+import os
+from typing import Optional, Tuple, Union
+
+from PIL import Image
+import numpy as np
+
+DEFAULT_GRID_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "mazepathfinder", "grids")
+
+
+def image_to_walls(img: Image.Image, threshold: int = 128) -> np.ndarray:
+    """
+    Binarize a PIL image into a uint8 wall mask: 1 for dark pixels (< threshold,
+    walls), 0 for light pixels (free). Thresholding is done by NumPy on the raw
+    buffer; 1-bit images are used as-is without a grayscale round trip.
+    """
+    if img.mode == '1':
+        walls = ~np.asarray(img)            # True = white pixel
+    else:
+        if img.mode != 'L':
+            img = img.convert('L')
+        walls = np.asarray(img) < threshold
+    return walls.view(np.uint8)
+
+
+def file_digest(file_path: str) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as fh:
+        for block in iter(lambda: fh.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _sidecar_path(file_path: str, threshold: int, cache: Union[bool, str]) -> str:
+    if cache is True:
+        return f"{file_path}.t{threshold}.npz"
+    # Central cache directory: name the entry after the image's absolute path.
+    name = hashlib.blake2b(os.path.abspath(file_path).encode(), digest_size=12).hexdigest()
+    return os.path.join(cache, f"{name}.t{threshold}.npz")
+
+
+def _read_sidecar(sidecar: str, file_path: str, st: os.stat_result) -> Tuple[Optional[np.ndarray], bool]:
+    """Returns (walls or None, whether the sidecar's mtime/size still match)."""
+    try:
+        with np.load(sidecar) as data:
+            if int(data['mtime_ns']) == st.st_mtime_ns and int(data['size']) == st.st_size:
+                return data['walls'], True
+            # Touched but possibly unchanged: fall back to the content hash.
+            if str(data['digest']) == file_digest(file_path):
+                return data['walls'], False
+    except (OSError, KeyError, ValueError):
+        pass
+    return None, False
+
+
+def _write_sidecar(sidecar: str, walls: np.ndarray, file_path: str, st: os.stat_result) -> None:
+    tmp = sidecar + '.tmp'
+    try:
+        os.makedirs(os.path.dirname(sidecar) or '.', exist_ok=True)
+        with open(tmp, 'wb') as fh:
+            np.savez(fh, walls=walls, mtime_ns=np.int64(st.st_mtime_ns), size=np.int64(st.st_size),
+                     digest=np.str_(file_digest(file_path)))
+        os.replace(tmp, sidecar)
+    except OSError:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def load_maze_image(file_path: str, threshold: int = 128, cache: Union[bool, str] = False) -> np.ndarray:
+    """
+    Load a maze image as a (H, W) uint8 wall mask: 1 = wall (dark), 0 = free (light).
+
+    cache=True keeps a binarized copy in a sidecar `<image>.t<threshold>.npz`; a
+    directory path stores the sidecars there instead. The sidecar is valid while
+    the image's mtime and size match, or, failing that, its content hash, so
+    later loads skip image decoding entirely.
+    """
+    sidecar = None
+    if cache:
+        st = os.stat(file_path)
+        sidecar = _sidecar_path(file_path, threshold, cache)
+        if os.path.exists(sidecar):
+            walls, fresh = _read_sidecar(sidecar, file_path, st)
+            if walls is not None:
+                if not fresh:
+                    _write_sidecar(sidecar, walls, file_path, st)
+                return walls
+
+    with Image.open(file_path) as img:
+        walls = image_to_walls(img, threshold)
+
+    if sidecar is not None:
+        _write_sidecar(sidecar, walls, file_path, st)
+    return walls
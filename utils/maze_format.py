@@ -0,0 +1,117 @@
+"""
+Native .maze format: a bit-packed wall mask with a small header, opened with
+np.memmap so searches can run on mazes far larger than RAM.
+
+Layout (little-endian):
+    header   64 bytes: magic b"MAZEBITS", version u32, flags u32,
+             height u64, width u64, row_stride u64, cost_offset u64, zero padding
+    walls    height * row_stride bytes; bit c%8 of byte c//8 in each row, 1 = wall
+    costs    optional float32 [height * width], 4-byte aligned, present if flags & 1
+
+Convert an image:
+    python -m utils.maze_format examples/0065541.png maze.maze
+"""
+import argparse
+import struct
+import sys
+from typing import Optional
+
+import numpy as np
+
+from algorithms.grid import PackedGrid
+from utils.image_processor import load_maze_image
+
+MAGIC = b"MAZEBITS"
+VERSION = 1
+FLAG_COSTS = 1
+HEADER = struct.Struct("<8sIIQQQQ")
+HEADER_SIZE = 64
+ROWS_PER_BLOCK = 4096
+
+
+def _layout(height: int, width: int, has_costs: bool):
+    stride = (width + 7) // 8
+    walls_end = HEADER_SIZE + height * stride
+    cost_offset = (walls_end + 3) & ~3 if has_costs else 0
+    total = cost_offset + height * width * 4 if has_costs else walls_end
+    return stride, cost_offset, total
+
+
+def create_maze(path: str, height: int, width: int, *, has_costs: bool = False):
+    """
+    Create an empty (all free) .maze file and return writable memmaps
+    (walls (H, row_stride) uint8, costs (H, W) float32 or None) to fill in place.
+    """
+    stride, cost_offset, total = _layout(height, width, has_costs)
+    with open(path, "wb") as fh:
+        header = HEADER.pack(MAGIC, VERSION, FLAG_COSTS if has_costs else 0,
+                             height, width, stride, cost_offset)
+        fh.write(header.ljust(HEADER_SIZE, b"\0"))
+        fh.truncate(total)
+    walls = np.memmap(path, dtype=np.uint8, mode="r+", offset=HEADER_SIZE, shape=(height, stride))
+    costs = None
+    if has_costs:
+        costs = np.memmap(path, dtype=np.float32, mode="r+", offset=cost_offset, shape=(height, width))
+        costs[:] = 1.0
+    return walls, costs
+
+
+def save_maze(path: str, walls: np.ndarray, costs: Optional[np.ndarray] = None) -> None:
+    """Write an in-memory (H, W) wall mask (nonzero = wall) and optional cost layer."""
+    H, W = walls.shape
+    bits, cost_map = create_maze(path, H, W, has_costs=costs is not None)
+    for r0 in range(0, H, ROWS_PER_BLOCK):
+        r1 = min(H, r0 + ROWS_PER_BLOCK)
+        bits[r0:r1] = np.packbits(walls[r0:r1] != 0, axis=1, bitorder="little")
+        if cost_map is not None:
+            cost_map[r0:r1] = costs[r0:r1]
+    bits.flush()
+    if cost_map is not None:
+        cost_map.flush()
+    del bits, cost_map
+
+
+def read_header(path: str) -> dict:
+    with open(path, "rb") as fh:
+        raw = fh.read(HEADER_SIZE)
+    if len(raw) < HEADER_SIZE:
+        raise ValueError(f"{path}: truncated .maze header")
+    magic, version, flags, height, width, stride, cost_offset = HEADER.unpack_from(raw)
+    if magic != MAGIC:
+        raise ValueError(f"{path}: not a .maze file")
+    if version != VERSION:
+        raise ValueError(f"{path}: unsupported .maze version {version}")
+    return {"height": height, "width": width, "row_stride": stride,
+            "has_costs": bool(flags & FLAG_COSTS), "cost_offset": cost_offset}
+
+
+def open_maze(path: str, mode: str = "r") -> PackedGrid:
+    """Memory-map a .maze file as a PackedGrid; nothing is read until cells are accessed."""
+    info = read_header(path)
+    H, W, stride = info["height"], info["width"], info["row_stride"]
+    bits = np.memmap(path, dtype=np.uint8, mode=mode, offset=HEADER_SIZE, shape=(H * stride,))
+    costs = None
+    if info["has_costs"]:
+        costs = np.memmap(path, dtype=np.float32, mode=mode, offset=info["cost_offset"], shape=(H * W,))
+    return PackedGrid(bits, (H, W), costs)
+
+
+def convert_image(image_path: str, out_path: str, threshold: int = 128) -> None:
+    """Convert any image accepted by load_maze_image into a .maze file."""
+    save_maze(out_path, load_maze_image(image_path, threshold))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Convert maze images to the packed .maze format.")
+    parser.add_argument("image")
+    parser.add_argument("output")
+    parser.add_argument("--threshold", type=int, default=128)
+    args = parser.parse_args(argv)
+    convert_image(args.image, args.output, args.threshold)
+    info = read_header(args.output)
+    print(f"{args.output}: {info['height']}x{info['width']}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+Deterministic synthetic mazes for benchmarks and tests. Every generator is
+vectorized with NumPy so 8192 x 8192 grids take seconds, and returns a
+(H, W) uint8 wall mask (1 = wall) or, for weighted grids, (walls, costs).
+The same (size, seed) always gives the same maze.
+"""
+from typing import Tuple
+
+import numpy as np
+
+
+def perfect_maze(size: int, seed: int = 0) -> np.ndarray:
+    """
+    Perfect maze (exactly one path between any two cells) on the odd-indexed
+    cell lattice, carved with the binary-tree algorithm: every cell opens
+    either north or east. Corridors are one cell wide.
+    """
+    rng = np.random.default_rng(seed)
+    walls = np.ones((size, size), dtype=np.uint8)
+    n = (size - 1) // 2  # cells per side
+    walls[1:2*n:2, 1:2*n:2] = 0
+    north = rng.random((n, n)) < 0.5
+    north[0, :] = False        # top row can only go east
+    north[:, -1] = True        # right column can only go north
+    north[0, -1] = False       # the top-right cell carves nothing
+    rows, cols = np.nonzero(north)
+    walls[2*rows, 2*cols + 1] = 0
+    east = ~north
+    east[0, -1] = False
+    rows, cols = np.nonzero(east)
+    walls[2*rows + 1, 2*cols + 2] = 0
+    return walls
+
+
+def open_rooms(size: int, seed: int = 0, room: int = 16) -> np.ndarray:
+    """Square rooms of side `room` separated by 1-cell walls, one door per shared wall."""
+    rng = np.random.default_rng(seed)
+    walls = np.zeros((size, size), dtype=np.uint8)
+    walls[::room, :] = 1
+    walls[:, ::room] = 1
+    walls[-1, :] = walls[:, -1] = 1
+    lines = np.arange(room, size - 2, room)      # interior wall rows/cols with a room beyond
+    spans = np.arange(0, size - 2, room)         # room start along the wall
+    if len(lines) and len(spans):
+        width = np.minimum(spans + room, size - 1) - spans - 1
+        line, span = np.meshgrid(lines, np.arange(len(spans)), indexing="ij")
+        offset = 1 + (rng.random(line.shape) * width[span]).astype(np.int64)
+        door = spans[span] + offset
+        walls[line, door] = 0                    # doors in horizontal walls
+        offset = 1 + (rng.random(line.shape) * width[span]).astype(np.int64)
+        door = spans[span] + offset
+        walls[door, line] = 0                    # doors in vertical walls
+    return walls
+
+
+def random_obstacles(size: int, seed: int = 0, density: float = 0.25) -> np.ndarray:
+    """Independent random walls; corners (1, 1) and (size-2, size-2) are kept free."""
+    rng = np.random.default_rng(seed)
+    walls = (rng.random((size, size)) < density).astype(np.uint8)
+    walls[1, 1] = walls[size - 2, size - 2] = 0
+    return walls
+
+
+def weighted_grid(size: int, seed: int = 0, density: float = 0.15,
+                  max_cost: int = 9) -> Tuple[np.ndarray, np.ndarray]:
+    """Random obstacles plus integer traversal costs in [1, max_cost]."""
+    rng = np.random.default_rng(seed)
+    walls = random_obstacles(size, seed, density)
+    costs = rng.integers(1, max_cost + 1, (size, size)).astype(np.float32)
+    return walls, costs
+
+
+GENERATORS = {
+    "perfect": perfect_maze,
+    "rooms": open_rooms,
+    "random": random_obstacles,
+    "weighted": weighted_grid,
+}
@@ -0,0 +1,159 @@
+"""
+Pygame maze window shared by MazePathFinder and BestFinder.
+
+The maze, path, start and goal are rendered once into a one-pixel-per-cell
+Surface (via pygame.surfarray from utils.render.maze_rgb). Only the visible
+part is scaled to the cell size, and only when the viewport scrolls or
+zooms; otherwise a frame redraws just the player's old and new cells and
+updates those dirty rects.
+
+    Arrow keys   move the player (the view follows it)
+    Mouse wheel  scroll (Shift + wheel scrolls sideways)
+    + / -        zoom in / out
+"""
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+import pygame
+
+from utils.render import PLAYER, clamp_origin, follow, maze_rgb
+
+Coord = Tuple[int, int]
+
+BACKGROUND = (96, 96, 96)
+MOVES = ((pygame.K_UP, (-1, 0)), (pygame.K_DOWN, (1, 0)), (pygame.K_LEFT, (0, -1)), (pygame.K_RIGHT, (0, 1)))
+SCROLL_CELLS = 8
+FOLLOW_MARGIN = 4
+
+
+class MazeView:
+    """
+    One maze window. `move(position, (dr, dc))` returns the player's next
+    position; the default refuses walls and the maze border.
+    """
+
+    def __init__(self, walls: np.ndarray, start: Coord, goal: Coord, path: List[Coord],
+                 cell_size: int = 6, show_path: bool = True, caption: str = "MazePathFinder",
+                 max_size: Optional[Tuple[int, int]] = None):
+        pygame.init()
+        self.walls = walls
+        self.H, self.W = walls.shape
+        self.goal = goal
+        self.player = start
+        self.cell_size = max(1, int(cell_size))
+
+        if max_size is None:
+            info = pygame.display.Info()
+            max_size = (max(320, info.current_w - 80), max(240, info.current_h - 120))
+        size = (min(self.W * self.cell_size, max_size[0]), min(self.H * self.cell_size, max_size[1]))
+        self.screen = pygame.display.set_mode(size)
+        pygame.display.set_caption(caption)
+
+        rgb = maze_rgb(walls, path if show_path else (), start, goal)
+        self.layer = pygame.surfarray.make_surface(rgb.transpose(1, 0, 2))  # surfarray is (x, y)
+        self.origin = [0, 0]  # first visible (row, col)
+        self.view = None      # scaled visible part of the layer
+        self._rescale()
+
+    # ---------------------- Viewport ----------------------
+    def _visible(self) -> Tuple[int, int]:
+        sw, sh = self.screen.get_size()
+        return min(self.H, -(-sh // self.cell_size)), min(self.W, -(-sw // self.cell_size))
+
+    def _rescale(self) -> None:
+        """Rebuild the scaled viewport surface; only called on scroll and zoom."""
+        rows, cols = self._visible()
+        self.origin[0] = clamp_origin(self.origin[0], rows, self.H)
+        self.origin[1] = clamp_origin(self.origin[1], cols, self.W)
+        r0, c0 = self.origin
+        part = self.layer.subsurface((c0, r0, cols, rows))
+        self.view = pygame.transform.scale(part, (cols * self.cell_size, rows * self.cell_size))
+        self.screen.fill(BACKGROUND)
+        self.screen.blit(self.view, (0, 0))
+        self._draw_player()
+        pygame.display.flip()
+
+    def _cell_rect(self, cell: Coord) -> pygame.Rect:
+        cs = self.cell_size
+        return pygame.Rect((cell[1] - self.origin[1]) * cs, (cell[0] - self.origin[0]) * cs, cs, cs)
+
+    def _draw_player(self) -> pygame.Rect:
+        rect = self._cell_rect(self.player)
+        self.screen.fill(PLAYER, rect)
+        return rect
+
+    def _erase(self, cell: Coord) -> pygame.Rect:
+        rect = self._cell_rect(cell)
+        self.screen.blit(self.view, rect, rect)
+        return rect
+
+    def scroll(self, dr: int, dc: int) -> None:
+        self.origin[0] += dr
+        self.origin[1] += dc
+        self._rescale()
+
+    def zoom(self, factor: float) -> None:
+        cell_size = max(1, min(64, int(self.cell_size * factor)))
+        if cell_size == self.cell_size:
+            return
+        # Keep the player where it is on screen while the cell size changes.
+        rows, cols = self._visible()
+        self.cell_size = cell_size
+        new_rows, new_cols = self._visible()
+        self.origin[0] = self.player[0] - (self.player[0] - self.origin[0]) * new_rows // max(rows, 1)
+        self.origin[1] = self.player[1] - (self.player[1] - self.origin[1]) * new_cols // max(cols, 1)
+        self._rescale()
+
+    # ---------------------- Loop ----------------------
+    def default_move(self, position: Coord, step: Coord) -> Coord:
+        r, c = position[0] + step[0], position[1] + step[1]
+        if 0 <= r < self.H and 0 <= c < self.W and self.walls[r, c] == 0:
+            return (r, c)
+        return position
+
+    def run(self, move: Optional[Callable[[Coord, Coord], Coord]] = None, stop_at_goal: bool = False,
+            fps: int = 60) -> bool:
+        """Blocking event loop; True if the player reached the goal."""
+        move = move or self.default_move
+        clock = pygame.time.Clock()
+        reached = False
+        running = True
+        while running:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                elif event.type == pygame.MOUSEWHEEL:
+                    step = -event.y * SCROLL_CELLS
+                    if pygame.key.get_mods() & pygame.KMOD_SHIFT:
+                        self.scroll(0, step)
+                    else:
+                        self.scroll(step, -event.x * SCROLL_CELLS)
+                elif event.type == pygame.KEYDOWN and event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                    self.zoom(2)
+                elif event.type == pygame.KEYDOWN and event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                    self.zoom(0.5)
+
+            keys = pygame.key.get_pressed()
+            old = self.player
+            for key, step in MOVES:
+                if keys[key]:
+                    self.player = move(self.player, step)
+
+            if self.player != old:
+                rows, cols = self._visible()
+                origin = (follow(self.origin[0], self.player[0], rows, self.H, FOLLOW_MARGIN),
+                          follow(self.origin[1], self.player[1], cols, self.W, FOLLOW_MARGIN))
+                if list(origin) != self.origin:
+                    self.origin = list(origin)
+                    self._rescale()
+                else:
+                    pygame.display.update([self._erase(old), self._draw_player()])
+
+            if self.player == self.goal:
+                reached = True
+                if stop_at_goal:
+                    running = False
+            clock.tick(fps)
+
+        pygame.quit()
+        return reached
@@ -0,0 +1,89 @@
+"""
+NumPy side of the maze views: the maze, path and search layers as RGB arrays
+(one pixel per cell, or scale x scale pixels, built once and handed to
+pygame.surfarray or PIL), PNG export without a display, and the viewport
+arithmetic for mazes bigger than the window.
+"""
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+Coord = Tuple[int, int]
+
+FREE = (255, 255, 255)
+WALL = (0, 0, 0)
+PATH = (0, 0, 255)
+START = (255, 165, 0)
+GOAL = (0, 200, 0)
+PLAYER = (200, 0, 0)
+
+# Expanded cells shade from HEAT_FIRST (expanded first) to HEAT_LAST in HEAT_LEVELS steps.
+HEAT_FIRST = (255, 236, 160)
+HEAT_LAST = (214, 48, 39)
+HEAT_LEVELS = 64
+
+# Palette of the index layer maze_rgb paints: one uint8 per cell, colored by a single lookup.
+_FREE, _WALL, _PATH, _START, _GOAL, _HEAT = range(6)
+PALETTE = np.vstack([np.array([FREE, WALL, PATH, START, GOAL], dtype=np.uint8),
+                     np.linspace(HEAT_FIRST, HEAT_LAST, HEAT_LEVELS).round().astype(np.uint8)])
+
+
+def _cells(coords: Iterable[Coord]) -> np.ndarray:
+    return np.asarray(coords if isinstance(coords, np.ndarray) else list(coords), dtype=np.int64).reshape(-1, 2)
+
+
+def maze_rgb(walls: np.ndarray, path: Iterable[Coord] = (), start: Optional[Coord] = None,
+             goal: Optional[Coord] = None, *, visited: Optional[Iterable[Coord]] = None,
+             scale: int = 1) -> np.ndarray:
+    """
+    (H*scale, W*scale, 3) uint8 image of the maze: walls, then the cells in
+    `visited` (expansion order, e.g. SearchStats(record="all").visited) as a
+    heatmap of when they were expanded, then the path, then start and goal on
+    top. Every layer is written into a uint8 palette index per cell with
+    fancy indexing; the index layer is upscaled and colored by one PALETTE
+    lookup, so no step loops over pixels.
+    """
+    walls = np.asarray(walls)
+    index = (walls != 0).astype(np.uint8)
+    if visited is not None:
+        cells = _cells(visited)
+        if len(cells):
+            order = np.arange(len(cells), dtype=np.int64) * (HEAT_LEVELS - 1) // max(len(cells) - 1, 1)
+            index[cells[:, 0], cells[:, 1]] = _HEAT + order
+    cells = _cells(path)
+    if len(cells):
+        index[cells[:, 0], cells[:, 1]] = _PATH
+    if start is not None:
+        index[start] = _START
+    if goal is not None:
+        index[goal] = _GOAL
+    if scale > 1:
+        index = index.repeat(scale, axis=0).repeat(scale, axis=1)
+    return PALETTE[index]
+
+
+def save_solution(file, walls: np.ndarray, path: Iterable[Coord] = (), start: Optional[Coord] = None,
+                  goal: Optional[Coord] = None, *, visited: Optional[Iterable[Coord]] = None,
+                  scale: int = 1) -> None:
+    """Write maze_rgb(...) to `file` (a path or binary file object; PNG unless the name says otherwise)."""
+    image = Image.fromarray(maze_rgb(walls, path, start, goal, visited=visited, scale=scale))
+    image.save(file, format="PNG" if hasattr(file, "write") else None)
+
+
+def follow(origin: int, pos: int, view: int, total: int, margin: int = 0) -> int:
+    """
+    New first visible row/column of a `view`-cell window over `total` cells so
+    that `pos` stays at least `margin` cells from either edge, scrolling as
+    little as possible and never past the maze.
+    """
+    margin = min(margin, (view - 1) // 2)
+    if pos < origin + margin:
+        origin = pos - margin
+    elif pos >= origin + view - margin:
+        origin = pos - view + margin + 1
+    return clamp_origin(origin, view, total)
+
+
+def clamp_origin(origin: int, view: int, total: int) -> int:
+    return max(0, min(origin, total - view))
@@ -0,0 +1,135 @@
+"""
+Tiled maze directories for mazes whose search state does not fit in memory:
+the maze is cut into square tiles stored as separate .npy files, opened as an
+algorithms.tiled.TiledGrid that loads tiles on demand through an LRU cache.
+
+Layout:
+    tiles.json              {"format": "maze-tiles", "version": 1, "height", "width",
+                             "tile", "has_costs", "max_cost"}
+    walls/<tr>_<tc>.npy     uint8 wall mask of tile (tr, tc), 1 = wall
+    costs/<tr>_<tc>.npy     float32 cell costs, present if has_costs
+
+Edge tiles are cropped to the maze. max_cost is the largest cell cost when all
+costs are integers >= 1 (1 without a cost layer) and null otherwise.
+
+Convert an image or a .maze file:
+    python -m utils.tile_format maze.maze maze.tiles --tile 256
+"""
+import argparse
+import json
+import os
+import sys
+from typing import Optional
+
+import numpy as np
+
+from algorithms.tiled import TiledGrid
+
+FORMAT = "maze-tiles"
+VERSION = 1
+HEADER_NAME = "tiles.json"
+DEFAULT_TILE = 256
+
+
+def _tile_path(path: str, layer: str, tr: int, tc: int) -> str:
+    return os.path.join(path, layer, f"{tr}_{tc}.npy")
+
+
+def save_tiles(path: str, walls: np.ndarray, costs: Optional[np.ndarray] = None, tile: int = DEFAULT_TILE) -> None:
+    """
+    Write an (H, W) wall mask (nonzero = wall) and optional cost layer as a tile
+    directory. Both may be memmaps or PackedGrid-backed views: they are read one
+    band of `tile` rows at a time.
+    """
+    H, W = walls.shape
+    os.makedirs(os.path.join(path, "walls"), exist_ok=True)
+    if costs is not None:
+        os.makedirs(os.path.join(path, "costs"), exist_ok=True)
+    integral, max_cost = True, 1
+    for r0 in range(0, H, tile):
+        band = np.asarray(walls[r0:r0 + tile]) != 0
+        cost_band = None if costs is None else np.asarray(costs[r0:r0 + tile], dtype=np.float32)
+        if cost_band is not None and cost_band.size:
+            integral = integral and bool(cost_band.min() >= 1 and np.all(cost_band == np.floor(cost_band)))
+            max_cost = max(max_cost, float(cost_band.max()))
+        for c0 in range(0, W, tile):
+            tr, tc = r0 // tile, c0 // tile
+            np.save(_tile_path(path, "walls", tr, tc), band[:, c0:c0 + tile].astype(np.uint8))
+            if cost_band is not None:
+                np.save(_tile_path(path, "costs", tr, tc), np.ascontiguousarray(cost_band[:, c0:c0 + tile]))
+    header = {"format": FORMAT, "version": VERSION, "height": H, "width": W, "tile": tile,
+              "has_costs": costs is not None,
+              "max_cost": int(max_cost) if integral and max_cost < 2**31 else None}
+    with open(os.path.join(path, HEADER_NAME), "w") as fh:
+        json.dump(header, fh)
+
+
+def read_header(path: str) -> dict:
+    with open(os.path.join(path, HEADER_NAME)) as fh:
+        info = json.load(fh)
+    if info.get("format") != FORMAT:
+        raise ValueError(f"{path}: not a tiled maze directory")
+    if info.get("version") != VERSION:
+        raise ValueError(f"{path}: unsupported tile format version {info.get('version')}")
+    return info
+
+
+def open_tiles(path: str, cache_tiles: int = 64, cache_arrays: int = 64,
+               spill_dir: Optional[str] = None) -> TiledGrid:
+    """Open a tile directory as a TiledGrid; tiles are read from disk only when a search touches them."""
+    info = read_header(path)
+    has_costs = info["has_costs"]
+
+    def load_tile(tr: int, tc: int):
+        walls = np.load(_tile_path(path, "walls", tr, tc))
+        costs = np.load(_tile_path(path, "costs", tr, tc)) if has_costs else None
+        return walls, costs
+
+    return TiledGrid(load_tile, (info["height"], info["width"]), info["tile"], has_costs=has_costs,
+                     max_cost=info["max_cost"], cache_tiles=cache_tiles, cache_arrays=cache_arrays,
+                     spill_dir=spill_dir)
+
+
+class _PackedRows:
+    """Row-slicing view of a PackedGrid's walls or costs that unpacks only the requested rows."""
+
+    def __init__(self, grid, costs: bool = False):
+        self.grid, self.costs = grid, costs
+        self.shape = grid.shape
+
+    def __getitem__(self, rows: slice) -> np.ndarray:
+        g = self.grid
+        r0, r1, _ = rows.indices(g.height)
+        if self.costs:
+            return np.asarray(g.costs[r0 * g.width:r1 * g.width]).reshape(-1, g.width)
+        packed = np.asarray(g.bits[r0 * g.stride:r1 * g.stride]).reshape(-1, g.stride)
+        return np.unpackbits(packed, axis=1, count=g.width, bitorder="little")
+
+
+def convert(source: str, out_path: str, tile: int = DEFAULT_TILE, threshold: int = 128) -> None:
+    """Convert a .maze file (read band by band) or any image accepted by load_maze_image."""
+    if source.endswith(".maze"):
+        from utils.maze_format import open_maze
+        packed = open_maze(source)
+        save_tiles(out_path, _PackedRows(packed), _PackedRows(packed, costs=True) if packed.costs is not None else None,
+                   tile)
+    else:
+        from utils.image_processor import load_maze_image
+        save_tiles(out_path, load_maze_image(source, threshold), tile=tile)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Cut a maze image or .maze file into a tiled maze directory.")
+    parser.add_argument("source")
+    parser.add_argument("output")
+    parser.add_argument("--tile", type=int, default=DEFAULT_TILE)
+    parser.add_argument("--threshold", type=int, default=128)
+    args = parser.parse_args(argv)
+    convert(args.source, args.output, args.tile, args.threshold)
+    info = read_header(args.output)
+    print(f"{args.output}: {info['height']}x{info['width']} in {info['tile']}-cell tiles", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())